@@ -1,51 +1,170 @@
-from flask import Flask, jsonify, request
+from flask import Blueprint, Flask, Response, current_app, g, has_request_context, jsonify, request, stream_with_context
 from config import Config
-from models import db, User
+# Métricas, compresión, JSON, correo, réplicas y shards se importan siempre: las rutas y
+# async_app.py usan sus objetos de módulo aunque la opción esté desactivada, y juntos cuestan
+# unos 35 ms de ~670 ms de importación (benchmarks/bench_startup.py; casi todo es
+# flask_sqlalchemy). Lo que solo se usa con su opción activada se importa en create_app.
+from models import db, RevokedToken, User
+from count_cache import user_count_cache
+from etag_cache import list_etag, user_etag, user_etags, users_table_version
+from json_provider import json_provider_class
+from mail_queue import mail_queue
+from replicas import replica_router
+from revocation import token_blocklist
+from search import search_backends, search_index_probe, search_query, validate_search
+from sharding import merge_by_id, user_shards
+from startup import startup_timer
+from db_pool import engine_options, pool_metrics
+from token_cache import CachingJWTManager
+from validators import UserValidator
 from flask_jwt_extended import (
-    JWTManager,
     create_access_token,
+    get_jwt,
     get_jwt_identity,
     jwt_required,
     decode_token,
 )
 from jwt.exceptions import ExpiredSignatureError, InvalidTokenError  # Importar desde jwt.exceptions
-from flask_swagger_ui import get_swaggerui_blueprint
-from werkzeug.security import check_password_hash, generate_password_hash
-from datetime import timedelta  # Importar timedelta correctamente
-from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta  # Importar timedelta correctamente
+from sqlalchemy import delete, event, func, insert, or_, select, update
+from sqlalchemy.exc import DBAPIError, IntegrityError
+import compression
+import hashing
+import metrics
+from hashing import HashingBusyError, hash_password, hash_passwords, needs_rehash, verify_password
+import base64
+import binascii
+import csv
+import heapq
+import io
+import json
+import math
+import time
+from functools import wraps
+from itertools import chain, islice
+from operator import itemgetter
 
-app = Flask(__name__)
-app.config.from_object(Config)
-
-# Configuración de JWT
-app.config['JWT_SECRET_KEY'] = 'super-secret-key'  # Cambia esto por una clave más segura
-jwt = JWTManager(app)
-
-db.init_app(app)
+# Las rutas se definen en un blueprint y la aplicación se construye en create_app()
+api = Blueprint('api', __name__)
+jwt = CachingJWTManager()  # Cachea los tokens ya verificados
 
 # Ruta para la documentación de Swagger
 SWAGGER_URL = '/swagger'  # Ruta donde se visualizará Swagger UI
 API_URL = '/static/swagger.yaml'  # Ruta del archivo swagger.yaml
 
-# Configurar Swagger UI blueprint
-swaggerui_blueprint = get_swaggerui_blueprint(
-    SWAGGER_URL,            # URL para acceder a Swagger UI
-    API_URL,                # Ruta del archivo YAML
-    config={                # Configuraciones opcionales
-        'app_name': "API de Usuarios"
-    }
-)
+# Columnas que devuelven las rutas de lectura. Se consultan como filas ligeras, sin
+# password_hash ni identity map; la entidad completa solo se carga cuando hay que escribirla.
+USER_LIST_COLUMNS = (User.id, User.username, User.email)
+USER_DETAIL_COLUMNS = (User.id, User.username, User.email, User.created_at, User.updated_at)
+
+# Validez de los enlaces de restablecimiento de contraseña
+RESET_TOKEN_EXPIRES = timedelta(minutes=30)
 
-# Registrar Swagger en la app Flask
-app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
+# Sharding de usuarios (sharding.py). Las sentencias sobre la tabla de usuarios llevan el bind del
+# shard que corresponde; sin USERS_SHARD_URIS el bind queda vacío y se usa la base de datos por defecto.
+def email_bind(email):
+    return {'bind': user_shards.engine_for_email(email)} if user_shards.enabled else {}
+
+def id_bind(user_id):
+    # None si el id no pertenece a ningún shard
+    if not user_shards.enabled:
+        return {}
+    engine = user_shards.engine_for_id(user_id)
+    return None if engine is None else {'bind': engine}
+
+# Réplicas de lectura (replicas.py, sin shards). Las rutas de solo lectura eligen una réplica al
+# empezar y sus consultas la usan a través de reading(); las escrituras van siempre al primario.
+# Tras escribir, el resto de la petición y las peticiones del mismo cliente durante
+# REPLICA_PIN_SECONDS (cookie) leen del primario, para ver lo que acaban de escribir.
+REPLICA_PIN_COOKIE = 'read_primary_until'
+
+def reading(bind):
+    # Bind de una lectura: la réplica de la petición si la hay; si no, el de la escritura
+    replica = g.get('replica')
+    return {'bind': replica} if replica is not None and not bind else bind
+
+def pinned_to_primary():
+    try:
+        return float(request.cookies.get(REPLICA_PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+def replica_reads(view):
+    # Si la réplica falla a mitad de la petición, queda fuera y la ruta se repite en el primario
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if replica_router.enabled and not pinned_to_primary():
+            g.replica = replica_router.choose()
+        if g.get('replica') is None:
+            return view(*args, **kwargs)
+        try:
+            return view(*args, **kwargs)
+        except DBAPIError:
+            if g.get('replica') is None:
+                raise
+            replica_router.mark_failed(g.pop('replica'))
+            db.session.rollback()
+            return view(*args, **kwargs)
+    return wrapper
+
+@event.listens_for(db.session, 'do_orm_execute')
+def track_writes(orm_execute_state):
+    if has_request_context() and (
+        orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete
+    ):
+        g.replica = None
+        g.wrote = True
+
+def pin_after_write(response):
+    if g.get('wrote') and replica_router.enabled:
+        pin = current_app.config['REPLICA_PIN_SECONDS']
+        response.set_cookie(REPLICA_PIN_COOKIE, f'{time.time() + pin:.3f}', max_age=math.ceil(pin),
+                            httponly=True, samesite='Lax')
+    return response
+
+def shard_groups(items, engine_of):
+    # Reparte los elementos por shard: [(bind, elementos)]. Sin shards, un único grupo.
+    if not user_shards.enabled:
+        return [({}, list(items))]
+    groups = {}
+    for item in items:
+        engine = engine_of(item)
+        if engine is not None:
+            groups.setdefault(engine, []).append(item)
+    return [({'bind': engine}, group) for engine, group in groups.items()]
+
+def scatter(statement):
+    # La misma consulta en todos los shards a la vez: una lista de filas por shard
+    if not user_shards.enabled:
+        return [db.session.execute(statement, bind_arguments=reading({})).all()]
+    return user_shards.gather(lambda engine, connection: connection.execute(statement).all())
+
+def scatter_page(query, offset, limit):
+    # Tramo de un listado ordenado por id. Con shards, cada uno entrega sus offset + limit
+    # primeras filas y se combinan por id.
+    if not user_shards.enabled:
+        return db.session.execute(query.offset(offset).limit(limit), bind_arguments=reading({})).all()
+    return merge_by_id(scatter(query.limit(offset + limit)), offset, limit)
+
+def username_taken(username):
+    # Con shards la restricción única de username solo actúa dentro de cada shard; se comprueba
+    # en todos antes de escribir (dos altas simultáneas del mismo nombre en shards distintos
+    # pueden coincidir)
+    return any(scatter(select(User.id).where(User.username == username).limit(1)))
 
 # Función para crear un nuevo usuario
 def create_user(username, email, password_hash):
-    new_user = User(username=username, email=email, password_hash=password_hash)
+    if user_shards.enabled and username_taken(username):
+        return {"error": "El usuario ya existe."}, 409
     try:
-        db.session.add(new_user)
+        result = db.session.execute(
+            insert(User).values(username=username, email=email, password_hash=password_hash),
+            bind_arguments=email_bind(email),
+        )
         db.session.commit()
-        return {"id": new_user.id, "nombre": new_user.username, "email": new_user.email}, 201
+        user_count_cache.adjust(1)
+        users_table_version.invalidate()
+        return {"id": result.inserted_primary_key[0], "nombre": username, "email": email}, 201
     except IntegrityError as e:
         db.session.rollback()  # Deshacer los cambios en caso de error
         if 'unique constraint' in str(e.orig):
@@ -54,66 +173,616 @@ def create_user(username, email, password_hash):
     finally:
         db.session.close()
 
+# Crear varios usuarios a la vez: hashes en paralelo e INSERT de varias filas por bloque.
+# Devuelve el resultado de cada elemento en lugar de abortar el lote ante un conflicto.
+# Los conflictos (dentro del lote y con la base de datos) se descartan antes de calcular los
+# hashes: un lote de usuarios existentes no cuesta ningún KDF.
+def bulk_create_candidates(items):
+    # Valida el lote y descarta los repetidos dentro de él: (resultados, [(índice, usuario)])
+    results = [None] * len(items)
+    candidates = []
+    seen_emails, seen_names = set(), set()
+    for index, item in enumerate(items):
+        try:
+            UserValidator.validate_create_user(item)  # Mismas reglas y mensaje que POST /usuarios/
+        except ValueError as e:
+            results[index] = {'index': index, 'status': 400, 'error': str(e)}
+            continue
+        if item['email'] in seen_emails or item['nombre'] in seen_names:
+            results[index] = bulk_conflict(index)
+        else:
+            seen_emails.add(item['email'])
+            seen_names.add(item['nombre'])
+            candidates.append((index, item))
+    return results, candidates
+
+def bulk_conflict(index):
+    return {'index': index, 'status': 409, 'error': 'El usuario ya existe.'}
+
+def bulk_existing_query(chunk):
+    return select(User.email, User.username).where(or_(
+        User.email.in_([item['email'] for _, item in chunk]),
+        User.username.in_([item['nombre'] for _, item in chunk]),
+    ))
+
+def bulk_new_candidates(chunk, existing, results):
+    # Los candidatos del bloque que no existen todavía; los demás se marcan como conflicto
+    taken_emails = {row.email for row in existing}
+    taken_names = {row.username for row in existing}
+    pending = []
+    for index, item in chunk:
+        if item['email'] in taken_emails or item['nombre'] in taken_names:
+            results[index] = bulk_conflict(index)
+        else:
+            pending.append((index, item))
+    return pending
+
+def bulk_user_rows(pending, hashes):
+    return [
+        (index, {'username': item['nombre'], 'email': item['email'], 'password_hash': password_hash})
+        for (index, item), password_hash in zip(pending, hashes)
+    ]
+
+def bulk_record_inserted(rows, inserted, ids, results):
+    # Un alta concurrente entre la comprobación y el INSERT también se informa como conflicto
+    inserted_indexes = {index for index, _ in inserted}
+    for index, _ in rows:
+        if index not in inserted_indexes:
+            results[index] = bulk_conflict(index)
+    for index, row in inserted:
+        results[index] = {
+            'index': index, 'status': 201, 'id': ids.get(row['email']),
+            'nombre': row['username'], 'email': row['email']
+        }
+    if inserted:
+        user_count_cache.adjust(len(inserted))
+        users_table_version.invalidate()
+
+def bulk_create_report(results):
+    created = sum(1 for result in results if result['status'] == 201)
+    return {
+        'created': created,
+        'conflicts': sum(1 for result in results if result['status'] == 409),
+        'invalid': sum(1 for result in results if result['status'] == 400),
+        'results': results
+    }, 201 if created == len(results) else 207
+
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson')
+
+def ndjson_items(text):
+    # Un usuario por línea; una línea que no es JSON se reporta como elemento inválido
+    items = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            items.append(json.loads(line))
+        except ValueError:
+            items.append(None)
+    return items
+
+def create_users_bulk(items, chunk_size):
+    results, candidates = bulk_create_candidates(items)
+    try:
+        # Descartar de antemano los usuarios que ya existen en la base de datos (en todos los shards)
+        pending = []
+        for start in range(0, len(candidates), chunk_size):
+            chunk = candidates[start:start + chunk_size]
+            existing = [row for rows in scatter(bulk_existing_query(chunk)) for row in rows]
+            pending.extend(bulk_new_candidates(chunk, existing, results))
+        db.session.commit()
+
+        hashes = hash_passwords([item['clave'] for _, item in pending])
+
+        for start in range(0, len(pending), chunk_size):
+            rows = bulk_user_rows(pending[start:start + chunk_size], hashes[start:start + chunk_size])
+            inserted = []
+            for bind, shard_rows in shard_groups(rows, lambda item: user_shards.engine_for_email(item[1]['email'])):
+                inserted.extend(insert_user_rows(shard_rows, bind))
+            ids = {}
+            if inserted:
+                ids = dict(row for rows_ in scatter(select(User.email, User.id).where(
+                    User.email.in_([row['email'] for _, row in inserted])
+                )) for row in rows_)
+            bulk_record_inserted(rows, inserted, ids, results)
+    finally:
+        db.session.close()
+
+    return results
+
+def insert_user_rows(rows, bind):
+    # INSERT de varias filas en un shard. Si otro proceso creó alguno entre la comprobación y el
+    # INSERT, se aísla fila a fila. Devuelve las filas insertadas.
+    # Se inserta sobre la tabla: el INSERT masivo del ORM ignora bind_arguments.
+    statement = insert(User.__table__)
+    try:
+        db.session.execute(statement, [row for _, row in rows], bind_arguments=bind)
+        db.session.commit()
+        return rows
+    except IntegrityError:
+        db.session.rollback()
+    inserted = []
+    for index, row in rows:
+        try:
+            db.session.execute(statement, [row], bind_arguments=bind)
+            db.session.commit()
+            inserted.append((index, row))
+        except IntegrityError:
+            db.session.rollback()
+    return inserted
+
+# Borrado en lote: clave de la petición ('emails' o 'ids') -> columna y conversión
+BULK_DELETE_KEYS = {'emails': (User.email, str), 'ids': (User.id, int)}
+
+def bulk_delete_keys(data):
+    # Columna y claves sin repetir (en el orden recibido) de un cuerpo ya validado
+    field = 'emails' if 'emails' in data else 'ids'
+    column, convert = BULK_DELETE_KEYS[field]
+    return column, list(dict.fromkeys(convert(key) for key in data[field]))
+
+def bulk_delete_statements(column, chunk, returning):
+    # Con RETURNING (SQLite, MariaDB, PostgreSQL) un solo DELETE informa qué filas existían;
+    # en MySQL se bloquean con SELECT ... FOR UPDATE y se borran por clave primaria
+    if returning:
+        return None, delete(User).where(column.in_(chunk)).returning(User.id, column)
+    return select(User.id, column).where(column.in_(chunk)).with_for_update(), None
+
+def delete_by_ids(ids):
+    return delete(User).where(User.id.in_(ids)).execution_options(synchronize_session=False)
+
+def can_bulk_delete(identity, config):
+    # El borrado en lote solo está permitido a las identidades de USERS_BULK_DELETE_EMAILS
+    return identity in config['USERS_BULK_DELETE_EMAILS']
+
+def bulk_delete_report(keys, found):
+    # Qué claves existían (y se borraron) y cuáles no, en el orden recibido
+    return {
+        'deleted': [key for key in keys if key in found],
+        'not_found': [key for key in keys if key not in found],
+    }
+
+def forget_deleted_users(ids):
+    user_count_cache.adjust(-len(ids))
+    for user_id in ids:
+        user_etags.invalidate(user_id)
+    users_table_version.invalidate()
+
+# Eliminar varios usuarios con DELETE ... IN por bloques. Cada bloque es una transacción corta,
+# así los bloqueos no se mantienen durante todo el lote.
+def delete_users_bulk(column, keys, chunk_size):
+    found, ids = set(), []
+    engine_of = user_shards.engine_for_email if column is User.email else user_shards.engine_for_id
+    try:
+        for bind, shard_keys in shard_groups(keys, engine_of):
+            returning = db.session.get_bind(**bind).dialect.delete_returning
+            for start in range(0, len(shard_keys), chunk_size):
+                chunk = shard_keys[start:start + chunk_size]
+                locking, deleting = bulk_delete_statements(column, chunk, returning)
+                if deleting is not None:
+                    rows = db.session.execute(
+                        deleting.execution_options(synchronize_session=False), bind_arguments=bind
+                    ).all()
+                else:
+                    rows = db.session.execute(locking, bind_arguments=bind).all()
+                    if rows:
+                        db.session.execute(delete_by_ids([row[0] for row in rows]), bind_arguments=bind)
+                db.session.commit()
+                found.update(row[1] for row in rows)
+                ids.extend(row[0] for row in rows)
+    finally:
+        db.session.close()
+        if ids:
+            forget_deleted_users(ids)
+    return found
+
+# Correo con el enlace de restablecimiento: se encola y se entrega en segundo plano
+def enqueue_reset_email(email, reset_link):
+    mail_queue.enqueue(
+        email,
+        'Restablecer contraseña',
+        'Recibimos una solicitud para restablecer tu contraseña.\n\n'
+        f'Usa este enlace (válido durante 30 minutos):\n{reset_link}\n\n'
+        'Si no la solicitaste, ignora este mensaje.\n',
+    )
+
+# Revocación de tokens (revocation.py). Las lecturas de revoked_token usan su propia conexión
+# para no mezclarse con la sesión de la petición.
+REVOCATION_COLUMNS = (RevokedToken.jti, RevokedToken.subject, RevokedToken.issued_before, RevokedToken.created_at)
+
+def revocation_sync_query(mode, since):
+    query = select(*REVOCATION_COLUMNS)
+    if mode == 'full':
+        return query.where(or_(RevokedToken.expires_at.is_(None), RevokedToken.expires_at >= datetime.utcnow()))
+    return query if since is None else query.where(RevokedToken.created_at >= since)
+
+def expired_revocations():
+    return delete(RevokedToken).where(RevokedToken.expires_at < datetime.utcnow())
+
+def token_revocation(claims):
+    # Revoca un token concreto; la fila caduca con el propio token
+    expires_at = datetime.utcfromtimestamp(claims['exp']) if 'exp' in claims else None
+    return {'jti': claims['jti'], 'subject': claims['sub'], 'issued_before': None, 'expires_at': expires_at}
+
+def user_revocation(subject, config):
+    # Revoca los tokens del usuario emitidos antes de este momento (en milisegundos, como el 'iat'
+    # de issued_at_claims: un inicio de sesión justo después del cambio, aunque caiga en el mismo
+    # segundo, sigue siendo válido). La fila se conserva mientras pueda quedar vigente alguno de
+    # los tokens afectados.
+    access_expires = config.get('JWT_ACCESS_TOKEN_EXPIRES', timedelta(minutes=15))
+    if access_expires is False:
+        expires_at = None  # Tokens sin caducidad: la revocación es permanente
+    else:
+        if not isinstance(access_expires, timedelta):
+            access_expires = timedelta(seconds=access_expires)
+        expires_at = datetime.utcnow() + max(access_expires, RESET_TOKEN_EXPIRES)
+    return {'jti': None, 'subject': subject, 'issued_before': int(time.time() * 1000), 'expires_at': expires_at}
+
+def issued_at_claims():
+    # 'iat' con milisegundos (RFC 7519 admite fechas no enteras): con segundos enteros no se
+    # distingue un token emitido justo antes de un restablecimiento de uno emitido justo después
+    return {'iat': round(time.time(), 3)}
+
+def reset_revocations(claims, config):
+    # Al restablecer la contraseña: el enlace usado (por jti, de modo que no sirve una segunda
+    # vez; la restricción única de jti rechaza también dos usos simultáneos) y los tokens del usuario
+    return [token_revocation(claims), user_revocation(claims['sub'], config)]
+
+def revocation_row(values):
+    return (values['jti'], values['subject'], values.get('issued_before'), None)
+
+def sync_revocations():
+    mode = token_blocklist.sync_due(
+        current_app.config['JWT_REVOCATION_SYNC_INTERVAL'], current_app.config['JWT_REVOCATION_REBUILD_INTERVAL']
+    )
+    if mode is None:
+        return
+    with db.engine.begin() as connection:
+        if mode == 'full':
+            connection.execute(expired_revocations())
+        rows = connection.execute(revocation_sync_query(mode, token_blocklist.since())).all()
+    if mode == 'full':
+        token_blocklist.load(rows)
+    else:
+        token_blocklist.merge(rows)
+
+def token_revoked(claims):
+    sync_revocations()
+    revoked = token_blocklist.check(claims)
+    if revoked is None:
+        # Positivo del filtro de Bloom: confirmar con la tabla
+        with db.engine.connect() as connection:
+            revoked = connection.scalar(select(RevokedToken.id).where(RevokedToken.jti == claims['jti'])) is not None
+        token_blocklist.record_lookup(revoked)
+    return revoked
+
+@jwt.token_in_blocklist_loader
+def check_token_revoked(jwt_header, jwt_payload):
+    return token_revoked(jwt_payload)
+
+def revoke_token(claims):
+    values = token_revocation(claims)
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(insert(RevokedToken).values(**values))
+    except IntegrityError:
+        pass  # Ya estaba revocado (por otro proceso antes de sincronizar)
+    token_blocklist.add(revocation_row(values))
+
+# Cursor opaco para la paginación por clave (keyset): codifica el último id entregado
+def encode_cursor(last_id):
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    if not cursor:
+        return 0  # Sin cursor se empieza desde el principio de la tabla
+    padding = '=' * (-len(cursor) % 4)
+    try:
+        last_id = int(base64.urlsafe_b64decode(cursor + padding).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    return last_id if last_id >= 0 else None
+
+# Total de usuarios según ?with_total: 'true' (caché con antigüedad acotada),
+# 'approx' (último valor conocido aunque esté desactualizado) o 'false' (se omite)
+def users_total(with_total):
+    if with_total == 'false':
+        return None
+    return user_count_cache.get(
+        count_users,
+        max_staleness=current_app.config['USERS_COUNT_MAX_STALENESS'],
+        approximate=(with_total == 'approx'),
+    )
+
+def count_users():
+    return sum(rows[0][0] for rows in scatter(select(func.count(User.id))))
+
+# Resumen de la tabla que cambia con cualquier alta, baja o modificación: MAX(id) y
+# MAX(updated_at) (búsquedas en índice; con shards, el máximo de cada columna) y el total de
+# usuarios de count_cache.py. El COUNT(*) solo se ejecuta cuando ese total ha caducado, así que
+# una baja de otro proceso que no cambia los máximos se nota en USERS_COUNT_MAX_STALENESS.
+def users_table_fingerprint():
+    results = [rows[0] for rows in scatter(select(func.max(User.id), func.max(User.updated_at)))]
+    total = user_count_cache.get(count_users, max_staleness=current_app.config['USERS_COUNT_MAX_STALENESS'])
+    return (
+        total,
+        max((result[0] for result in results if result[0] is not None), default=None),
+        max((result[1] for result in results if result[1] is not None), default=None),
+    )
+
+def users_version():
+    return users_table_version.get(users_table_fingerprint, current_app.config['USERS_ETAG_MAX_STALENESS'])
+
+# Respuestas condicionales: el cliente revalida siempre y recibe 304 si su ETag sigue vigente
+def with_etag(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def not_modified(etag):
+    return with_etag(Response(status=304), etag)
+
 # Definición de rutas de la API
-@app.route('/usuarios/', methods=['GET'])
+@api.route('/usuarios/', methods=['GET'])
 @jwt_required()  # Requiere token válido
+@replica_reads
 def get_users():
-    page = request.args.get('page', 1, type=int)
+    # El límite siempre queda acotado para evitar páginas arbitrariamente grandes
     limit = request.args.get('limit', 10, type=int)
-    users = User.query.paginate(page=page, per_page=limit, error_out=False).items
-    total = User.query.count()
-    return jsonify({
-        'total': total,
+    limit = max(1, min(limit, current_app.config['USERS_PAGE_LIMIT_MAX']))
+    with_total = request.args.get('with_total', 'true').lower()
+    if with_total not in ('true', 'false', 'approx'):
+        return jsonify({'error': "with_total debe ser 'true', 'false' o 'approx'"}), 400
+
+    # Modo cursor: busca por la clave primaria en lugar de usar OFFSET
+    if 'after' in request.args:
+        last_id = decode_cursor(request.args.get('after'))
+        if last_id is None:
+            return jsonify({'error': 'Cursor inválido'}), 400
+        total = users_total(with_total)
+        etag = list_etag(users_version(), 'after', last_id, limit, total)
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+
+        # Se pide un registro extra para saber si existe una página siguiente
+        users = scatter_page(select(*USER_LIST_COLUMNS).where(User.id > last_id).order_by(User.id), 0, limit + 1)
+        next_cursor = encode_cursor(users[limit - 1].id) if len(users) > limit else None
+        response = {
+            'limit': limit,
+            'next_cursor': next_cursor,
+            'users': [{'id': user.id, 'nombre': user.username, 'email': user.email} for user in users[:limit]]
+        }
+        if total is not None:
+            response['total'] = total
+        return with_etag(jsonify(response), etag)
+
+    # Modo por páginas (compatibilidad con clientes existentes)
+    page = max(1, request.args.get('page', 1, type=int))
+    # Con shards, cada página lee offset + limit filas de cada shard: las páginas profundas se
+    # sirven solo por cursor
+    max_offset = current_app.config['USERS_SHARDED_MAX_OFFSET']
+    if user_shards.enabled and (page - 1) * limit > max_offset:
+        return jsonify({'error': f'Con shards, page admite un desplazamiento máximo de {max_offset} usuarios; use after'}), 400
+    total = users_total(with_total)
+    etag = list_etag(users_version(), 'page', page, limit, total)
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+
+    users = scatter_page(select(*USER_LIST_COLUMNS).order_by(User.id), (page - 1) * limit, limit)
+    response = {
         'page': page,
         'limit': limit,
         'users': [{'id': user.id, 'nombre': user.username, 'email': user.email} for user in users]
+    }
+    if total is not None:
+        response['total'] = total
+    return with_etag(jsonify(response), etag)
+
+# Índice de búsqueda disponible en cada base de datos ('sqlite', 'mysql' o 'like')
+def users_search_backend(engine, connection):
+    backend = search_backends.get(engine.url)
+    if backend is None:
+        probe = search_index_probe(engine.dialect.name)
+        found = probe is not None and connection.execute(probe).first() is not None
+        backend = search_backends[engine.url] = engine.dialect.name if found else 'like'
+    return backend
+
+# Buscar usuarios por prefijo o subcadena del nombre o del email, con paginación por cursor
+@api.route('/usuarios/buscar', methods=['GET'])
+@jwt_required()  # Requiere token válido
+@replica_reads
+def search_users():
+    q = request.args.get('q', '').strip()
+    mode = request.args.get('mode', 'substring').lower()
+    error = validate_search(q, mode)
+    if error:
+        return jsonify({'error': error}), 400
+    last_id = decode_cursor(request.args.get('after'))
+    if last_id is None:
+        return jsonify({'error': 'Cursor inválido'}), 400
+    limit = request.args.get('limit', 10, type=int)
+    limit = max(1, min(limit, current_app.config['USERS_PAGE_LIMIT_MAX']))
+
+    # Se pide un registro extra para saber si existe una página siguiente
+    def search(engine, connection):
+        return connection.execute(search_query(users_search_backend(engine, connection), q, mode, last_id, limit + 1)).all()
+    if user_shards.enabled:
+        users = merge_by_id(user_shards.gather(search), 0, limit + 1)
+    else:
+        engine = reading({}).get('bind', db.engine)
+        with engine.connect() as connection:
+            users = search(engine, connection)
+    return jsonify({
+        'limit': limit,
+        'next_cursor': encode_cursor(users[limit - 1].id) if len(users) > limit else None,
+        'users': [{'id': user.id, 'nombre': user.username, 'email': user.email} for user in users[:limit]]
     })
 
+# Exportar todos los usuarios en streaming (NDJSON o CSV), leyendo la tabla por bloques de id.
+# La memoria del proceso no depende del tamaño de la tabla: se lee y envía por bloques.
+EXPORT_COLUMNS = ('id', 'nombre', 'email', 'created_at', 'updated_at')
+
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+def export_batch_query(last_id, batch_size):
+    return (select(User.id, User.username, User.email, User.created_at, User.updated_at)
+            .where(User.id > last_id).order_by(User.id).limit(batch_size))
+
+def export_keyset(bind, batch_size):
+    # Bloques de batch_size filas por clave primaria (id > último id enviado). No depende de
+    # cursores del servidor, que mysql+mysqlconnector no tiene (lee el resultado entero), y cada
+    # bloque es una transacción corta que no retiene la conexión mientras el cliente descarga.
+    last_id = 0
+    while True:
+        rows = db.session.execute(export_batch_query(last_id, batch_size), bind_arguments=bind).all()
+        db.session.commit()
+        if rows:
+            yield rows
+        if len(rows) < batch_size:
+            return
+        last_id = rows[-1].id
+
+def export_rows(batch_size):
+    if not user_shards.enabled:
+        yield from export_keyset(reading({}), batch_size)
+        return
+    # Los bloques de cada shard, combinados por id y reagrupados en bloques de batch_size
+    streams = [chain.from_iterable(export_keyset({'bind': engine}, batch_size)) for engine in user_shards.engines]
+    merged = heapq.merge(*streams, key=itemgetter(0))
+    while partition := list(islice(merged, batch_size)):
+        yield partition
+
+def export_header(export_format):
+    return ','.join(EXPORT_COLUMNS) + '\r\n' if export_format == 'csv' else ''
+
+def export_chunk(export_format, partition, dumps):
+    # Texto de un bloque de filas; dumps es el json.dumps de la aplicación (Flask o Quart)
+    if export_format == 'ndjson':
+        return ''.join(dumps(dict(zip(EXPORT_COLUMNS, row))) + '\n' for row in partition)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for user_id, username, email, created_at, updated_at in partition:
+        writer.writerow([
+            user_id, username, email,
+            created_at.isoformat() if created_at else '',
+            updated_at.isoformat() if updated_at else ''
+        ])
+    return buffer.getvalue()
+
+def export_stream(export_format, batch_size):
+    header = export_header(export_format)
+    if header:
+        yield header
+    for partition in export_rows(batch_size):
+        yield export_chunk(export_format, partition, current_app.json.dumps)
+
+@api.route('/usuarios/export', methods=['GET'])
+@jwt_required()  # Requiere token válido
+@replica_reads
+def export_users():
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': "Formato no soportado, use 'ndjson' o 'csv'"}), 400
+
+    # Con Accept-Encoding se comprime bloque a bloque (compression.py)
+    chunks = export_stream(export_format, current_app.config['USERS_EXPORT_BATCH_SIZE'])
+    headers = {'Content-Disposition': f'attachment; filename=usuarios.{export_format}'}
+    return Response(stream_with_context(chunks), mimetype=EXPORT_FORMATS[export_format], headers=headers)
+
 # Obtener un usuario específico por su ID (JWT requerido)
-@app.route('/usuarios/<int:id>', methods=['GET'])
+@api.route('/usuarios/<int:id>', methods=['GET'])
 @jwt_required()  # Requiere token válido
+@replica_reads
 def get_user(id):
-    user = User.query.get(id)
+    # Con un ETag reciente en caché se responde 304 sin consultar la base de datos
+    etag = user_etags.get(id, current_app.config['USERS_ETAG_MAX_STALENESS'])
+    if etag is not None and request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+
+    bind = id_bind(id)
+    user = None
+    if bind is not None:
+        user = db.session.execute(select(*USER_DETAIL_COLUMNS).where(User.id == id), bind_arguments=reading(bind)).first()
     if user:
-        return jsonify({
+        etag = user_etag(user)
+        user_etags.store(id, etag)
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+        return with_etag(jsonify({
             'id': user.id,
             'nombre': user.username,
             'email': user.email,
             'created_at': user.created_at,
             'updated_at': user.updated_at
-        })
+        }), etag)
+    user_etags.invalidate(id)
     return jsonify({'error': 'Usuario no encontrado'}), 404
 
 # Crear un nuevo usuario
-@app.route('/usuarios/', methods=['POST'])
+@api.route('/usuarios/', methods=['POST'])
 def register_user():
-    data = request.get_json()
-    if 'nombre' not in data or 'email' not in data or 'clave' not in data:
-        return jsonify({'error': 'Campos obligatorios faltantes'}), 400
+    data = request.get_json(silent=True)
+    try:
+        UserValidator.validate_create_user(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     # Generar el hash de la contraseña
-    password_hash = generate_password_hash(data['clave'])
+    password_hash = hash_password(data['clave'])
 
     # Llamar a la función create_user
     result, status_code = create_user(data['nombre'], data['email'], password_hash)
     return jsonify(result), status_code
 
+# Crear usuarios en lote (JSON con una lista o NDJSON con un usuario por línea)
+@api.route('/usuarios/bulk', methods=['POST'])
+@jwt_required()  # Requiere token válido
+def register_users_bulk():
+    if request.mimetype in NDJSON_MIMETYPES:
+        items = ndjson_items(request.get_data(as_text=True))
+    else:
+        items = request.get_json(silent=True)
+        if not isinstance(items, list):
+            return jsonify({'error': 'Se esperaba una lista de usuarios'}), 400
+
+    if len(items) > current_app.config['USERS_BULK_CREATE_MAX_ITEMS']:
+        return jsonify({'error': f"Máximo {current_app.config['USERS_BULK_CREATE_MAX_ITEMS']} usuarios por lote"}), 413
+
+    report, status = bulk_create_report(create_users_bulk(items, current_app.config['USERS_BULK_CHUNK_SIZE']))
+    return jsonify(report), status
+
 # Actualizar un usuario por correo electrónico (JWT requerido)
-@app.route('/usuarios/actualizar', methods=['PUT'])
+@api.route('/usuarios/actualizar', methods=['PUT'])
 @jwt_required()  # Requiere token válido
 def update_user():
     current_user_email = get_jwt_identity()  # Obtener el correo del usuario autenticado
-    data = request.get_json()
+    data = request.get_json(silent=True)
+    try:
+        UserValidator.validate_update_user(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     email_to_update = data.get('email')
 
     if current_user_email != email_to_update:
         return jsonify({'error': 'No autorizado para actualizar este usuario'}), 403
 
-    user = User.query.filter_by(email=email_to_update).first()
+    bind = email_bind(email_to_update)
+    user = db.session.execute(select(*USER_DETAIL_COLUMNS).filter_by(email=email_to_update), bind_arguments=bind).first()
     if user:
-        user.username = data.get('nombre', user.username)
-        user.email = data.get('email', user.email)
-        db.session.commit()
+        # El email no cambia (debe coincidir con el del token); solo se escribe si cambia el nombre
+        username = data.get('nombre', user.username)
+        if username != user.username:
+            # Con shards el índice único solo cubre el shard del usuario: se consultan los demás
+            if user_shards.enabled and username_taken(username):
+                return jsonify({'error': 'El usuario ya existe.'}), 409
+            try:
+                db.session.execute(update(User).where(User.id == user.id).values(username=username), bind_arguments=bind)
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()  # Nombre ocupado en el mismo shard (o sin shards)
+                return jsonify({'error': 'El usuario ya existe.'}), 409
+            user = db.session.execute(select(*USER_DETAIL_COLUMNS).where(User.id == user.id), bind_arguments=bind).one()
+        user_etags.store(user.id, user_etag(user))
+        users_table_version.invalidate()
         return jsonify({
             'id': user.id,
             'nombre': user.username,
@@ -123,8 +792,19 @@ def update_user():
     return jsonify({'error': 'Usuario no encontrado'}), 404
 
 
+# Borra el usuario de ese email en su shard; devuelve su id o None si no existe
+def delete_user_by_email(email):
+    bind = email_bind(email)
+    user_id = db.session.scalar(select(User.id).filter_by(email=email), bind_arguments=bind)
+    if user_id is None:
+        return None
+    db.session.execute(delete_by_ids([user_id]), bind_arguments=bind)
+    db.session.commit()
+    forget_deleted_users([user_id])
+    return user_id
+
 # Eliminar un usuario por correo electrónico (JWT requerido)
-@app.route('/usuarios/eliminar', methods=['DELETE'])
+@api.route('/usuarios/eliminar', methods=['DELETE'])
 @jwt_required()  # Requiere token válido
 def delete_user():
     current_user_email = get_jwt_identity()  # Obtener el correo del usuario autenticado
@@ -134,15 +814,39 @@ def delete_user():
     if current_user_email != email_to_delete:
         return jsonify({'error': 'No autorizado para eliminar este usuario'}), 403
 
-    user = User.query.filter_by(email=email_to_delete).first()
-    if user:
-        db.session.delete(user)
-        db.session.commit()
+    if delete_user_by_email(email_to_delete):
         return '', 204  # Código 204 sin contenido
     return jsonify({'error': 'Usuario no encontrado'}), 404
 
+# Cerrar sesión: el token usado queda revocado en todos los procesos
+@api.route('/auth/logout', methods=['POST'])
+@jwt_required()  # Requiere token válido
+def logout():
+    revoke_token(get_jwt())
+    return jsonify({'mensaje': 'Sesión cerrada.'}), 200
+
+# Eliminar usuarios en lote por email o por id: {"emails": [...]} o {"ids": [...]}
+@api.route('/usuarios/bulk', methods=['DELETE'])
+@jwt_required()  # Requiere token válido
+def delete_users_batch():
+    if not can_bulk_delete(get_jwt_identity(), current_app.config):
+        return jsonify({'error': 'No autorizado para eliminar usuarios en lote'}), 403
+    data = request.get_json(silent=True)
+    try:
+        UserValidator.validate_bulk_delete(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    column, keys = bulk_delete_keys(data)
+    if len(keys) > current_app.config['USERS_BULK_MAX_ITEMS']:
+        return jsonify({'error': f"Máximo {current_app.config['USERS_BULK_MAX_ITEMS']} usuarios por lote"}), 413
+
+    found = delete_users_bulk(column, keys, current_app.config['USERS_BULK_DELETE_CHUNK_SIZE'])
+    return jsonify(bulk_delete_report(keys, found)), 200
+
 # Inicio de sesión y generación de JWT
-@app.route('/auth/login', methods=['POST'])
+@api.route('/auth/login', methods=['POST'])
+@replica_reads
 def login():
     data = request.get_json()
     
@@ -150,13 +854,23 @@ def login():
     if 'email' not in data or 'clave' not in data:
         return jsonify({'error': 'Faltan campos'}), 400
 
-    # Buscar el usuario por email
-    user = User.query.filter_by(email=data['email']).first()
+    # Buscar el usuario por email (solo las columnas necesarias para autenticarlo)
+    bind = email_bind(data['email'])
+    user = db.session.execute(
+        select(User.id, User.email, User.password_hash).filter_by(email=data['email']), bind_arguments=reading(bind)
+    ).first()
     
     # Verificar la contraseña
-    if user and check_password_hash(user.password_hash, data['clave']):
+    if user and verify_password(user.password_hash, data['clave']):
+        # Actualizar el hash si se generó con otro método o coste (sin tocar updated_at)
+        if needs_rehash(user.password_hash):
+            db.session.execute(update(User).where(User.id == user.id).values(
+                password_hash=hash_password(data['clave']), updated_at=User.updated_at
+            ), bind_arguments=bind)
+            db.session.commit()
+
         # Generar el token JWT
-        access_token = create_access_token(identity=user.email)
+        access_token = create_access_token(identity=user.email, additional_claims=issued_at_claims())
         return jsonify({'token': access_token}), 200
     
     # Responder con un error si las credenciales son incorrectas
@@ -164,7 +878,8 @@ def login():
 
 
 # Solicitar restablecimiento de contraseña
-@app.route('/auth/reset_password', methods=['POST'])
+@api.route('/auth/reset_password', methods=['POST'])
+@replica_reads
 def request_password_reset():
     data = request.get_json()
     email = data.get('email')
@@ -172,17 +887,17 @@ def request_password_reset():
     if not email:
         return jsonify({'error': 'El correo electrónico es obligatorio.'}), 400
 
-    user = User.query.filter_by(email=email).first()
+    user = db.session.execute(
+        select(User.email).filter_by(email=email), bind_arguments=reading(email_bind(email))
+    ).first()
 
     if user:
         # Crear token de restablecimiento de contraseña (válido por 30 minutos)
-        expires = timedelta(minutes=30)  # Corregido timedelta
-        reset_token = create_access_token(identity=user.email, expires_delta=expires)
+        reset_token = create_access_token(identity=user.email, expires_delta=RESET_TOKEN_EXPIRES, additional_claims=issued_at_claims())
         
-        # Aquí debes enviar el correo con el token
-        # Enviar enlace por correo (omitido aquí)
+        # Enviar el enlace por correo (la respuesta no espera a la entrega SMTP)
         reset_link = f"http://localhost:5000/auth/reset_password/{reset_token}"
-        print(f"Enviar este enlace para restablecer la contraseña: {reset_link}")
+        enqueue_reset_email(user.email, reset_link)
 
         return jsonify({
             'mensaje': 'Se ha enviado un enlace para restablecer la contraseña al correo electrónico proporcionado.',
@@ -191,7 +906,7 @@ def request_password_reset():
     else:
         return jsonify({'error': 'El usuario no existe.'}), 404
 
-@app.route('/auth/reset_password/<string:token>', methods=['POST'])
+@api.route('/auth/reset_password/<string:token>', methods=['POST'])
 def reset_password(token):
     data = request.get_json()
     new_password = data.get('new_password')
@@ -203,12 +918,32 @@ def reset_password(token):
     try:
         # Decodificar el token usando la clave secreta de JWT
         decoded = decode_token(token)
-        user = User.query.filter_by(email=decoded['sub']).first()
+        # Un enlace ya usado queda revocado junto con el resto de tokens del usuario
+        if token_revoked(decoded):
+            return jsonify({'error': 'Token inválido.'}), 401
+        bind = email_bind(decoded['sub'])
+        user_id = db.session.scalar(select(User.id).filter_by(email=decoded['sub']), bind_arguments=bind)
 
-        if user:
-            # Actualizar la contraseña con el nuevo valor
-            user.password_hash = generate_password_hash(new_password)  # Aquí se generará el hash
-            db.session.commit()
+        if user_id is not None:
+            # Actualizar la contraseña con el nuevo valor sin cargar la entidad y revocar, en la
+            # misma transacción, el enlace y todos los tokens emitidos hasta el cambio (con shards,
+            # la revocación está en la base de datos por defecto y se confirma en el mismo commit)
+            db.session.execute(update(User).where(User.id == user_id).values(
+                password_hash=hash_password(new_password)  # El hash se calcula en el pool de procesos
+            ), bind_arguments=bind)
+            revocations = reset_revocations(decoded, current_app.config)
+            db.session.execute(insert(RevokedToken), revocations)
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Otra petición usó el mismo enlace a la vez y ya lo revocó
+                db.session.rollback()
+                return jsonify({'error': 'Token inválido.'}), 401
+            for revocation in revocations:
+                token_blocklist.add(revocation_row(revocation))
+            # updated_at cambió: el ETag en caché ya no es válido
+            user_etags.invalidate(user_id)
+            users_table_version.invalidate()
             return jsonify({'mensaje': 'Contraseña restablecida exitosamente.'}), 200
         else:
             return jsonify({'error': 'Usuario no encontrado.'}), 404
@@ -219,7 +954,7 @@ def reset_password(token):
         return jsonify({'error': 'Token inválido.'}), 401
 
 # Verificar si el usuario existe y eliminarlo por correo electrónico
-@app.route('/usuarios/verificar_y_eliminar', methods=['DELETE'])
+@api.route('/usuarios/verificar_y_eliminar', methods=['DELETE'])
 def verify_and_delete_user_by_email():
     data = request.get_json()
     email = data.get('email')
@@ -227,15 +962,128 @@ def verify_and_delete_user_by_email():
     if not email:
         return jsonify({'error': 'El correo electrónico es obligatorio.'}), 400
 
-    user = User.query.filter_by(email=email).first()
-    if user:
-        db.session.delete(user)
-        db.session.commit()
+    if delete_user_by_email(email):
         return jsonify({'mensaje': 'Usuario eliminado exitosamente.'}), 200  # Código 200 con mensaje
     return jsonify({'error': 'Usuario no encontrado.'}), 404
 
 
-if __name__ == '__main__':
+# Estado del pool de conexiones: conexiones en uso, desbordamiento y espera por checkout
+@api.route('/metrics/pool', methods=['GET'])
+def pool_status():
+    return jsonify(pool_metrics.snapshot(db.engine.pool))
+
+
+def handle_hashing_busy(error):
+    return jsonify({'error': 'Servidor ocupado, inténtelo de nuevo.'}), 503
+
+# Consumir el cuerpo que la ruta no leyó (404, 308, 405...). Si queda sin leer, gunicorn
+# cierra la conexión keep-alive y el siguiente request del cliente falla.
+def drain_request_body(response):
+    while request.stream.read(64 * 1024):
+        pass
+    return response
+
+def configure_mail_queue(config):
+    mail_queue.configure(
+        path=config['MAIL_QUEUE_PATH'],
+        host=config['MAIL_SMTP_HOST'],
+        port=config['MAIL_SMTP_PORT'],
+        username=config['MAIL_SMTP_USER'],
+        password=config['MAIL_SMTP_PASSWORD'],
+        starttls=config['MAIL_SMTP_STARTTLS'],
+        timeout=config['MAIL_SMTP_TIMEOUT'],
+        sender=config['MAIL_SENDER'],
+        workers=config['MAIL_WORKERS'],
+        batch_size=config['MAIL_BATCH_SIZE'],
+        max_attempts=config['MAIL_MAX_ATTEMPTS'],
+        retry_base=config['MAIL_RETRY_BASE'],
+        retry_max=config['MAIL_RETRY_MAX'],
+    )
+
+# Fábrica de la aplicación: cada proceso (o cada prueba) construye su propia instancia
+def create_app(config_object=Config):
+    app = Flask(__name__)
+    app.config.from_object(config_object)
+    app.json = json_provider_class(app.config['JSON_PROVIDER'])(app)
+    base_engine_options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'], base_engine_options)
+    # Un bind por shard de usuarios, con las mismas opciones de pool
+    app.config['SQLALCHEMY_BINDS'] = {
+        **app.config.get('SQLALCHEMY_BINDS', {}),
+        **{
+            f'users_{index}': {'url': uri, **engine_options(uri, base_engine_options)}
+            for index, uri in enumerate(app.config['USERS_SHARD_URIS'])
+        },
+        # Y uno por réplica de lectura
+        **{
+            f'replica_{index}': {'url': uri, **engine_options(uri, base_engine_options)}
+            for index, uri in enumerate(app.config['REPLICA_URIS'])
+        },
+    }
+    if app.config['USERS_SHARD_URIS'] and app.config['REPLICA_URIS']:
+        # Las réplicas son de la base de datos por defecto; los shards no tienen réplicas propias
+        raise RuntimeError('REPLICA_URIS no está soportado junto con USERS_SHARD_URIS')
+
+    jwt.init_app(app)
+    db.init_app(app)
+    user_etags.max_size = app.config['USERS_ETAG_CACHE_SIZE']
+    token_blocklist.configure(app.config['JWT_REVOCATION_CAPACITY'], app.config['JWT_REVOCATION_ERROR_RATE'])
+
+    # Compresión de respuestas y estáticos precomprimidos (antes que los demás after_request)
+    compression.init_app(app)
+
+    # Latencia por ruta y consultas SQL por petición en GET /metrics
     with app.app_context():
-        db.create_all()  # Crea las tablas antes de ejecutar la aplicación
-    app.run(debug=True)
+        user_shards.configure(
+            [db.engines[f'users_{index}'] for index in range(len(app.config['USERS_SHARD_URIS']))],
+            app.config['USERS_SHARD_WORKERS'],
+        )
+        replica_router.configure(
+            db.engine,
+            [db.engines[f'replica_{index}'] for index in range(len(app.config['REPLICA_URIS']))],
+            strategy=app.config['REPLICA_STRATEGY'],
+            max_lag=app.config['REPLICA_MAX_LAG'],
+            check_interval=app.config['REPLICA_CHECK_INTERVAL'],
+        )
+        metrics.init_app(
+            app, dict(db.engines), pool_metrics=pool_metrics, token_cache=jwt.token_cache,
+            token_blocklist=token_blocklist, replica_router=replica_router,
+        )
+
+    # Pool de procesos para los hashes de contraseñas (se crea al primer uso, tras el fork)
+    hashing.configure(
+        method=app.config['PASSWORD_HASH_METHOD'],
+        cost=app.config['PASSWORD_HASH_COST'],
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        queue_size=app.config['PASSWORD_HASH_QUEUE_SIZE'],
+        queue_timeout=app.config['PASSWORD_HASH_QUEUE_TIMEOUT'],
+    )
+
+    # Cola de correo saliente (los hilos de entrega se crean al primer envío, tras el fork)
+    configure_mail_queue(app.config)
+
+    app.register_blueprint(api)
+    app.register_error_handler(HashingBusyError, handle_hashing_busy)
+    app.after_request(drain_request_body)
+    app.after_request(pin_after_write)
+    startup_timer.init_app(app)
+
+    # Swagger UI es opcional (SWAGGER_UI): sin él no se importa flask_swagger_ui
+    if app.config['SWAGGER_UI']:
+        from flask_swagger_ui import get_swaggerui_blueprint
+        swaggerui_blueprint = get_swaggerui_blueprint(
+            SWAGGER_URL,            # URL para acceder a Swagger UI
+            compression.static_assets.url(API_URL, 'swagger.yaml'),  # Ruta del archivo YAML (versionada)
+            config={                # Configuraciones opcionales
+                'app_name': "API de Usuarios"
+            }
+        )
+        app.register_blueprint(swaggerui_blueprint, url_prefix=SWAGGER_URL)
+
+    # La creación del esquema no forma parte del arranque: python init_db.py
+    return app
+
+
+if __name__ == '__main__':
+    # Servidor de desarrollo; en producción se usa gunicorn con wsgi.py
+    create_app().run(debug=True)
@@ -0,0 +1,9 @@
+# asgi.py
+# Punto de entrada del modo asíncrono: hypercorn -b 0.0.0.0:5000 -w 4 asgi:app
+from startup import startup_timer  # Primero: marca el inicio del arranque
+
+from async_app import create_async_app
+
+startup_timer.mark('importación')
+app = create_async_app()
+startup_timer.mark('create_app')
@@ -0,0 +1,697 @@
+# async_app.py
+# Modo de servicio asíncrono (ASGI) para las rutas /usuarios y /auth. Mantiene las mismas URL
+# y respuestas que app.py, pero con Quart y sesiones asíncronas de SQLAlchemy, de modo que un
+# proceso atiende miles de peticiones en curso sin bloquear un hilo por cada una.
+# No admite USERS_SHARD_URIS ni REPLICA_URIS (create_async_app falla al arrancar) y no comprime
+# respuestas ni sirve Swagger.
+# Producción: hypercorn asgi:app  |  Local: DATABASE_URL=sqlite:///usuarios.db hypercorn asgi:app
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+
+import jwt as pyjwt
+from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
+from quart import Blueprint, Quart, Response, current_app, g, jsonify, request
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import hashing
+import metrics
+from app import (
+    EXPORT_FORMATS,
+    NDJSON_MIMETYPES,
+    RESET_TOKEN_EXPIRES,
+    USER_DETAIL_COLUMNS,
+    USER_LIST_COLUMNS,
+    bulk_create_candidates,
+    bulk_create_report,
+    bulk_delete_keys,
+    bulk_delete_report,
+    bulk_delete_statements,
+    can_bulk_delete,
+    bulk_existing_query,
+    bulk_new_candidates,
+    bulk_record_inserted,
+    bulk_user_rows,
+    configure_mail_queue,
+    decode_cursor,
+    delete_by_ids,
+    encode_cursor,
+    enqueue_reset_email,
+    expired_revocations,
+    export_batch_query,
+    export_chunk,
+    export_header,
+    forget_deleted_users,
+    ndjson_items,
+    revocation_row,
+    revocation_sync_query,
+    token_revocation,
+    reset_revocations,
+)
+from config import Config
+from count_cache import user_count_cache
+from db_pool import engine_options
+from etag_cache import list_etag, user_etag, user_etags, users_table_version
+from hashing import HashingBusyError, hash_password_async, hash_passwords_async, needs_rehash, verify_password_async
+from json_provider import json_provider_class
+from models import RevokedToken, User
+from revocation import token_blocklist
+from search import search_backends, search_index_probe, search_query, validate_search
+from startup import startup_timer
+from token_cache import VerifiedTokenCache
+from validators import UserValidator
+
+api = Blueprint('api_async', __name__)
+
+# Controladores asíncronos equivalentes a los síncronos de cada dialecto
+ASYNC_DRIVERS = {
+    'mysql': 'mysql+aiomysql',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+
+def async_database_uri(uri):
+    url = make_url(uri)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+
+
+# --- JWT compatible con flask-jwt-extended (los tokens sirven en ambos modos) ---
+
+def create_access_token(identity, expires_delta=None):
+    now = datetime.now(timezone.utc)
+    if expires_delta is None:
+        expires_delta = current_app.config.get('JWT_ACCESS_TOKEN_EXPIRES', timedelta(minutes=15))
+    claims = {
+        'fresh': False,
+        'iat': round(now.timestamp(), 3),  # Milisegundos, como issued_at_claims
+        'jti': str(uuid.uuid4()),
+        'type': 'access',
+        'sub': identity,
+        'nbf': now,
+    }
+    if expires_delta:
+        claims['exp'] = now + expires_delta
+    return pyjwt.encode(claims, current_app.config['JWT_SECRET_KEY'], algorithm='HS256')
+
+
+def decode_token(encoded_token):
+    secret = current_app.config['JWT_SECRET_KEY']
+    cache = current_app.extensions['token_cache']
+    claims = cache.get(encoded_token, secret)
+    if claims is None:
+        claims = pyjwt.decode(encoded_token, secret, algorithms=['HS256'])
+        cache.put(encoded_token, secret, claims)
+    return claims
+
+
+def jwt_required(fn):
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        header = request.headers.get('Authorization')
+        if not header:
+            return jsonify({'msg': 'Missing Authorization Header'}), 401
+        parts = header.split()
+        if len(parts) != 2 or parts[0] != 'Bearer':
+            return jsonify({'msg': "Bad Authorization header. Expected 'Authorization: Bearer <JWT>'"}), 422
+        try:
+            claims = decode_token(parts[1])
+        except ExpiredSignatureError:
+            return jsonify({'msg': 'Token has expired'}), 401
+        except InvalidTokenError as e:
+            return jsonify({'msg': str(e)}), 422
+        if claims.get('type') != 'access':
+            return jsonify({'msg': 'Only non-refresh tokens are allowed'}), 422
+        if await token_revoked(claims):
+            return jsonify({'msg': 'Token has been revoked'}), 401
+        g.jwt_claims = claims
+        g.jwt_identity = claims['sub']
+        return await fn(*args, **kwargs)
+    return wrapper
+
+
+def get_jwt_identity():
+    return g.jwt_identity
+
+
+def get_jwt():
+    return g.jwt_claims
+
+
+# --- Revocación de tokens (misma tabla y filtro que app.py) ---
+
+async def sync_revocations():
+    mode = token_blocklist.sync_due(
+        current_app.config['JWT_REVOCATION_SYNC_INTERVAL'], current_app.config['JWT_REVOCATION_REBUILD_INTERVAL']
+    )
+    if mode is None:
+        return
+    async with current_app.extensions['async_engine'].begin() as connection:
+        if mode == 'full':
+            await connection.execute(expired_revocations())
+        rows = (await connection.execute(revocation_sync_query(mode, token_blocklist.since()))).all()
+    if mode == 'full':
+        token_blocklist.load(rows)
+    else:
+        token_blocklist.merge(rows)
+
+
+async def token_revoked(claims):
+    await sync_revocations()
+    revoked = token_blocklist.check(claims)
+    if revoked is None:
+        async with current_app.extensions['async_engine'].connect() as connection:
+            revoked = await connection.scalar(select(RevokedToken.id).where(RevokedToken.jti == claims['jti'])) is not None
+        token_blocklist.record_lookup(revoked)
+    return revoked
+
+
+async def revoke_token(claims):
+    values = token_revocation(claims)
+    try:
+        async with current_app.extensions['async_engine'].begin() as connection:
+            await connection.execute(insert(RevokedToken).values(**values))
+    except IntegrityError:
+        pass
+    token_blocklist.add(revocation_row(values))
+
+
+def session():
+    return current_app.extensions['async_session']()
+
+
+# --- Rutas ---
+
+async def users_total(db_session, with_total):
+    if with_total == 'false':
+        return None
+    total = user_count_cache.peek(
+        max_staleness=current_app.config['USERS_COUNT_MAX_STALENESS'],
+        approximate=(with_total == 'approx'),
+    )
+    if total is None:
+        total = user_count_cache.store(await db_session.scalar(select(func.count(User.id))))
+    return total
+
+
+async def users_version(db_session):
+    # Como en app.py: máximos de la tabla y el total en caché (COUNT(*) solo si ha caducado)
+    version = users_table_version.peek(current_app.config['USERS_ETAG_MAX_STALENESS'])
+    if version is None:
+        generation = users_table_version.generation
+        max_id, max_updated_at = (await db_session.execute(select(func.max(User.id), func.max(User.updated_at)))).one()
+        total = await users_total(db_session, 'true')
+        version = users_table_version.store((total, max_id, max_updated_at), generation)
+    return version
+
+
+def with_etag(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def not_modified(etag):
+    return with_etag(Response('', status=304), etag)
+
+
+@api.route('/usuarios/', methods=['GET'])
+@jwt_required
+async def get_users():
+    limit = request.args.get('limit', 10, type=int)
+    limit = max(1, min(limit, current_app.config['USERS_PAGE_LIMIT_MAX']))
+    with_total = request.args.get('with_total', 'true').lower()
+    if with_total not in ('true', 'false', 'approx'):
+        return jsonify({'error': "with_total debe ser 'true', 'false' o 'approx'"}), 400
+
+    query = select(*USER_LIST_COLUMNS).order_by(User.id)
+    if 'after' in request.args:
+        last_id = decode_cursor(request.args.get('after'))
+        if last_id is None:
+            return jsonify({'error': 'Cursor inválido'}), 400
+        query = query.where(User.id > last_id).limit(limit + 1)
+        response = {'limit': limit}
+        position = ('after', last_id)
+    else:
+        page = max(1, request.args.get('page', 1, type=int))
+        query = query.offset((page - 1) * limit).limit(limit)
+        response = {'page': page, 'limit': limit}
+        position = ('page', page)
+
+    async with session() as db_session:
+        total = await users_total(db_session, with_total)
+        etag = list_etag(await users_version(db_session), *position, limit, total)
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+        users = (await db_session.execute(query)).all()
+
+    if 'after' in request.args:
+        response['next_cursor'] = encode_cursor(users[limit - 1].id) if len(users) > limit else None
+        users = users[:limit]
+    response['users'] = [{'id': user.id, 'nombre': user.username, 'email': user.email} for user in users]
+    if total is not None:
+        response['total'] = total
+    return with_etag(jsonify(response), etag)
+
+
+async def users_search_backend(db_session):
+    engine = current_app.extensions['async_engine']
+    backend = search_backends.get(engine.url)
+    if backend is None:
+        probe = search_index_probe(engine.dialect.name)
+        found = probe is not None and (await db_session.execute(probe)).first() is not None
+        backend = search_backends[engine.url] = engine.dialect.name if found else 'like'
+    return backend
+
+
+@api.route('/usuarios/buscar', methods=['GET'])
+@jwt_required
+async def search_users():
+    q = request.args.get('q', '').strip()
+    mode = request.args.get('mode', 'substring').lower()
+    error = validate_search(q, mode)
+    if error:
+        return jsonify({'error': error}), 400
+    last_id = decode_cursor(request.args.get('after'))
+    if last_id is None:
+        return jsonify({'error': 'Cursor inválido'}), 400
+    limit = request.args.get('limit', 10, type=int)
+    limit = max(1, min(limit, current_app.config['USERS_PAGE_LIMIT_MAX']))
+
+    async with session() as db_session:
+        backend = await users_search_backend(db_session)
+        users = (await db_session.execute(search_query(backend, q, mode, last_id, limit + 1))).all()
+    return jsonify({
+        'limit': limit,
+        'next_cursor': encode_cursor(users[limit - 1].id) if len(users) > limit else None,
+        'users': [{'id': user.id, 'nombre': user.username, 'email': user.email} for user in users[:limit]]
+    })
+
+
+@api.route('/usuarios/<int:id>', methods=['GET'])
+@jwt_required
+async def get_user(id):
+    etag = user_etags.get(id, current_app.config['USERS_ETAG_MAX_STALENESS'])
+    if etag is not None and request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+
+    async with session() as db_session:
+        user = (await db_session.execute(select(*USER_DETAIL_COLUMNS).where(User.id == id))).first()
+    if user:
+        etag = user_etag(user)
+        user_etags.store(id, etag)
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+        return with_etag(jsonify({
+            'id': user.id,
+            'nombre': user.username,
+            'email': user.email,
+            'created_at': user.created_at,
+            'updated_at': user.updated_at
+        }), etag)
+    user_etags.invalidate(id)
+    return jsonify({'error': 'Usuario no encontrado'}), 404
+
+
+@api.route('/usuarios/', methods=['POST'])
+async def register_user():
+    data = await request.get_json(silent=True)
+    try:
+        UserValidator.validate_create_user(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    password_hash = await hash_password_async(data['clave'])
+    new_user = User(username=data['nombre'], email=data['email'], password_hash=password_hash)
+    async with session() as db_session:
+        try:
+            db_session.add(new_user)
+            await db_session.commit()
+        except IntegrityError as e:
+            await db_session.rollback()
+            if 'unique constraint' in str(e.orig):
+                return jsonify({'error': 'El usuario ya existe.'}), 409
+            return jsonify({'error': 'Error al crear el usuario.'}), 500
+    user_count_cache.adjust(1)
+    users_table_version.invalidate()
+    return jsonify({'id': new_user.id, 'nombre': new_user.username, 'email': new_user.email}), 201
+
+
+async def insert_user_rows(db_session, rows):
+    # Igual que en app.py: INSERT de varias filas y, si alguna ya existe, fila a fila
+    statement = insert(User.__table__)
+    try:
+        await db_session.execute(statement, [row for _, row in rows])
+        await db_session.commit()
+        return rows
+    except IntegrityError:
+        await db_session.rollback()
+    inserted = []
+    for index, row in rows:
+        try:
+            await db_session.execute(statement, [row])
+            await db_session.commit()
+            inserted.append((index, row))
+        except IntegrityError:
+            await db_session.rollback()
+    return inserted
+
+
+async def create_users_bulk(items, chunk_size):
+    results, candidates = bulk_create_candidates(items)
+    async with session() as db_session:
+        # Los conflictos se descartan antes de calcular los hashes
+        pending = []
+        for start in range(0, len(candidates), chunk_size):
+            chunk = candidates[start:start + chunk_size]
+            existing = (await db_session.execute(bulk_existing_query(chunk))).all()
+            pending.extend(bulk_new_candidates(chunk, existing, results))
+        await db_session.commit()
+
+        hashes = await hash_passwords_async([item['clave'] for _, item in pending])
+
+        for start in range(0, len(pending), chunk_size):
+            rows = bulk_user_rows(pending[start:start + chunk_size], hashes[start:start + chunk_size])
+            inserted = await insert_user_rows(db_session, rows)
+            ids = {}
+            if inserted:
+                ids = dict((await db_session.execute(select(User.email, User.id).where(
+                    User.email.in_([row['email'] for _, row in inserted])
+                ))).all())
+                await db_session.commit()
+            bulk_record_inserted(rows, inserted, ids, results)
+    return results
+
+
+@api.route('/usuarios/bulk', methods=['POST'])
+@jwt_required
+async def register_users_bulk():
+    if request.mimetype in NDJSON_MIMETYPES:
+        items = ndjson_items(await request.get_data(as_text=True))
+    else:
+        items = await request.get_json(silent=True)
+        if not isinstance(items, list):
+            return jsonify({'error': 'Se esperaba una lista de usuarios'}), 400
+
+    if len(items) > current_app.config['USERS_BULK_CREATE_MAX_ITEMS']:
+        return jsonify({'error': f"Máximo {current_app.config['USERS_BULK_CREATE_MAX_ITEMS']} usuarios por lote"}), 413
+
+    report, status = bulk_create_report(await create_users_bulk(items, current_app.config['USERS_BULK_CHUNK_SIZE']))
+    return jsonify(report), status
+
+
+async def export_stream(session_factory, export_format, batch_size, dumps):
+    # Bloques por clave primaria, cada uno en su propia sesión corta (como export_keyset en app.py)
+    header = export_header(export_format)
+    if header:
+        yield header
+    last_id = 0
+    while True:
+        async with session_factory() as db_session:
+            rows = (await db_session.execute(export_batch_query(last_id, batch_size))).all()
+        if rows:
+            yield export_chunk(export_format, rows, dumps)
+        if len(rows) < batch_size:
+            return
+        last_id = rows[-1].id
+
+
+@api.route('/usuarios/export', methods=['GET'])
+@jwt_required
+async def export_users():
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': "Formato no soportado, use 'ndjson' o 'csv'"}), 400
+
+    # El generador sigue después de devolver la respuesta: recibe lo que necesita del contexto
+    chunks = export_stream(
+        current_app.extensions['async_session'], export_format,
+        current_app.config['USERS_EXPORT_BATCH_SIZE'], current_app.json.dumps,
+    )
+    headers = {'Content-Disposition': f'attachment; filename=usuarios.{export_format}'}
+    return Response(chunks, mimetype=EXPORT_FORMATS[export_format], headers=headers)
+
+
+@api.route('/usuarios/actualizar', methods=['PUT'])
+@jwt_required
+async def update_user():
+    current_user_email = get_jwt_identity()
+    data = await request.get_json(silent=True)
+    try:
+        UserValidator.validate_update_user(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    email_to_update = data.get('email')
+
+    if current_user_email != email_to_update:
+        return jsonify({'error': 'No autorizado para actualizar este usuario'}), 403
+
+    async with session() as db_session:
+        user = await db_session.scalar(select(User).filter_by(email=email_to_update))
+        if user:
+            user.username = data.get('nombre', user.username)
+            user.email = data.get('email', user.email)
+            try:
+                await db_session.commit()
+            except IntegrityError:
+                await db_session.rollback()  # Nombre ya ocupado por otro usuario
+                return jsonify({'error': 'El usuario ya existe.'}), 409
+            user_etags.store(user.id, user_etag(user))
+            users_table_version.invalidate()
+            return jsonify({
+                'id': user.id,
+                'nombre': user.username,
+                'email': user.email,
+                'updated_at': user.updated_at
+            })
+    return jsonify({'error': 'Usuario no encontrado'}), 404
+
+
+async def delete_by_email(email):
+    async with session() as db_session:
+        user = await db_session.scalar(select(User).filter_by(email=email))
+        if not user:
+            return False
+        await db_session.delete(user)
+        await db_session.commit()
+    user_count_cache.adjust(-1)
+    user_etags.invalidate(user.id)
+    users_table_version.invalidate()
+    return True
+
+
+@api.route('/usuarios/eliminar', methods=['DELETE'])
+@jwt_required
+async def delete_user():
+    current_user_email = get_jwt_identity()
+    data = await request.get_json()
+    email_to_delete = data.get('email')
+
+    if current_user_email != email_to_delete:
+        return jsonify({'error': 'No autorizado para eliminar este usuario'}), 403
+
+    if await delete_by_email(email_to_delete):
+        return '', 204
+    return jsonify({'error': 'Usuario no encontrado'}), 404
+
+
+async def delete_users_bulk(column, keys, chunk_size):
+    found, ids = set(), []
+    returning = current_app.extensions['async_engine'].dialect.delete_returning
+    try:
+        async with session() as db_session:
+            for start in range(0, len(keys), chunk_size):
+                locking, deleting = bulk_delete_statements(column, keys[start:start + chunk_size], returning)
+                if deleting is not None:
+                    rows = (await db_session.execute(deleting.execution_options(synchronize_session=False))).all()
+                else:
+                    rows = (await db_session.execute(locking)).all()
+                    if rows:
+                        await db_session.execute(delete_by_ids([row[0] for row in rows]))
+                await db_session.commit()
+                found.update(row[1] for row in rows)
+                ids.extend(row[0] for row in rows)
+    finally:
+        if ids:
+            forget_deleted_users(ids)
+    return found
+
+
+@api.route('/usuarios/bulk', methods=['DELETE'])
+@jwt_required
+async def delete_users_batch():
+    if not can_bulk_delete(get_jwt_identity(), current_app.config):
+        return jsonify({'error': 'No autorizado para eliminar usuarios en lote'}), 403
+    data = await request.get_json(silent=True)
+    try:
+        UserValidator.validate_bulk_delete(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    column, keys = bulk_delete_keys(data)
+    if len(keys) > current_app.config['USERS_BULK_MAX_ITEMS']:
+        return jsonify({'error': f"Máximo {current_app.config['USERS_BULK_MAX_ITEMS']} usuarios por lote"}), 413
+
+    found = await delete_users_bulk(column, keys, current_app.config['USERS_BULK_DELETE_CHUNK_SIZE'])
+    return jsonify(bulk_delete_report(keys, found)), 200
+
+
+@api.route('/usuarios/verificar_y_eliminar', methods=['DELETE'])
+async def verify_and_delete_user_by_email():
+    data = await request.get_json()
+    email = data.get('email')
+
+    if not email:
+        return jsonify({'error': 'El correo electrónico es obligatorio.'}), 400
+
+    if await delete_by_email(email):
+        return jsonify({'mensaje': 'Usuario eliminado exitosamente.'}), 200
+    return jsonify({'error': 'Usuario no encontrado.'}), 404
+
+
+@api.route('/auth/logout', methods=['POST'])
+@jwt_required
+async def logout():
+    await revoke_token(get_jwt())
+    return jsonify({'mensaje': 'Sesión cerrada.'}), 200
+
+
+@api.route('/auth/login', methods=['POST'])
+async def login():
+    data = await request.get_json()
+
+    if 'email' not in data or 'clave' not in data:
+        return jsonify({'error': 'Faltan campos'}), 400
+
+    async with session() as db_session:
+        user = (await db_session.execute(
+            select(User.id, User.email, User.password_hash).filter_by(email=data['email'])
+        )).first()
+
+        if user and await verify_password_async(user.password_hash, data['clave']):
+            # Actualizar el hash si se generó con otro método o coste (sin tocar updated_at)
+            if needs_rehash(user.password_hash):
+                await db_session.execute(update(User).where(User.id == user.id).values(
+                    password_hash=await hash_password_async(data['clave']), updated_at=User.updated_at
+                ))
+                await db_session.commit()
+
+            access_token = create_access_token(identity=user.email)
+            return jsonify({'token': access_token}), 200
+
+    return jsonify({'error': 'Credenciales incorrectas'}), 401
+
+
+@api.route('/auth/reset_password', methods=['POST'])
+async def request_password_reset():
+    data = await request.get_json()
+    email = data.get('email')
+
+    if not email:
+        return jsonify({'error': 'El correo electrónico es obligatorio.'}), 400
+
+    async with session() as db_session:
+        user = (await db_session.execute(select(User.email).filter_by(email=email))).first()
+
+    if user:
+        # Crear token de restablecimiento de contraseña (válido por 30 minutos)
+        reset_token = create_access_token(identity=user.email, expires_delta=RESET_TOKEN_EXPIRES)
+        reset_link = f"http://localhost:5000/auth/reset_password/{reset_token}"
+        await asyncio.to_thread(enqueue_reset_email, user.email, reset_link)  # Escritura en SQLite
+
+        return jsonify({
+            'mensaje': 'Se ha enviado un enlace para restablecer la contraseña al correo electrónico proporcionado.',
+            'token para restablecer contraseña': reset_link
+        }), 200
+    return jsonify({'error': 'El usuario no existe.'}), 404
+
+
+@api.route('/auth/reset_password/<string:token>', methods=['POST'])
+async def reset_password(token):
+    data = await request.get_json()
+    new_password = data.get('new_password')
+
+    if new_password is None:
+        return jsonify({'error': 'La nueva contraseña es obligatoria.'}), 400
+
+    try:
+        decoded = decode_token(token)
+    except ExpiredSignatureError:
+        return jsonify({'error': 'El token ha expirado.'}), 400
+    except InvalidTokenError:
+        return jsonify({'error': 'Token inválido.'}), 401
+    if await token_revoked(decoded):
+        return jsonify({'error': 'Token inválido.'}), 401
+
+    async with session() as db_session:
+        user_id = await db_session.scalar(select(User.id).filter_by(email=decoded['sub']))
+        if user_id is not None:
+            await db_session.execute(update(User).where(User.id == user_id).values(
+                password_hash=await hash_password_async(new_password)
+            ))
+            revocations = reset_revocations(decoded, current_app.config)
+            await db_session.execute(insert(RevokedToken), revocations)
+            try:
+                await db_session.commit()
+            except IntegrityError:
+                # Otra petición usó el mismo enlace a la vez y ya lo revocó
+                await db_session.rollback()
+                return jsonify({'error': 'Token inválido.'}), 401
+            for revocation in revocations:
+                token_blocklist.add(revocation_row(revocation))
+            user_etags.invalidate(user_id)
+            users_table_version.invalidate()
+            return jsonify({'mensaje': 'Contraseña restablecida exitosamente.'}), 200
+    return jsonify({'error': 'Usuario no encontrado.'}), 404
+
+
+async def handle_hashing_busy(error):
+    return jsonify({'error': 'Servidor ocupado, inténtelo de nuevo.'}), 503
+
+
+# Fábrica de la aplicación asíncrona
+def create_async_app(config_object=Config):
+    app = Quart(__name__)
+    app.config.from_object(config_object)
+    if app.config['USERS_SHARD_URIS']:
+        # Las rutas asíncronas solo usan la base de datos por defecto
+        raise RuntimeError('USERS_SHARD_URIS no está soportado en el modo asíncrono; use wsgi.py')
+    if app.config['REPLICA_URIS']:
+        # Las lecturas en réplicas (y la lectura de las propias escrituras) solo existen en app.py
+        raise RuntimeError('REPLICA_URIS no está soportado en el modo asíncrono; use wsgi.py')
+    app.json = json_provider_class(app.config['JSON_PROVIDER'])(app)
+
+    # Mismas opciones de pool que el modo síncrono (el pool de asyncio ya es de cola)
+    options = engine_options(app.config['SQLALCHEMY_DATABASE_URI'], app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    options.pop('poolclass', None)
+    engine = create_async_engine(async_database_uri(app.config['SQLALCHEMY_DATABASE_URI']), **options)
+    app.extensions['async_engine'] = engine
+    app.extensions['async_session'] = async_sessionmaker(engine, expire_on_commit=False)
+    app.extensions['token_cache'] = VerifiedTokenCache(app.config.get('JWT_TOKEN_CACHE_SIZE', 1024))
+    user_etags.max_size = app.config['USERS_ETAG_CACHE_SIZE']
+    token_blocklist.configure(app.config['JWT_REVOCATION_CAPACITY'], app.config['JWT_REVOCATION_ERROR_RATE'])
+
+    hashing.configure(
+        method=app.config['PASSWORD_HASH_METHOD'],
+        cost=app.config['PASSWORD_HASH_COST'],
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        queue_size=app.config['PASSWORD_HASH_QUEUE_SIZE'],
+        queue_timeout=app.config['PASSWORD_HASH_QUEUE_TIMEOUT'],
+    )
+
+    configure_mail_queue(app.config)
+
+    app.register_blueprint(api)
+    app.register_error_handler(HashingBusyError, handle_hashing_busy)
+    # Latencia por ruta y consultas SQL por petición en GET /metrics
+    metrics.init_async_app(app, engine, token_cache=app.extensions['token_cache'], token_blocklist=token_blocklist)
+    startup_timer.init_app(app)
+
+    @app.after_serving
+    async def dispose_engine():
+        await engine.dispose()
+
+    return app
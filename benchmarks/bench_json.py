@@ -0,0 +1,67 @@
+# benchmarks/bench_json.py
+# Coste de codificar las respuestas con el proveedor JSON por defecto de Flask frente a los de
+# json_provider.py, por tamaño de payload. Comprueba además que la salida es idéntica byte a byte.
+#
+# Uso: python benchmarks/bench_json.py [--number N]
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from json_provider import OrjsonProvider, StdlibJSONProvider, orjson
+
+NOW = datetime(2024, 5, 17, 12, 30, 45)
+
+
+def user(index):
+    return {'id': index, 'nombre': f'Usuario {index}', 'email': f'usuario{index}@example.com'}
+
+
+def page(size):
+    return {'page': 1, 'limit': size, 'total': 250000, 'users': [user(index) for index in range(size)]}
+
+
+# (nombre, objeto, argumentos de dumps): las respuestas son compactas; la exportación NDJSON
+# usa los separadores por defecto
+PAYLOADS = [
+    ('usuario', {**user(1), 'created_at': NOW, 'updated_at': NOW + timedelta(days=3)}, {'separators': (',', ':')}),
+    ('página de 10', page(10), {'separators': (',', ':')}),
+    ('página de 100', page(100), {'separators': (',', ':')}),
+    ('página de 1000', page(1000), {'separators': (',', ':')}),
+    ('fila de exportación', {**user(1), 'created_at': NOW, 'updated_at': NOW}, {}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Proveedores JSON por tamaño de payload')
+    parser.add_argument('--number', type=int, default=200, help='codificaciones por medición')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    providers = [('flask', DefaultJSONProvider(app)), ('stdlib', StdlibJSONProvider(app))]
+    if orjson is not None:
+        providers.append(('orjson', OrjsonProvider(app)))
+    else:
+        print('orjson no está instalado: solo se mide el proveedor stdlib')
+
+    print(f"{'payload':22}{'bytes':>9}" + ''.join(f'{name + " µs":>14}' for name, _ in providers) + f"{'mejora':>9}")
+    for label, payload, kwargs in PAYLOADS:
+        reference = providers[0][1].dumps(payload, **kwargs)
+        timings = []
+        for name, provider in providers:
+            if provider.dumps(payload, **kwargs) != reference:
+                raise SystemExit(f'{name}: salida distinta para {label}')
+            seconds = min(timeit.repeat(lambda: provider.dumps(payload, **kwargs), number=args.number, repeat=5))
+            timings.append(seconds / args.number * 1e6)
+        print(f'{label:22}{len(reference):>9}' + ''.join(f'{value:>14.1f}' for value in timings)
+              + f'{timings[0] / timings[-1]:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
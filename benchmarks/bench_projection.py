@@ -0,0 +1,86 @@
+# benchmarks/bench_projection.py
+# Coste de construir una página grande del listado cargando entidades User completas (con
+# password_hash y el identity map) frente a la consulta de columnas que usa app.py.
+# Mide latencia (mejor de varias repeticiones) y memoria reservada con tracemalloc.
+#
+# Uso: python benchmarks/bench_projection.py [--users N] [--page-size N] [--number N]
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+from werkzeug.security import generate_password_hash
+
+from app import USER_LIST_COLUMNS, create_app
+from config import Config
+from models import db, User
+from seed_db import generate_rows, seed
+
+
+def entity_page(offset, limit):
+    users = User.query.order_by(User.id).offset(offset).limit(limit).all()
+    return [{'id': user.id, 'nombre': user.username, 'email': user.email} for user in users]
+
+
+def projection_page(offset, limit):
+    users = db.session.execute(select(*USER_LIST_COLUMNS).order_by(User.id).offset(offset).limit(limit)).all()
+    return [{'id': user.id, 'nombre': user.username, 'email': user.email} for user in users]
+
+
+def run(fn, offset, limit):
+    try:
+        return fn(offset, limit)
+    finally:
+        db.session.remove()  # Como al final de cada petición
+
+
+def measure_memory(fn, offset, limit):
+    run(fn, offset, limit)  # Calentar cachés de compilación antes de medir
+    tracemalloc.start()
+    run(fn, offset, limit)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Entidades completas frente a proyecciones')
+    parser.add_argument('--users', type=int, default=20000, help='usuarios en la tabla')
+    parser.add_argument('--page-size', type=int, default=1000, help='usuarios por página')
+    parser.add_argument('--number', type=int, default=20, help='páginas por medición')
+    args = parser.parse_args()
+
+    database_path = tempfile.mktemp(suffix='.db')
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{database_path}'
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        # Hash con el mismo tamaño que uno real de scrypt: es lo que arrastra la entidad completa
+        password_hash = generate_password_hash('password123')
+        seed([db.engine], generate_rows(0, 0, args.users), password_hash, 1000, 0)
+        offset = max(0, args.users // 2 - args.page_size // 2)
+
+        print(f'{args.users} usuarios, página de {args.page_size}, {args.number} páginas por medición')
+        results = {}
+        for name, fn in (('entidades', entity_page), ('proyección', projection_page)):
+            seconds = min(timeit.repeat(lambda: run(fn, offset, args.page_size), number=args.number, repeat=5))
+            results[name] = (seconds / args.number, measure_memory(fn, offset, args.page_size))
+            print(f'{name:12} {results[name][0] * 1000:8.2f} ms/página  pico {results[name][1] / 1024:8.1f} KiB')
+
+        (entity_time, entity_peak), (projection_time, projection_peak) = results['entidades'], results['proyección']
+        print(f'proyección: {entity_time / projection_time:.2f}x más rápida, '
+              f'{entity_peak / projection_peak:.2f}x menos memoria pico')
+
+    os.remove(database_path)
+
+
+if __name__ == '__main__':
+    main()
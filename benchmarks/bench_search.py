@@ -0,0 +1,71 @@
+# benchmarks/bench_search.py
+# Latencia de GET /usuarios/buscar con el índice FTS5 (trigram) frente a LIKE sobre la tabla,
+# en SQLite, para búsquedas poco y muy frecuentes. Con LIKE el coste crece con la tabla; con el
+# índice depende de cuántas filas coinciden.
+#
+# Uso: python benchmarks/bench_search.py [--users N] [--limit N] [--number N]
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import Config
+from models import db
+from search import create_search_index, search_query
+from seed_db import generate_rows, seed
+
+# (descripción, texto, modo) sobre los datos de seed_db.py: 'Nombre Apellido N' y
+# 'nombre.apellido.N@dominio'
+QUERIES = [
+    ('subcadena poco frecuente', '.12345@', 'substring'),
+    ('subcadena frecuente', 'hotmail', 'substring'),
+    ('prefijo', 'andrew', 'prefix'),
+    ('sin resultados', 'zzzqqq', 'substring'),
+]
+
+
+def run(backend, q, mode, limit):
+    try:
+        return db.session.execute(search_query(backend, q, mode, 0, limit + 1)).all()
+    finally:
+        db.session.remove()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Búsqueda con índice FTS5 frente a LIKE')
+    parser.add_argument('--users', type=int, default=200000, help='usuarios en la tabla')
+    parser.add_argument('--limit', type=int, default=10, help='resultados por página')
+    parser.add_argument('--number', type=int, default=20, help='búsquedas por medición')
+    args = parser.parse_args()
+
+    database_path = tempfile.mktemp(suffix='.db')
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{database_path}'
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        seed([db.engine], generate_rows(0, 0, args.users), 'x', 5000, 0)
+        with db.engine.begin() as connection:
+            create_search_index(connection)
+
+        print(f'{args.users} usuarios, páginas de {args.limit}')
+        print(f"{'búsqueda':28}{'filas':>7}{'LIKE ms':>10}{'FTS5 ms':>10}{'mejora':>9}")
+        for label, q, mode in QUERIES:
+            timings = []
+            for backend in ('like', 'sqlite'):
+                rows = run(backend, q, mode, args.limit)
+                seconds = min(timeit.repeat(lambda: run(backend, q, mode, args.limit), number=args.number, repeat=3))
+                timings.append(seconds / args.number * 1000)
+            print(f'{label:28}{len(rows):>7}{timings[0]:>10.2f}{timings[1]:>10.2f}{timings[0] / timings[1]:>8.1f}x')
+
+    os.remove(database_path)
+
+
+if __name__ == '__main__':
+    main()
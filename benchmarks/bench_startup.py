@@ -0,0 +1,106 @@
+# benchmarks/bench_startup.py
+# Arranque en frío: cada ejecución es un proceso nuevo (python -X importtime) que importa la
+# aplicación, llama a create_app() y atiende una primera petición (GET /usuarios/ sin token,
+# que no toca la base de datos). Muestra la mediana de cada fase y el tiempo de importación de
+# los módulos del proyecto y de las dependencias que importan directamente.
+# Con --budget-ms termina con código 1 si la mediana del arranque supera el presupuesto (CI).
+#
+# Uso: python benchmarks/bench_startup.py [--runs N] [--top N] [--budget-ms MS] [--no-swagger]
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIRST_PARTY = {name[:-3] for name in os.listdir(ROOT) if name.endswith('.py')}
+
+PROBE = '''
+import json, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+app.test_client().get('/usuarios/')
+served = time.perf_counter()
+print(json.dumps({'importación': imported - start, 'create_app': created - imported, 'primera petición': served - created}))
+'''
+
+
+def parse_importtime(output):
+    # -X importtime escribe cada módulo después de sus dependencias, con una sangría de dos
+    # espacios por nivel: 'import time: propio | acumulado | nombre'. Devuelve
+    # {nombre: (acumulado en segundos, módulo que lo importó)}.
+    modules, pending = {}, {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        for child in pending.pop(depth + 1, []):
+            modules[child] = (modules[child][0], name)
+        modules[name] = (int(cumulative) / 1e6, None)
+        pending.setdefault(depth, []).append(name)
+    return modules
+
+
+def cold_start(env):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE], cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+    phases = json.loads(result.stdout.strip().splitlines()[-1])
+    phases['proceso completo'] = elapsed
+    return phases, parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tiempo de arranque en frío de la aplicación')
+    parser.add_argument('--runs', type=int, default=5, help='arranques a medir')
+    parser.add_argument('--top', type=int, default=15, help='módulos a mostrar')
+    parser.add_argument('--budget-ms', type=float, help='máximo para la mediana del proceso completo')
+    parser.add_argument('--no-swagger', action='store_true', help='arrancar con SWAGGER_UI=false')
+    args = parser.parse_args()
+
+    database_path = tempfile.mktemp(suffix='.db')
+    env = {
+        **os.environ,
+        'DATABASE_URL': f'sqlite:///{database_path}',
+        'MAIL_WORKERS': '0',
+        'SWAGGER_UI': 'false' if args.no_swagger else 'true',
+    }
+    runs = [cold_start(env) for _ in range(args.runs)]
+
+    print(f'{args.runs} arranques en frío (mediana)')
+    for phase in runs[0][0]:
+        print(f'  {phase:20}{statistics.median(run[0][phase] for run in runs) * 1000:>9.1f} ms')
+
+    # Módulos del proyecto y lo que importan directamente (cada uno con sus dependencias)
+    timings = {}
+    for _, modules in runs:
+        for name, (cumulative, parent) in modules.items():
+            if name in FIRST_PARTY or parent in FIRST_PARTY:
+                timings.setdefault(name, []).append(cumulative)
+    rows = sorted(((statistics.median(values), name) for name, values in timings.items()), reverse=True)
+    print(f"\n{'módulo':40}{'importación ms':>16}")
+    for seconds, name in rows[:args.top]:
+        print(f"{name + (' *' if name in FIRST_PARTY else ''):40}{seconds * 1000:>16.1f}")
+    print('* módulos del proyecto (incluyen lo que importan)')
+
+    if os.path.exists(database_path):
+        os.remove(database_path)
+    total = statistics.median(run[0]['proceso completo'] for run in runs) * 1000
+    if args.budget_ms is not None and total > args.budget_ms:
+        sys.exit(f'\nArranque en frío de {total:.0f} ms: supera el presupuesto de {args.budget_ms:.0f} ms')
+
+
+if __name__ == '__main__':
+    main()
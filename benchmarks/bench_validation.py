@@ -0,0 +1,59 @@
+# benchmarks/bench_validation.py
+# Coste de validar el cuerpo de una petición: jsonschema.validate() (reconstruye el
+# validador en cada llamada) frente a los validadores precompilados de validators.py.
+#
+# Uso: python benchmarks/bench_validation.py [--number N]
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jsonschema import ValidationError, validate
+from schemas import update_user_schema, user_schema
+from validators import UserValidator
+
+VALID_USER = {'nombre': 'Juan', 'email': 'juan@example.com', 'clave': 'password1'}
+INVALID_USER = {'nombre': 'Juan', 'email': 'juan@example.com', 'clave': '123'}
+VALID_UPDATE = {'nombre': 'Juan', 'email': 'juan@example.com'}
+
+
+def old_validate(data, schema):
+    try:
+        validate(instance=data, schema=schema)
+    except ValidationError:
+        pass
+
+
+def new_validate(fn, data):
+    try:
+        fn(data)
+    except ValueError:
+        pass
+
+
+CASES = [
+    ('crear usuario (válido)', lambda: old_validate(VALID_USER, user_schema),
+     lambda: new_validate(UserValidator.validate_create_user, VALID_USER)),
+    ('crear usuario (inválido)', lambda: old_validate(INVALID_USER, user_schema),
+     lambda: new_validate(UserValidator.validate_create_user, INVALID_USER)),
+    ('actualizar usuario (válido)', lambda: old_validate(VALID_UPDATE, update_user_schema),
+     lambda: new_validate(UserValidator.validate_update_user, VALID_UPDATE)),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de validación de esquemas')
+    parser.add_argument('--number', type=int, default=5000, help='llamadas por caso')
+    args = parser.parse_args()
+
+    print(f"{'caso':<30}{'antes (µs)':>12}{'después (µs)':>14}{'mejora':>9}")
+    for name, before, after in CASES:
+        before_us = min(timeit.repeat(before, number=args.number, repeat=3)) / args.number * 1e6
+        after_us = min(timeit.repeat(after, number=args.number, repeat=3)) / args.number * 1e6
+        print(f"{name:<30}{before_us:>12.1f}{after_us:>14.1f}{before_us / after_us:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
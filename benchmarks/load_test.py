@@ -0,0 +1,245 @@
+# benchmarks/load_test.py
+# Prueba de carga en proceso: levanta la aplicación sobre SQLite y genera tráfico mixto
+# (registro, login, listado, consulta, actualización y borrado) con los generadores de Faker
+# de features/steps. Informa throughput y latencias p50/p95/p99 por endpoint en JSON.
+#
+# Uso:
+#   python benchmarks/load_test.py --requests 2000 --concurrency 8 --output resultado.json
+#   python benchmarks/load_test.py --baseline resultado.json --max-regression 0.2
+# Con --baseline el proceso termina con código 1 si el p95 de algún endpoint empeora más
+# de lo permitido, para usarlo como etapa del pipeline antes de desplegar.
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'features', 'steps'))
+
+from config import Config
+from api_client import fake, generate_random_user
+
+# Peso relativo de cada operación en el tráfico generado
+DEFAULT_MIX = {
+    'register': 10,
+    'login': 15,
+    'list': 35,
+    'get': 25,
+    'update': 10,
+    'delete': 5,
+}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+class UserPool:
+    # Usuarios creados durante la prueba con su token; cada hilo toma y devuelve usuarios
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users = []
+        self._sequence = 0
+
+    def next_user_data(self):
+        # Datos de Faker con un sufijo único para que no choquen nombres ni correos
+        with self._lock:
+            self._sequence += 1
+            sequence = self._sequence
+        data = generate_random_user()
+        local, domain = data['email'].split('@', 1)
+        data['email'] = f'{local}.{sequence}@{domain}'
+        data['nombre'] = f"{data['nombre']} {sequence}"
+        return data
+
+    def add(self, user):
+        with self._lock:
+            self._users.append(user)
+
+    def sample(self, rng):
+        with self._lock:
+            return rng.choice(self._users) if self._users else None
+
+    def take(self, rng):
+        with self._lock:
+            if len(self._users) <= 1:
+                return None
+            return self._users.pop(rng.randrange(len(self._users)))
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, endpoint, seconds, ok):
+        with self._lock:
+            self.latencies.setdefault(endpoint, []).append(seconds)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+
+def run_operation(client, operation, users, rng):
+    # Devuelve (endpoint, ok) después de ejecutar una petición de la operación indicada
+    if operation == 'register':
+        data = users.next_user_data()
+        response = client.post('/usuarios/', json=data)
+        if response.status_code == 201:
+            users.add({'data': data, 'id': response.get_json()['id'], 'token': None})
+        return 'POST /usuarios/', response.status_code == 201
+
+    user = users.sample(rng)
+    if user is None:
+        return run_operation(client, 'register', users, rng)
+
+    if operation == 'login' or user['token'] is None:
+        response = client.post('/auth/login', json={'email': user['data']['email'], 'clave': user['data']['clave']})
+        if response.status_code == 200:
+            user['token'] = response.get_json()['token']
+        return 'POST /auth/login', response.status_code == 200
+
+    headers = {'Authorization': f"Bearer {user['token']}"}
+    if operation == 'list':
+        response = client.get(f'/usuarios/?page={rng.randint(1, 5)}&limit=20', headers=headers)
+        return 'GET /usuarios/', response.status_code == 200
+    if operation == 'get':
+        response = client.get(f"/usuarios/{user['id']}", headers=headers)
+        return 'GET /usuarios/<id>', response.status_code == 200
+    if operation == 'update':
+        data = {'nombre': f"{fake.name()} {rng.randint(0, 10 ** 9)}", 'email': user['data']['email']}
+        response = client.put('/usuarios/actualizar', json=data, headers=headers)
+        return 'PUT /usuarios/actualizar', response.status_code == 200
+    if operation == 'delete':
+        victim = users.take(rng)
+        if victim is None or victim['token'] is None:
+            if victim is not None:
+                users.add(victim)
+            return run_operation(client, 'list', users, rng)
+        response = client.delete('/usuarios/eliminar', json={'email': victim['data']['email']},
+                                 headers={'Authorization': f"Bearer {victim['token']}"})
+        return 'DELETE /usuarios/eliminar', response.status_code == 204
+    raise ValueError(f'Operación desconocida: {operation}')
+
+
+def build_app(database_path, password_hash_method):
+    class LoadTestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{database_path}'
+        PASSWORD_HASH_METHOD = password_hash_method
+
+    from app import create_app
+    from models import db
+    app = create_app(LoadTestConfig)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga de la API de usuarios')
+    parser.add_argument('--requests', type=int, default=2000, help='peticiones totales')
+    parser.add_argument('--concurrency', type=int, default=4, help='hilos cliente')
+    parser.add_argument('--seed-users', type=int, default=50, help='usuarios creados antes de medir')
+    parser.add_argument('--seed', type=int, default=1234, help='semilla de Faker y del generador de tráfico')
+    parser.add_argument('--mix', type=json.loads, default=DEFAULT_MIX, help='pesos por operación en JSON')
+    parser.add_argument('--password-hash-method', default='pbkdf2:sha256:1000',
+                        help='método de hash (uno barato mide la API y no el KDF)')
+    parser.add_argument('--database', help='fichero SQLite (por defecto uno temporal)')
+    parser.add_argument('--output', help='fichero donde guardar el resultado en JSON')
+    parser.add_argument('--baseline', help='resultado anterior con el que comparar')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='empeoramiento máximo del p95 (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    fake.seed_instance(args.seed)
+    database_path = args.database or tempfile.mktemp(suffix='.db')
+    app = build_app(database_path, args.password_hash_method)
+
+    users = UserPool()
+    recorder = Recorder()
+    setup_client, setup_rng = app.test_client(), random.Random(args.seed)
+    for _ in range(args.seed_users):
+        run_operation(setup_client, 'register', users, setup_rng)
+
+    operations = list(args.mix)
+    weights = [args.mix[operation] for operation in operations]
+    remaining = iter(range(args.requests))
+    remaining_lock = threading.Lock()
+
+    def worker(index):
+        client = app.test_client()
+        rng = random.Random(args.seed + index)
+        while True:
+            with remaining_lock:
+                if next(remaining, None) is None:
+                    return
+            operation = rng.choices(operations, weights)[0]
+            start = time.perf_counter()
+            endpoint, ok = run_operation(client, operation, users, rng)
+            recorder.record(endpoint, time.perf_counter() - start, ok)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(args.concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - started
+
+    endpoints = {}
+    for endpoint, values in sorted(recorder.latencies.items()):
+        values.sort()
+        endpoints[endpoint] = {
+            'count': len(values),
+            'errors': recorder.errors.get(endpoint, 0),
+            'throughput_rps': round(len(values) / duration, 2),
+            'mean_ms': round(sum(values) / len(values) * 1000, 3),
+            'p50_ms': round(percentile(values, 0.50) * 1000, 3),
+            'p95_ms': round(percentile(values, 0.95) * 1000, 3),
+            'p99_ms': round(percentile(values, 0.99) * 1000, 3),
+            'max_ms': round(values[-1] * 1000, 3),
+        }
+    result = {
+        'config': {
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'seed': args.seed,
+            'mix': args.mix,
+            'password_hash_method': args.password_hash_method,
+        },
+        'duration_s': round(duration, 3),
+        'throughput_rps': round(sum(e['count'] for e in endpoints.values()) / duration, 2),
+        'endpoints': endpoints,
+    }
+
+    output = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+
+    import hashing
+    hashing.shutdown()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = []
+        for endpoint, stats in endpoints.items():
+            previous = baseline.get('endpoints', {}).get(endpoint)
+            if previous and previous['p95_ms'] > 0 and stats['p95_ms'] > previous['p95_ms'] * (1 + args.max_regression):
+                regressions.append(f"{endpoint}: p95 {previous['p95_ms']} ms -> {stats['p95_ms']} ms")
+        if regressions:
+            print('Regresiones de latencia:\n  ' + '\n  '.join(regressions), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
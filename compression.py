@@ -0,0 +1,184 @@
+# compression.py
+# Compresión de respuestas negociada con Accept-Encoding (brotli si está instalado y el cliente lo
+# acepta; si no, gzip). Solo se comprimen tipos de texto (JSON, NDJSON, CSV, YAML...) a partir de
+# COMPRESSION_MIN_SIZE bytes; las respuestas en streaming se comprimen bloque a bloque, sin
+# conocer su tamaño. Los ficheros de static/ se comprimen una sola vez al arrancar y se sirven
+# con ETag y caché de larga duración.
+import hashlib
+import mimetypes
+import os
+import zlib
+from datetime import datetime, timezone
+
+from flask import Response, current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    'application/json', 'application/x-ndjson', 'application/yaml', 'application/javascript', 'image/svg+xml',
+}
+# mimetypes no conoce YAML en todas las versiones de Python
+STATIC_TYPES = {'.yaml': 'application/yaml', '.yml': 'application/yaml'}
+# Los estáticos se comprimen una vez: nivel máximo de gzip y brotli 10 (11 tarda el triple en
+# comprimir swagger.yaml al arrancar y solo reduce un 2 % más)
+STATIC_GZIP_LEVEL = 9
+STATIC_BROTLI_QUALITY = 10
+
+
+def available_encodings():
+    # En orden de preferencia cuando el cliente acepta varias con la misma calidad
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encodings, encodings=None):
+    # Codificación elegida para la petición o None (sin comprimir)
+    return accept_encodings.best_match(available_encodings() if encodings is None else encodings)
+
+
+def compressible(mimetype):
+    return mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES
+
+
+def compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31: formato gzip
+    return compressor.compress(data) + compressor.flush()
+
+
+def compressed_stream(chunks, encoding, level, close=None):
+    # Comprime un iterable de bytes a medida que se genera; close libera el iterable original
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        process, finish = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        process, finish = compressor.compress, compressor.flush
+    try:
+        for chunk in chunks:
+            data = process(chunk)
+            if data:
+                yield data
+        yield finish()
+    finally:
+        if close is not None:
+            close()
+
+
+def compress_response(response):
+    config = current_app.config
+    if (not config['COMPRESSION_ENABLED']
+            or response.direct_passthrough
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or not compressible(response.mimetype or '')
+            or response.cache_control.no_transform):
+        return response
+
+    # La representación depende de Accept-Encoding aunque esta respuesta no se comprima
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate(request.accept_encodings)
+    if encoding is None:
+        return response
+    level = config['COMPRESSION_BROTLI_QUALITY'] if encoding == 'br' else config['COMPRESSION_GZIP_LEVEL']
+
+    if response.is_streamed:
+        original = response.response
+        response.response = compressed_stream(
+            response.iter_encoded(), encoding, level, close=getattr(original, 'close', None)
+        )
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < config['COMPRESSION_MIN_SIZE']:
+            return response
+        response.set_data(compress(data, encoding, level))
+    response.headers['Content-Encoding'] = encoding
+
+    # Los bytes ya no son los del ETag fuerte: pasa a débil (las rutas comparan en modo débil)
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+class StaticAsset:
+    def __init__(self, path, mimetype):
+        with open(path, 'rb') as f:
+            data = f.read()
+        self.mimetype = mimetype
+        self.version = hashlib.blake2b(data, digest_size=8).hexdigest()
+        self.last_modified = datetime.fromtimestamp(os.path.getmtime(path), timezone.utc)
+        self.bodies = {None: data}
+        if compressible(mimetype):
+            variants = {'gzip': compress(data, 'gzip', STATIC_GZIP_LEVEL)}
+            if brotli is not None:
+                variants['br'] = compress(data, 'br', STATIC_BROTLI_QUALITY)
+            # Solo se guardan las variantes que ocupan menos que el original
+            self.bodies.update((encoding, body) for encoding, body in variants.items() if len(body) < len(data))
+
+
+class StaticAssets:
+    # Ficheros de static/ en memoria, con sus variantes comprimidas. La URL versionada
+    # (?v=<version>) se puede cachear sin revalidar; sin versión el cliente revalida con el ETag.
+    def __init__(self):
+        self.assets = {}
+        self.max_age = 31536000
+
+    def load(self, folder, max_age):
+        self.max_age = max_age
+        self.assets = {}
+        if not folder or not os.path.isdir(folder):
+            return
+        for directory, _, names in os.walk(folder):
+            for name in names:
+                path = os.path.join(directory, name)
+                filename = os.path.relpath(path, folder).replace(os.sep, '/')
+                extension = os.path.splitext(name)[1].lower()
+                mimetype = STATIC_TYPES.get(extension) or mimetypes.guess_type(name)[0] or 'application/octet-stream'
+                self.assets[filename] = StaticAsset(path, mimetype)
+
+    def version(self, filename):
+        asset = self.assets.get(filename)
+        return asset.version if asset else None
+
+    def url(self, url, filename):
+        # URL con la versión del contenido, para que los clientes la cacheen indefinidamente
+        version = self.version(filename)
+        return f'{url}?v={version}' if version else url
+
+    def serve(self, filename):
+        asset = self.assets.get(filename)
+        if asset is None:
+            return current_app.send_static_file(filename)
+
+        encoding = negotiate(request.accept_encodings, [encoding for encoding in available_encodings() if encoding in asset.bodies])
+        etag = asset.version + (f'-{encoding}' if encoding else '')
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = Response(asset.bodies[encoding], mimetype=asset.mimetype)
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+            response.last_modified = asset.last_modified
+        response.set_etag(etag)
+        response.vary.add('Accept-Encoding')
+        if request.args.get('v') == asset.version:
+            response.headers['Cache-Control'] = f'public, max-age={self.max_age}, immutable'
+        else:
+            response.headers['Cache-Control'] = 'public, no-cache'
+        return response
+
+
+static_assets = StaticAssets()
+
+
+def init_app(app):
+    # Se registra antes que los demás after_request para ejecutarse el último, ya con el
+    # cuerpo y las cabeceras definitivos
+    static_assets.load(app.static_folder, app.config['STATIC_MAX_AGE'])
+    app.view_functions['static'] = static_assets.serve
+    app.after_request(compress_response)
@@ -6,5 +6,131 @@ class Config:
     MYSQL_HOST = os.getenv('MYSQL_HOST', 'db')
     MYSQL_DB = os.getenv('MYSQL_DB', 'mydatabase')
     
-    SQLALCHEMY_DATABASE_URI = f'mysql+mysqlconnector://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DB}'
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    # DATABASE_URL permite usar otra base de datos (p. ej. sqlite:///usuarios.db en local)
+    SQLALCHEMY_DATABASE_URI = os.getenv(
+        'DATABASE_URL', f'mysql+mysqlconnector://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DB}'
+    )
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Pool de conexiones: tamaño, conexiones extra permitidas, espera máxima por una conexión,
+    # reciclado antes del wait_timeout de MySQL y comprobación previa de conexiones caídas
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true',
+    }
+
+    # Clave de firma de JWT: debe ser la misma en todos los procesos
+    JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'super-secret-key')  # Cambia esto por una clave más segura
+
+    # Límite máximo de usuarios por página en GET /usuarios/
+    USERS_PAGE_LIMIT_MAX = int(os.getenv('USERS_PAGE_LIMIT_MAX', 100))
+
+    # Antigüedad máxima (segundos) del total de usuarios en caché antes de reconciliar con COUNT(*)
+    USERS_COUNT_MAX_STALENESS = float(os.getenv('USERS_COUNT_MAX_STALENESS', 30))
+
+    # Creación de usuarios en lote: cada usuario cuesta un hash de contraseña (KDF), por eso el
+    # máximo por lote es mucho menor que el del borrado en lote (USERS_BULK_MAX_ITEMS). Un lote
+    # calcula a la vez max(1, PASSWORD_HASH_WORKERS // 2) hashes (hashing.hash_passwords) y un
+    # scrypt con el coste por defecto tarda unos 0,15 s por núcleo (~6-7 hashes/s por proceso).
+    # Con gunicorn.conf.py por defecto cada worker tiene un proceso de hashing: 100 usuarios
+    # tardan unos 15 s, la mitad de GUNICORN_TIMEOUT. Al subir este máximo hay que mantener
+    # máximo * 0,15 s / hashes en paralelo por debajo de GUNICORN_TIMEOUT.
+    USERS_BULK_CREATE_MAX_ITEMS = int(os.getenv('USERS_BULK_CREATE_MAX_ITEMS', 100))
+    USERS_BULK_MAX_ITEMS = int(os.getenv('USERS_BULK_MAX_ITEMS', 10000))
+    USERS_BULK_CHUNK_SIZE = int(os.getenv('USERS_BULK_CHUNK_SIZE', 1000))
+    # Borrado en lote: claves por DELETE (bloques pequeños mantienen cortos los bloqueos) y
+    # correos de los usuarios autorizados a usarlo (limpieza de pruebas), separados por comas.
+    # Vacío: nadie. Las cuentas deben existir antes, para que nadie pueda registrarse con ese correo.
+    USERS_BULK_DELETE_EMAILS = {email.strip() for email in os.getenv('USERS_BULK_DELETE_EMAILS', '').split(',') if email.strip()}
+    USERS_BULK_DELETE_CHUNK_SIZE = int(os.getenv('USERS_BULK_DELETE_CHUNK_SIZE', 500))
+
+    # Hash de contraseñas: algoritmo de werkzeug ('scrypt' o 'pbkdf2:sha256') y su coste
+    # (N de scrypt o iteraciones de pbkdf2; vacío usa el valor por defecto de werkzeug).
+    # Los hashes con parámetros antiguos se regeneran al iniciar sesión.
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_HASH_COST = int(os.getenv('PASSWORD_HASH_COST', 0)) or None
+    # Procesos dedicados a calcular hashes (por proceso de la aplicación; gunicorn.conf.py reparte
+    # los núcleos entre sus workers), trabajos máximos en cola y espera por un hueco
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+    PASSWORD_HASH_QUEUE_SIZE = int(os.getenv('PASSWORD_HASH_QUEUE_SIZE', 64))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 5))
+
+    # Tokens JWT verificados que se mantienen en caché por proceso (0 la desactiva)
+    JWT_TOKEN_CACHE_SIZE = int(os.getenv('JWT_TOKEN_CACHE_SIZE', 1024))
+
+    # Revocación de tokens: cada cuántos segundos se leen las revocaciones nuevas de otros
+    # procesos, cada cuánto se reconstruye el filtro de Bloom (descarta las caducadas) y su
+    # capacidad y tasa de falsos positivos (cada falso positivo cuesta una consulta)
+    JWT_REVOCATION_SYNC_INTERVAL = float(os.getenv('JWT_REVOCATION_SYNC_INTERVAL', 5))
+    JWT_REVOCATION_REBUILD_INTERVAL = float(os.getenv('JWT_REVOCATION_REBUILD_INTERVAL', 3600))
+    JWT_REVOCATION_CAPACITY = int(os.getenv('JWT_REVOCATION_CAPACITY', 100000))
+    JWT_REVOCATION_ERROR_RATE = float(os.getenv('JWT_REVOCATION_ERROR_RATE', 0.001))
+
+    # Sharding de usuarios: URIs de los shards separadas por comas (vacío: todo en
+    # SQLALCHEMY_DATABASE_URI). Las demás tablas siguen en la base de datos por defecto.
+    # Hilos por proceso para consultar los shards en paralelo.
+    USERS_SHARD_URIS = [uri.strip() for uri in os.getenv('USERS_SHARD_URIS', '').split(',') if uri.strip()]
+    USERS_SHARD_WORKERS = int(os.getenv('USERS_SHARD_WORKERS', 8))
+    # Con shards, desplazamiento máximo del modo ?page= (cada shard lee offset + limit filas);
+    # más allá hay que paginar por cursor (?after=)
+    USERS_SHARDED_MAX_OFFSET = int(os.getenv('USERS_SHARDED_MAX_OFFSET', 10000))
+
+    # Réplicas de lectura de SQLALCHEMY_DATABASE_URI: URIs separadas por comas (vacío: todo se
+    # lee del primario). Selección 'round_robin' o 'least_latency', retraso máximo (segundos) para
+    # seguir usando una réplica, cada cuánto se comprueban (menos que el retraso máximo) y cuántos
+    # segundos lee del primario un cliente después de escribir. No se combina con USERS_SHARD_URIS.
+    # python init_db.py crea el esquema también en las réplicas. Una réplica solo se usa cuando le
+    # llegan los latidos que se escriben en el primario (replicas.py): sin replicación (pruebas en
+    # local con SQLite) se indica el mismo fichero que el primario, p. ej.
+    # DATABASE_URL=sqlite:////tmp/app.db REPLICA_URIS=sqlite:////tmp/app.db
+    REPLICA_URIS = [uri.strip() for uri in os.getenv('REPLICA_URIS', '').split(',') if uri.strip()]
+    REPLICA_STRATEGY = os.getenv('REPLICA_STRATEGY', 'round_robin')
+    REPLICA_MAX_LAG = float(os.getenv('REPLICA_MAX_LAG', 2))
+    REPLICA_CHECK_INTERVAL = float(os.getenv('REPLICA_CHECK_INTERVAL', 1))
+    REPLICA_PIN_SECONDS = float(os.getenv('REPLICA_PIN_SECONDS', 5))
+
+    # Filas por bloque en GET /usuarios/export (una consulta por bloque, paginada por id)
+    USERS_EXPORT_BATCH_SIZE = int(os.getenv('USERS_EXPORT_BATCH_SIZE', 1000))
+
+    # ETags: usuarios cuyo ETag se recuerda por proceso y antigüedad máxima (segundos) de esos
+    # ETags y de la versión de la tabla antes de volver a consultar la base de datos
+    USERS_ETAG_CACHE_SIZE = int(os.getenv('USERS_ETAG_CACHE_SIZE', 4096))
+    USERS_ETAG_MAX_STALENESS = float(os.getenv('USERS_ETAG_MAX_STALENESS', 5))
+
+    # Compresión de respuestas (gzip, y brotli si está instalado): tamaño mínimo en bytes, nivel de
+    # gzip (1-9) y calidad de brotli (0-11) para las respuestas dinámicas. Los estáticos se
+    # comprimen una vez al arrancar y su URL versionada (?v=) se cachea STATIC_MAX_AGE segundos.
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+    STATIC_MAX_AGE = int(os.getenv('STATIC_MAX_AGE', 31536000))
+
+    # Swagger UI en /swagger (false no lo carga ni lo importa; /static/swagger.yaml sigue disponible)
+    SWAGGER_UI = os.getenv('SWAGGER_UI', 'true').lower() == 'true'
+    # Registrar en el log los tiempos de arranque al atender la primera petición (startup.py)
+    STARTUP_REPORT = os.getenv('STARTUP_REPORT', 'false').lower() == 'true'
+
+    # Codificador JSON de las respuestas: 'auto' (orjson si está instalado), 'orjson' o 'stdlib'
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'auto')
+
+    # Correo saliente: cola local en SQLite y servidor SMTP. Para desarrollo, el servicio mailhog
+    # de docker-compose (MAIL_SMTP_HOST=mailhog, MAIL_SMTP_PORT=1025, MAIL_SMTP_STARTTLS=false).
+    MAIL_QUEUE_PATH = os.getenv('MAIL_QUEUE_PATH', 'mail_queue.db')
+    MAIL_SMTP_HOST = os.getenv('MAIL_SMTP_HOST', 'smtp.ethereal.email')
+    MAIL_SMTP_PORT = int(os.getenv('MAIL_SMTP_PORT', 587))
+    MAIL_SMTP_USER = os.getenv('MAIL_SMTP_USER', '')
+    MAIL_SMTP_PASSWORD = os.getenv('MAIL_SMTP_PASSWORD', '')
+    MAIL_SMTP_STARTTLS = os.getenv('MAIL_SMTP_STARTTLS', 'true').lower() == 'true'
+    MAIL_SMTP_TIMEOUT = float(os.getenv('MAIL_SMTP_TIMEOUT', 10))
+    MAIL_SENDER = os.getenv('MAIL_SENDER', 'no-reply@example.com')
+    # Hilos de entrega por proceso (0 para entregar solo desde mail_worker.py), mensajes por
+    # lote y conexión, intentos máximos y espera base/máxima (segundos) entre reintentos
+    MAIL_WORKERS = int(os.getenv('MAIL_WORKERS', 2))
+    MAIL_BATCH_SIZE = int(os.getenv('MAIL_BATCH_SIZE', 50))
+    MAIL_MAX_ATTEMPTS = int(os.getenv('MAIL_MAX_ATTEMPTS', 8))
+    MAIL_RETRY_BASE = float(os.getenv('MAIL_RETRY_BASE', 5))
+    MAIL_RETRY_MAX = float(os.getenv('MAIL_RETRY_MAX', 900))
@@ -0,0 +1,50 @@
+# count_cache.py
+import threading
+import time
+
+
+class UserCountCache:
+    # Mantiene el total de usuarios en memoria para no ejecutar COUNT(*) en cada listado.
+    # Las altas y bajas lo ajustan de forma incremental y se reconcilia contra la base de
+    # datos cuando supera la antigüedad máxima permitida (cubre cambios hechos por otros procesos).
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = None
+        self._reconciled_at = 0.0
+
+    def get(self, count_query, max_staleness, approximate=False):
+        value = self.peek(max_staleness, approximate)
+        if value is not None:
+            return value
+        return self.reconcile(count_query)
+
+    def peek(self, max_staleness, approximate=False):
+        # Valor en caché si sigue siendo válido; None si hay que reconciliar
+        with self._lock:
+            value = self._value
+            age = time.monotonic() - self._reconciled_at
+        if value is not None and (approximate or age <= max_staleness):
+            return value
+        return None
+
+    def reconcile(self, count_query):
+        return self.store(count_query())
+
+    def store(self, value):
+        with self._lock:
+            self._value = value
+            self._reconciled_at = time.monotonic()
+        return value
+
+    def adjust(self, delta):
+        with self._lock:
+            # Si aún no se ha cargado, la primera lectura obtendrá el valor real
+            if self._value is not None:
+                self._value = max(0, self._value + delta)
+
+    def invalidate(self):
+        with self._lock:
+            self._value = None
+
+
+user_count_cache = UserCountCache()
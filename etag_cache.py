@@ -0,0 +1,109 @@
+# etag_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def _digest(*parts):
+    return hashlib.blake2b('|'.join(str(part) for part in parts).encode(), digest_size=12).hexdigest()
+
+
+def user_etag(user):
+    # ETag fuerte de un usuario: id y updated_at, más los campos que se devuelven para que
+    # dos cambios dentro del mismo segundo (DATETIME de MySQL) no compartan ETag
+    return _digest(user.id, user.updated_at, user.username, user.email, user.created_at)
+
+
+def list_etag(version, *params):
+    # ETag de una página del listado: versión de la tabla y parámetros ya normalizados
+    return _digest(version, *params)
+
+
+class UserETagCache:
+    # ETags recientes por id de usuario (LRU) para responder 304 sin consultar la base de datos.
+    # Las escrituras de este proceso la actualizan; las de otros procesos se notan cuando la
+    # entrada supera la antigüedad máxima y se vuelve a leer la fila.
+    def __init__(self, max_size=4096):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.max_size = max_size
+
+    def get(self, user_id, max_staleness):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            etag, stored_at = entry
+            if time.monotonic() - stored_at > max_staleness:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return etag
+
+    def store(self, user_id, etag):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (etag, time.monotonic())
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class TableVersion:
+    # Versión de la tabla de usuarios para los ETag de los listados: resumen del total de
+    # usuarios, MAX(id) y MAX(updated_at). Las escrituras de este proceso la invalidan al momento; los
+    # cambios de otros procesos se detectan al reconciliar, como en count_cache.py.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = None
+        self._reconciled_at = 0.0
+        self._generation = 0
+
+    def peek(self, max_staleness):
+        with self._lock:
+            value = self._value
+            age = time.monotonic() - self._reconciled_at
+        if value is not None and age <= max_staleness:
+            return value
+        return None
+
+    def get(self, version_query, max_staleness):
+        value = self.peek(max_staleness)
+        if value is not None:
+            return value
+        generation = self.generation
+        return self.store(version_query(), generation)
+
+    @property
+    def generation(self):
+        with self._lock:
+            return self._generation
+
+    def store(self, fingerprint, generation=None):
+        value = _digest(*fingerprint)
+        with self._lock:
+            # Si hubo una escritura mientras se consultaba, el resumen ya puede estar desfasado:
+            # se usa para esta petición pero no se guarda
+            if generation is None or generation == self._generation:
+                self._value = value
+                self._reconciled_at = time.monotonic()
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._value = None
+            self._generation += 1
+
+
+user_etags = UserETagCache()
+users_table_version = TableVersion()
@@ -8,4 +8,27 @@ Feature: Restablecimiento de Contraseña
     When el usuario solicita restablecer la contraseña
     Then la respuesta debe indicar que se ha enviado un correo de restablecimiento
     When el usuario restablece la contraseña usando el token
-    Then la respuesta debe indicar que la contraseña ha sido restablecida exitosamente
\ No newline at end of file
+    Then la respuesta debe indicar que la contraseña ha sido restablecida exitosamente
+
+  Scenario: Un enlace de restablecimiento solo se puede usar una vez
+    Given un correo aleatorio puede no existir en el sistema
+    When el usuario solicita restablecer la contraseña
+    Then la respuesta debe indicar que se ha enviado un correo de restablecimiento
+    When el usuario restablece la contraseña usando el token
+    And el usuario vuelve a usar el mismo enlace de restablecimiento
+    Then the response status code should be 401
+
+  Scenario: Restablecer la contraseña invalida las sesiones anteriores
+    Given un usuario ha iniciado sesión antes de restablecer la contraseña
+    When el usuario solicita restablecer la contraseña
+    Then la respuesta debe indicar que se ha enviado un correo de restablecimiento
+    When el usuario restablece la contraseña usando el token
+    Then el token de la sesión anterior debe ser rechazado
+
+  Scenario: Iniciar sesión justo después de restablecer la contraseña
+    Given un usuario ha iniciado sesión antes de restablecer la contraseña
+    When el usuario solicita restablecer la contraseña
+    Then la respuesta debe indicar que se ha enviado un correo de restablecimiento
+    When el usuario restablece la contraseña usando el token
+    And el usuario inicia sesión con la nueva contraseña
+    Then el nuevo token debe ser aceptado
@@ -0,0 +1,13 @@
+Feature: Lecturas en réplicas
+  Como un operador
+  Quiero que las consultas de solo lectura se sirvan desde las réplicas
+  Para descargar la base de datos principal
+
+  # Solo se ejecuta contra una API con REPLICA_URIS configurado; en otro caso el escenario se
+  # omite. La réplica debe recibir la replicación del primario; en local con SQLite, REPLICA_URIS
+  # apunta al mismo fichero que DATABASE_URL (ver config.py)
+  Scenario: Listar usuarios sin escrituras recientes lee de una réplica
+    Given la API tiene réplicas de lectura
+    And un usuario aleatorio existe y ha iniciado sesión para listar usuarios
+    When el usuario lista los usuarios sin haber escrito recientemente
+    Then la lectura debe haberse servido desde una réplica
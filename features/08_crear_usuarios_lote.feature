@@ -0,0 +1,40 @@
+Feature: Crear usuarios en lote
+  Como un administrador
+  Quiero poder crear varios usuarios en una sola petición
+  Para cargar usuarios sin una petición por cada uno
+
+  Scenario: Crear usuarios en lote sin token
+    Given un lote de 3 usuarios nuevos
+    When se envía el lote de usuarios sin token
+    Then the response status code should be 401
+
+  Scenario: Crear un lote con usuarios repetidos y ya existentes
+    Given un usuario aleatorio existe y ha iniciado sesión para listar usuarios
+    And un lote de 3 usuarios nuevos
+    And el primer usuario del lote ya existe
+    And el lote repite el segundo usuario
+    When se envía el lote de usuarios con token
+    Then the response status code should be 207
+    And el informe del lote debe tener 2 creados, 2 conflictos y 0 inválidos
+
+  Scenario: Crear un lote con un elemento sin campos obligatorios
+    Given un usuario aleatorio existe y ha iniciado sesión para listar usuarios
+    And un lote de 2 usuarios nuevos
+    And el lote incluye un usuario sin clave
+    When se envía el lote de usuarios con token
+    Then the response status code should be 207
+    And el informe del lote debe tener 2 creados, 0 conflictos y 1 inválidos
+
+  Scenario: Un elemento del lote se valida como en la creación individual
+    Given un usuario aleatorio existe y ha iniciado sesión para listar usuarios
+    And un lote de 1 usuarios nuevos
+    And el lote incluye un usuario con una clave demasiado corta
+    When se envía el lote de usuarios con token
+    Then the response status code should be 207
+    And el último usuario del lote debe tener el mismo error de validación que al crearlo solo
+
+  Scenario: Rechazar un lote con más usuarios de los permitidos
+    Given un usuario aleatorio existe y ha iniciado sesión para listar usuarios
+    And un lote con más usuarios de los permitidos
+    When se envía el lote de usuarios con token
+    Then the response status code should be 413
@@ -0,0 +1,30 @@
+Feature: Eliminar usuarios en lote
+  Como un administrador
+  Quiero poder eliminar varios usuarios en una sola petición
+  Para limpiar los datos de prueba sin una petición por cada usuario
+
+  Scenario: Eliminar usuarios en lote sin token
+    Given un lote de 2 usuarios nuevos
+    When se eliminan en lote los correos del lote sin token
+    Then the response status code should be 401
+
+  Scenario: Un usuario sin autorización no puede eliminar en lote
+    Given un usuario aleatorio existe y ha iniciado sesión para listar usuarios
+    And un lote de 2 usuarios nuevos
+    And los usuarios del lote existen
+    When se eliminan en lote los correos del lote y uno inexistente con token
+    Then the response status code should be 403
+
+  # Requiere API_ADMIN_EMAIL y API_ADMIN_PASSWORD de una cuenta de USERS_BULK_DELETE_EMAILS
+  Scenario: Eliminar en lote usuarios existentes y uno inexistente
+    Given un usuario autorizado para el borrado en lote ha iniciado sesión
+    And un lote de 2 usuarios nuevos
+    And los usuarios del lote existen
+    When se eliminan en lote los correos del lote y uno inexistente con token
+    Then the response status code should be 200
+    And el informe de borrado debe indicar los correos del lote como eliminados y el inexistente como no encontrado
+
+  Scenario: Rechazar un borrado en lote sin correos ni ids
+    Given un usuario autorizado para el borrado en lote ha iniciado sesión
+    When se envía un borrado en lote sin correos ni ids
+    Then the response status code should be 400
@@ -0,0 +1,26 @@
+Feature: Buscar usuarios
+  Como un administrador
+  Quiero poder buscar usuarios por nombre o correo
+  Para encontrar un usuario sin recorrer el listado completo
+
+  Scenario: Buscar un usuario por el inicio de su correo
+    Given un usuario aleatorio existe y ha iniciado sesión para listar usuarios
+    When el usuario busca el inicio de su correo en modo prefix
+    Then the response status code should be 200
+    And los resultados de la búsqueda deben incluir al usuario
+
+  Scenario: Buscar usuarios sin token
+    Given un usuario aleatorio existe y ha iniciado sesión para listar usuarios
+    When se busca el inicio de su correo sin token
+    Then the response status code should be 401
+
+  Scenario Outline: Rechazar búsquedas con parámetros inválidos
+    Given un usuario aleatorio existe y ha iniciado sesión para listar usuarios
+    When el usuario busca con los parámetros "<parametros>"
+    Then the response status code should be 400
+
+    Examples:
+      | parametros             |
+      | q=ab                   |
+      | q=abc&mode=exacto      |
+      | q=abc&after=no-valido  |
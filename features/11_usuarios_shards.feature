@@ -0,0 +1,29 @@
+Feature: Usuarios repartidos en shards
+  Como un operador
+  Quiero que la API se comporte igual con los usuarios repartidos en varias bases de datos
+  Para poder escalar el almacenamiento sin cambiar a los clientes
+
+  # Solo se ejecuta contra una API con USERS_SHARD_URIS configurado (python init_db.py prepara
+  # cada shard); en otro caso los escenarios se omiten
+  Background:
+    Given la API reparte los usuarios en shards
+    And un usuario aleatorio existe y ha iniciado sesión para listar usuarios
+
+  Scenario: Leer por id usuarios de todos los shards
+    Given un lote de 6 usuarios nuevos
+    When se envía el lote de usuarios con token
+    Then the response status code should be 201
+    And cada usuario creado se puede leer por su id
+
+  Scenario: Rechazar un nombre de usuario repetido en otro shard
+    Given un lote de 1 usuarios nuevos
+    And los usuarios del lote existen
+    When se crea otro usuario con el mismo nombre y otro correo
+    Then the response status code should be 409
+
+  Scenario: Las páginas profundas se piden por cursor
+    When el usuario solicita la página 1000000 con 100 usuarios por página
+    Then the response status code should be 400
+    And el error debe indicar que se use el cursor after
+    When el usuario solicita la primera página por cursor
+    Then the response status code should be 200
@@ -0,0 +1,84 @@
+# features/run_parallel.py
+# Ejecuta los escenarios de behave repartidos entre varios procesos. Cada escenario (y cada
+# fila de un Scenario Outline) se asigna a un proceso por su ubicación fichero:línea.
+# Cada proceso recibe BEHAVE_WORKER_ID y BEHAVE_FAKER_SEED para que features/steps/api_client.py
+# genere datos que no choquen con los de los demás procesos.
+#
+# Uso:
+#   python features/run_parallel.py --workers 4
+#   python features/run_parallel.py --workers 4 -- -f allure_behave.formatter:AllureFormatter -o reports/{worker}
+# Los argumentos después de "--" se pasan a behave; "{worker}" se sustituye por el número de proceso.
+import argparse
+import glob
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from behave.parser import parse_file
+
+FEATURES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def scenario_locations(paths):
+    locations = []
+    for path in paths:
+        feature = parse_file(path)
+        if feature is None:
+            continue
+        for scenario in feature.walk_scenarios():
+            locations.append(f'{path}:{scenario.line}')
+    return locations
+
+
+def shard(locations, workers):
+    # Reparto round-robin: los escenarios de un mismo fichero quedan en procesos distintos
+    shards = [[] for _ in range(workers)]
+    for index, location in enumerate(locations):
+        shards[index % workers].append(location)
+    return [locations for locations in shards if locations]
+
+
+def run_shard(worker_id, locations, behave_args, seed):
+    env = dict(os.environ, BEHAVE_WORKER_ID=str(worker_id), BEHAVE_FAKER_SEED=str(seed))
+    args = [arg.replace('{worker}', str(worker_id)) for arg in behave_args]
+    command = [sys.executable, '-m', 'behave', *args, *locations]
+    started = time.perf_counter()
+    result = subprocess.run(command, env=env, capture_output=True, text=True)
+    return worker_id, result.returncode, result.stdout + result.stderr, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ejecuta behave en paralelo')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='procesos de behave')
+    parser.add_argument('--seed', type=int, default=int(time.time()), help='semilla base de Faker')
+    parser.add_argument('features', nargs='*', help='ficheros .feature (por defecto todos)')
+    argv = sys.argv[1:]
+    behave_args = []
+    if '--' in argv:
+        behave_args = argv[argv.index('--') + 1:]
+        argv = argv[:argv.index('--')]
+    args = parser.parse_args(argv)
+
+    paths = args.features or sorted(glob.glob(os.path.join(FEATURES_DIR, '*.feature')))
+    paths = [os.path.relpath(path) for path in paths]
+    shards = shard(scenario_locations(paths), args.workers)
+    print(f'{sum(len(s) for s in shards)} escenarios en {len(shards)} procesos (semilla {args.seed})')
+
+    failed = False
+    with ThreadPoolExecutor(max_workers=len(shards) or 1) as executor:
+        futures = [executor.submit(run_shard, worker_id, locations, behave_args, args.seed)
+                   for worker_id, locations in enumerate(shards)]
+        for future in futures:
+            worker_id, returncode, output, elapsed = future.result()
+            status = 'OK' if returncode == 0 else f'FALLO ({returncode})'
+            print(f'\n===== proceso {worker_id}: {status} en {elapsed:.1f}s =====')
+            print(output)
+            failed = failed or returncode != 0
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
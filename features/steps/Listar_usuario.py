@@ -1,17 +1,11 @@
 from behave import given, when, then
-import requests
+from api_client import API_URL, generate_random_user, http
 from werkzeug.security import generate_password_hash
 import allure
 import json
 from jsonschema import validate, ValidationError
-from faker import Faker
 import logging
 
-API_URL = "http://192.168.200.131:5000"
-
-# Inicializa Faker
-fake = Faker()
-
 # Esquema JSON para validar la respuesta de listar usuarios
 list_users_response_schema = {
     "type": "object",
@@ -42,13 +36,6 @@ def validate_response(response, schema):
         return False, str(e)
     return True, ""
 
-def generate_random_user():
-    return {
-        'nombre': fake.name(),
-        'email': fake.email(),
-        'clave': fake.password()
-    }
-
 @given('un usuario aleatorio existe y ha iniciado sesión para listar usuarios')
 def step_given_random_user_exists_and_logs_in_for_list(context):
     # Generar datos de usuario aleatorios
@@ -60,35 +47,36 @@ def step_given_random_user_exists_and_logs_in_for_list(context):
         'email': user_data['email'],
         'clave': generate_password_hash(user_data['clave'])
     }
-    requests.post(f"{API_URL}/usuarios", json=data)
+    http.post(f"{API_URL}/usuarios", json=data)
     
     # Intentar iniciar sesión
     login_data = {
         'email': user_data['email'],
         'clave': user_data['clave']
     }
-    login_response = requests.post(f"{API_URL}/auth/login", json=login_data)
+    login_response = http.post(f"{API_URL}/auth/login", json=login_data)
     
     # Si el inicio de sesión falla, crear un nuevo usuario y volver a intentar
     if login_response.status_code != 200:
         logging.info('No se pudo iniciar sesión, creando un nuevo usuario.')
         user_data = generate_random_user()
-        requests.post(f"{API_URL}/usuarios", json=user_data)
+        http.post(f"{API_URL}/usuarios", json=user_data)
         login_data = {
             'email': user_data['email'],
             'clave': user_data['clave']
         }
-        login_response = requests.post(f"{API_URL}/auth/login", json=login_data)
+        login_response = http.post(f"{API_URL}/auth/login", json=login_data)
     
     assert login_response.status_code == 200, 'No se pudo iniciar sesión.'
     context.jwt_token = login_response.json()['token']
+    context.user_data = user_data  # Otros pasos usan el correo del usuario (p. ej. la búsqueda)
 
 @when('el usuario solicita la lista de usuarios')
 def step_when_user_requests_user_list(context):
     headers = {
         'Authorization': f'Bearer {context.jwt_token}'
     }
-    response = requests.get(f"{API_URL}/usuarios", headers=headers)
+    response = http.get(f"{API_URL}/usuarios", headers=headers)
     context.response = response
 
 @then('la respuesta debe contener una lista de usuarios')
@@ -0,0 +1,95 @@
+# api_client.py
+# Utilidades compartidas por todos los módulos de pasos: URL de la API, sesión HTTP con
+# keep-alive (una por hilo, reutiliza las conexiones TCP) y datos de prueba con Faker.
+# Cuando se ejecuta con features/run_parallel.py, cada proceso recibe BEHAVE_WORKER_ID y
+# BEHAVE_FAKER_SEED: la semilla cambia por proceso y los nombres y correos llevan un sufijo
+# del proceso para que los datos no choquen entre ejecuciones paralelas.
+import os
+import threading
+import uuid
+
+import requests
+from faker import Faker
+from requests.adapters import HTTPAdapter
+
+API_URL = os.getenv('API_URL', 'http://192.168.200.131:5000')
+WORKER_ID = os.getenv('BEHAVE_WORKER_ID')
+# Cuenta incluida en USERS_BULK_DELETE_EMAILS de la API (borrado en lote); sin ella esos
+# escenarios se omiten
+ADMIN_EMAIL = os.getenv('API_ADMIN_EMAIL')
+ADMIN_PASSWORD = os.getenv('API_ADMIN_PASSWORD')
+
+fake = Faker()
+if os.getenv('BEHAVE_FAKER_SEED'):
+    fake.seed_instance(int(os.getenv('BEHAVE_FAKER_SEED')) + int(WORKER_ID or 0))
+
+
+class PooledHTTP:
+    # Misma interfaz que requests.get/post/put/delete pero sobre una sesión persistente
+    def __init__(self, pool_maxsize=10):
+        self.pool_maxsize = pool_maxsize
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._local.session = session
+        return session
+
+    def get(self, url, **kwargs):
+        return self.session.get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.session.post(url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.session.put(url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.session.delete(url, **kwargs)
+
+
+http = PooledHTTP()
+
+
+def random_email():
+    email = fake.email()
+    if WORKER_ID is None:
+        return email
+    local, domain = email.split('@', 1)
+    return f'{local}+w{WORKER_ID}@{domain}'
+
+
+def generate_random_user():
+    nombre = fake.name()
+    return {
+        'nombre': nombre if WORKER_ID is None else f'{nombre} w{WORKER_ID}',
+        'email': random_email(),
+        'clave': fake.password()
+    }
+
+
+def generate_unique_user():
+    # Como generate_random_user, pero con un sufijo aleatorio en el nombre y el correo: los
+    # escenarios que cuentan conflictos no pueden chocar con usuarios de ejecuciones anteriores
+    user = generate_random_user()
+    suffix = uuid.uuid4().hex[:8]
+    local, domain = user['email'].split('@', 1)
+    user['nombre'] = f"{user['nombre']} {suffix}"
+    user['email'] = f'{local}.{suffix}@{domain}'
+    return user
+
+
+def login_new_user():
+    # Crea un usuario nuevo e inicia sesión: (datos del usuario, token JWT)
+    user = generate_unique_user()
+    response = http.post(f'{API_URL}/usuarios/', json=user)
+    assert response.status_code == 201, f'No se pudo crear el usuario: {response.status_code} {response.text}'
+    response = http.post(f'{API_URL}/auth/login', json={'email': user['email'], 'clave': user['clave']})
+    assert response.status_code == 200, f'No se pudo iniciar sesión: {response.status_code} {response.text}'
+    return user, response.json()['token']
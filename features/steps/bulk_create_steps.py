@@ -0,0 +1,67 @@
+import json
+import os
+from behave import given, when, then
+from api_client import API_URL, generate_unique_user, http
+import allure
+import logging
+
+# Máximo de usuarios por lote de la API (USERS_BULK_CREATE_MAX_ITEMS en config.py)
+BULK_CREATE_MAX_ITEMS = int(os.getenv('USERS_BULK_CREATE_MAX_ITEMS', 100))
+
+@given('un lote de {count:d} usuarios nuevos')
+def step_given_batch_of_new_users(context, count):
+    context.batch = [generate_unique_user() for _ in range(count)]
+
+@given('el primer usuario del lote ya existe')
+def step_given_first_batch_user_exists(context):
+    response = http.post(f"{API_URL}/usuarios/", json=context.batch[0])
+    assert response.status_code == 201, f'No se pudo crear el usuario: {response.status_code}'
+
+@given('el lote repite el segundo usuario')
+def step_given_batch_repeats_second_user(context):
+    context.batch.append(dict(context.batch[1]))
+
+@given('el lote incluye un usuario sin clave')
+def step_given_batch_includes_user_without_password(context):
+    user = generate_unique_user()
+    del user['clave']
+    context.batch.append(user)
+
+@given('el lote incluye un usuario con una clave demasiado corta')
+def step_given_batch_includes_user_with_short_password(context):
+    user = generate_unique_user()
+    user['clave'] = '123'
+    context.batch.append(user)
+
+@given('un lote con más usuarios de los permitidos')
+def step_given_batch_over_limit(context):
+    # El tamaño se comprueba antes de validar o calcular ningún hash
+    context.batch = [{'nombre': f'u{index}', 'email': f'u{index}@example.com', 'clave': 'x'}
+                     for index in range(BULK_CREATE_MAX_ITEMS + 1)]
+
+@when('se envía el lote de usuarios sin token')
+def step_when_batch_sent_without_token(context):
+    context.response = http.post(f"{API_URL}/usuarios/bulk", json=context.batch)
+
+@when('se envía el lote de usuarios con token')
+def step_when_batch_sent_with_token(context):
+    headers = {'Authorization': f'Bearer {context.jwt_token}'}
+    context.response = http.post(f"{API_URL}/usuarios/bulk", json=context.batch, headers=headers)
+
+@then('el informe del lote debe tener {created:d} creados, {conflicts:d} conflictos y {invalid:d} inválidos')
+def step_then_batch_report_counts(context, created, conflicts, invalid):
+    response_data = context.response.json()
+    logging.info(f'Response data: {response_data}')
+    allure.attach(json.dumps(response_data, indent=2), name="Bulk Create Response", attachment_type=allure.attachment_type.JSON)
+
+    assert response_data['created'] == created, f"Esperados {created} creados, recibidos {response_data['created']}"
+    assert response_data['conflicts'] == conflicts, f"Esperados {conflicts} conflictos, recibidos {response_data['conflicts']}"
+    assert response_data['invalid'] == invalid, f"Esperados {invalid} inválidos, recibidos {response_data['invalid']}"
+    assert len(response_data['results']) == len(context.batch), 'El informe no tiene un resultado por usuario'
+
+@then('el último usuario del lote debe tener el mismo error de validación que al crearlo solo')
+def step_then_last_batch_user_has_single_create_error(context):
+    result = context.response.json()['results'][-1]
+    response = http.post(f"{API_URL}/usuarios/", json=context.batch[-1])
+    assert response.status_code == 400, f'La creación individual devolvió {response.status_code}'
+    assert result == {'index': len(context.batch) - 1, 'status': 400, 'error': response.json()['error']}, f'Resultado del lote: {result}'
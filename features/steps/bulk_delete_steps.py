@@ -0,0 +1,49 @@
+import json
+from behave import given, when, then
+from api_client import ADMIN_EMAIL, ADMIN_PASSWORD, API_URL, generate_unique_user, http
+import allure
+import logging
+
+@given('un usuario autorizado para el borrado en lote ha iniciado sesión')
+def step_given_bulk_delete_user_logged_in(context):
+    if not ADMIN_EMAIL or not ADMIN_PASSWORD:
+        context.scenario.skip('Sin API_ADMIN_EMAIL y API_ADMIN_PASSWORD (cuenta de USERS_BULK_DELETE_EMAILS)')
+        return
+    # La cuenta se crea si todavía no existe (409 si ya existe)
+    http.post(f"{API_URL}/usuarios/", json={'nombre': ADMIN_EMAIL, 'email': ADMIN_EMAIL, 'clave': ADMIN_PASSWORD})
+    response = http.post(f"{API_URL}/auth/login", json={'email': ADMIN_EMAIL, 'clave': ADMIN_PASSWORD})
+    assert response.status_code == 200, f'No se pudo iniciar sesión con API_ADMIN_EMAIL: {response.status_code}'
+    context.jwt_token = response.json()['token']
+
+@given('los usuarios del lote existen')
+def step_given_batch_users_exist(context):
+    for user in context.batch:
+        response = http.post(f"{API_URL}/usuarios/", json=user)
+        assert response.status_code == 201, f'No se pudo crear el usuario: {response.status_code}'
+
+@when('se eliminan en lote los correos del lote sin token')
+def step_when_batch_deleted_without_token(context):
+    emails = [user['email'] for user in context.batch]
+    context.response = http.delete(f"{API_URL}/usuarios/bulk", json={'emails': emails})
+
+@when('se eliminan en lote los correos del lote y uno inexistente con token')
+def step_when_batch_and_missing_deleted_with_token(context):
+    context.missing_email = generate_unique_user()['email']
+    emails = [user['email'] for user in context.batch] + [context.missing_email]
+    headers = {'Authorization': f'Bearer {context.jwt_token}'}
+    context.response = http.delete(f"{API_URL}/usuarios/bulk", json={'emails': emails}, headers=headers)
+
+@when('se envía un borrado en lote sin correos ni ids')
+def step_when_bulk_delete_without_keys(context):
+    headers = {'Authorization': f'Bearer {context.jwt_token}'}
+    context.response = http.delete(f"{API_URL}/usuarios/bulk", json={}, headers=headers)
+
+@then('el informe de borrado debe indicar los correos del lote como eliminados y el inexistente como no encontrado')
+def step_then_bulk_delete_report(context):
+    response_data = context.response.json()
+    logging.info(f'Response data: {response_data}')
+    allure.attach(json.dumps(response_data, indent=2), name="Bulk Delete Response", attachment_type=allure.attachment_type.JSON)
+
+    expected = [user['email'] for user in context.batch]
+    assert response_data['deleted'] == expected, f"Eliminados esperados {expected}, recibidos {response_data['deleted']}"
+    assert response_data['not_found'] == [context.missing_email], f"No encontrados: {response_data['not_found']}"
@@ -1,18 +1,14 @@
 import json
 from behave import given, when, then
-import requests
+from api_client import API_URL, generate_random_user, http
 import logging
 from jsonschema import validate, ValidationError
-from faker import Faker
 
 
 
 # Configura el logging al nivel INFO
 logging.basicConfig(level=logging.INFO)
 
-# Inicializa Faker
-fake = Faker()
-
 # Esquema JSON para validar la respuesta de eliminación de usuario
 delete_user_response_schema = {
     "type": "object",
@@ -29,13 +25,6 @@ def validate_response(response, schema):
         return False, str(e)
     return True, ""
 
-def generate_random_user():
-    return {
-        'nombre': fake.name(),
-        'email': fake.email(),
-        'clave': fake.password()
-    }
-
 # Paso para definir los datos del usuario para eliminar uno existente
 @given('I have random user data for delete')
 def step_given_random_user_data_for_delete(context):
@@ -43,13 +32,13 @@ def step_given_random_user_data_for_delete(context):
 
 @when('I check if the user exists and create if necessary for delete')
 def step_when_check_and_create_user_for_delete(context):
-    check_url = f'http://192.168.200.131:5000/usuarios/verificar'
-    response = requests.post(check_url, json={'email': context.user_data['email']})
+    check_url = f'{API_URL}/usuarios/verificar'
+    response = http.post(check_url, json={'email': context.user_data['email']})
 
     if response.status_code == 404:
         logging.info('User does not exist, creating user.')
-        create_url = f'http://192.168.200.131:5000/usuarios'
-        create_response = requests.post(create_url, json=context.user_data)
+        create_url = f'{API_URL}/usuarios'
+        create_response = http.post(create_url, json=context.user_data)
         logging.info(f'Create user response status code: {create_response.status_code}')  # Logging create user response status code
         logging.info(f'Create user response body: {create_response.text}')  # Logging create user response body
         assert create_response.status_code == 201, 'No se pudo crear el usuario.'
@@ -60,12 +49,12 @@ def step_when_check_and_create_user_for_delete(context):
 
 @when('I obtain a JWT token for the user to delete')
 def step_when_obtain_jwt_token_for_delete(context):
-    login_url = 'http://192.168.200.131:5000/auth/login'
+    login_url = f'{API_URL}/auth/login'
     login_data = {
         'email': context.user_data['email'],
         'clave': context.user_data['clave']
     }
-    response = requests.post(login_url, json=login_data)
+    response = http.post(login_url, json=login_data)
     logging.info(f'Login response status code: {response.status_code}')  # Logging login response status code
     logging.info(f'Login response body: {response.text}')  # Logging login response body
     assert response.status_code == 200, 'No se pudo obtener el token JWT.'
@@ -74,23 +63,17 @@ def step_when_obtain_jwt_token_for_delete(context):
 # Paso para enviar la solicitud DELETE para eliminar el usuario
 @when('I send a DELETE request to "{endpoint}" with user data')
 def step_when_send_delete_request(context, endpoint):
-    url = f'http://192.168.200.131:5000{endpoint}'  # Asegúrate de que la URL sea correcta
+    url = f'{API_URL}{endpoint}'  # Asegúrate de que la URL sea correcta
     headers = {
         'Content-Type': 'application/json',
         'Authorization': f'Bearer {context.jwt_token}'  # Incluimos el token JWT en el encabezado
     }
     logging.info(f'Sending DELETE request to URL: {url} with data: {context.user_data}')  # Logging URL and data
-    response = requests.delete(url, json=context.user_data, headers=headers)  # Asegura el formato JSON
+    response = http.delete(url, json=context.user_data, headers=headers)  # Asegura el formato JSON
     logging.info(f'Response status code: {response.status_code}')  # Logging response status code
     logging.info(f'Response body: {response.text}')  # Logging response body
     context.response = response
 
-# Paso para verificar el código de estado
-@then('the response status code should be {status_code:d}')
-def step_then_check_status_code(context, status_code):
-    logging.info(f'Response status code: {context.response.status_code}')  # Logging response status code
-    assert context.response.status_code == status_code, f'Expected status code {status_code}, but got {context.response.status_code}'
-
 # Paso para verificar el esquema de la respuesta
 @then('the response body should match the delete user schema')
 def step_then_check_delete_user_schema(context):
@@ -1,18 +1,12 @@
 import json
 from behave import given, when, then
-import requests
+from api_client import API_URL, generate_random_user, http
 import logging
 from jsonschema import validate, ValidationError
-from faker import Faker
-
-API_URL = "http://192.168.200.131:5000"
 
 # Configura el logging al nivel INFO
 logging.basicConfig(level=logging.INFO)
 
-# Inicializa Faker
-fake = Faker()
-
 # Esquema JSON para validar la respuesta de inicio de sesión
 login_response_schema = {
     "type": "object",
@@ -29,13 +23,6 @@ def validate_response(response, schema):
         return False, str(e)
     return True, ""
 
-def generate_random_user():
-    return {
-        'nombre': fake.name(),
-        'email': fake.email(),
-        'clave': fake.password()
-    }
-
 # Paso para definir los datos del usuario para crear uno nuevo
 @given('I have random user data')
 def step_given_random_user_data(context):
@@ -44,12 +31,12 @@ def step_given_random_user_data(context):
 @when('I check if the user exists and create if necessary')
 def step_when_check_and_create_user(context):
     check_url = f'{API_URL}/usuarios/verificar'
-    response = requests.post(check_url, json={'email': context.user_data['email']})
+    response = http.post(check_url, json={'email': context.user_data['email']})
 
     if response.status_code == 404:
         logging.info('User does not exist, creating user.')
         create_url = f'{API_URL}/usuarios'
-        create_response = requests.post(create_url, json=context.user_data)
+        create_response = http.post(create_url, json=context.user_data)
         logging.info(f'Create user response status code: {create_response.status_code}')  # Logging create user response status code
         logging.info(f'Create user response body: {create_response.text}')  # Logging create user response body
         assert create_response.status_code == 201, 'No se pudo crear el usuario.'
@@ -64,17 +51,11 @@ def step_when_send_post_request(context, endpoint):
     url = f'{API_URL}{endpoint}'  # Asegúrate de que la URL sea correcta
     headers = {'Content-Type': 'application/json'}  # Incluimos los headers manualmente
     logging.info(f'Sending POST request to URL: {url} with data: {context.user_data}')  # Logging URL and data
-    response = requests.post(url, json=context.user_data, headers=headers)  # Asegura el formato JSON
+    response = http.post(url, json=context.user_data, headers=headers)  # Asegura el formato JSON
     logging.info(f'Response status code: {response.status_code}')  # Logging response status code
     logging.info(f'Response body: {response.text}')  # Logging response body
     context.response = response
 
-# Paso para verificar el código de estado
-@then('the response status code should be {status_code:d}')
-def step_then_check_status_code(context, status_code):
-    logging.info(f'Response status code: {context.response.status_code}')  # Logging response status code
-    assert context.response.status_code == status_code, f'Expected status code {status_code}, but got {context.response.status_code}'
-
 @then('the response body should contain the JWT token')
 def step_then_check_token(context):
     response_data = context.response.json()
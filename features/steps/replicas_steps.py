@@ -0,0 +1,51 @@
+import time
+from behave import given, when, then
+from api_client import API_URL, http
+from prometheus_client.parser import text_string_to_metric_families
+import logging
+
+
+def replica_metrics():
+    # {métrica: {réplica: valor}} de las métricas db_replica_* de GET /metrics
+    response = http.get(f"{API_URL}/metrics")
+    assert response.status_code == 200, f'GET /metrics devolvió {response.status_code}'
+    values = {}
+    for family in text_string_to_metric_families(response.text):
+        for sample in family.samples:
+            if sample.name.startswith('db_replica_'):
+                values.setdefault(sample.name, {})[sample.labels['replica']] = sample.value
+    return values
+
+
+@given('la API tiene réplicas de lectura')
+def step_given_api_has_healthy_replicas(context):
+    metrics = replica_metrics()
+    if not metrics:
+        context.scenario.skip('La API no tiene réplicas de lectura (REPLICA_URIS)')
+        return
+    context.replica_reads = sum(metrics.get('db_replica_reads_total', {}).values())
+
+@when('el usuario lista los usuarios sin haber escrito recientemente')
+def step_when_user_lists_users_without_recent_writes(context):
+    # Crear el usuario deja la cookie que fija las lecturas al primario durante REPLICA_PIN_SECONDS
+    http.session.cookies.clear()
+    headers = {'Authorization': f'Bearer {context.jwt_token}'}
+    # El monitor de réplicas arranca con la primera lectura y cada proceso de la API tiene sus
+    # propias métricas: se repite hasta que la réplica se considere al día y una respuesta de
+    # /metrics refleje la lectura
+    context.replica_served = False
+    for _ in range(20):
+        response = http.get(f"{API_URL}/usuarios/", headers=headers)
+        assert response.status_code == 200, f'GET /usuarios/ devolvió {response.status_code}'
+        reads = sum(replica_metrics().get('db_replica_reads_total', {}).values())
+        if reads > context.replica_reads:
+            context.replica_served = True
+            break
+        time.sleep(0.5)
+
+@then('la lectura debe haberse servido desde una réplica')
+def step_then_read_served_by_replica(context):
+    metrics = replica_metrics()
+    logging.info(f'Métricas de réplicas: {metrics}')
+    # Sin db_replica_lag_seconds la réplica no ha recibido ningún latido del primario
+    assert context.replica_served, f'Ninguna lectura llegó a una réplica (¿recibe la replicación del primario?). Métricas: {metrics}'
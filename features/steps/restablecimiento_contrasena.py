@@ -1,52 +1,41 @@
 from behave import given, when, then
-import requests
+from api_client import API_URL, fake, generate_random_user, http, login_new_user, random_email
 import allure
 import json
-from werkzeug.security import generate_password_hash
-from faker import Faker
 import logging
 
-API_URL = "http://192.168.200.131:5000"
-
-# Inicializa Faker
-fake = Faker()
-
-def generate_random_user():
-    return {
-        'nombre': fake.name(),
-        'email': fake.email(),
-        'clave': fake.password()
-    }
 
 @given('un correo aleatorio puede no existir en el sistema')
 def step_given_random_email_might_not_exist(context):
     # Generar un correo aleatorio
-    context.email = fake.email()
+    context.email = random_email()
+
 
 @when('el usuario solicita restablecer la contraseña')
 def step_when_user_requests_password_reset(context):
     # Verificar si el usuario existe
-    response = requests.get(f"{API_URL}/usuarios/?email={context.email}")
+    response = http.get(f"{API_URL}/usuarios/?email={context.email}")
     if response.status_code == 404:
         # Crear el usuario si no existe
         user_data = generate_random_user()
         user_data['email'] = context.email  # Usar el correo aleatorio generado
-        create_response = requests.post(f"{API_URL}/usuarios", json=user_data)
+        create_response = http.post(f"{API_URL}/usuarios", json=user_data)
         assert create_response.status_code == 201, 'No se pudo crear el usuario.'
     
     # Solicitar restablecimiento de contraseña
-    reset_response = requests.post(f"{API_URL}/auth/reset_password", json={'email': context.email})
+    reset_response = http.post(f"{API_URL}/auth/reset_password", json={'email': context.email})
     
     # Si el usuario no existe, crearlo y volver a intentar
     if reset_response.status_code == 404 and reset_response.json().get('error') == 'El usuario no existe.':
         user_data = generate_random_user()
         user_data['email'] = context.email  # Usar el correo aleatorio generado
-        create_response = requests.post(f"{API_URL}/usuarios", json=user_data)
+        create_response = http.post(f"{API_URL}/usuarios", json=user_data)
         assert create_response.status_code == 201, 'No se pudo crear el usuario.'
-        reset_response = requests.post(f"{API_URL}/auth/reset_password", json={'email': context.email})
+        reset_response = http.post(f"{API_URL}/auth/reset_password", json={'email': context.email})
     
     context.response = reset_response
 
+
 @then('la respuesta debe indicar que se ha enviado un correo de restablecimiento')
 def step_then_response_should_indicate_reset_email_sent(context):
     try:
@@ -69,6 +58,7 @@ def step_then_response_should_indicate_reset_email_sent(context):
     # Adjuntar la respuesta al reporte de Allure
     allure.attach(json.dumps(response_data, indent=2), name="Password Reset Response", attachment_type=allure.attachment_type.JSON)
 
+
 @when('el usuario restablece la contraseña usando el token')
 def step_when_user_resets_password_using_token(context):
     # Generar una nueva contraseña aleatoria
@@ -76,9 +66,10 @@ def step_when_user_resets_password_using_token(context):
     context.new_password = new_password
     
     # Usar el token para restablecer la contraseña
-    reset_response = requests.post(f"{API_URL}/auth/reset_password/{context.reset_token}", json={'new_password': new_password})
+    reset_response = http.post(f"{API_URL}/auth/reset_password/{context.reset_token}", json={'new_password': new_password})
     context.response = reset_response
 
+
 @then('la respuesta debe indicar que la contraseña ha sido restablecida exitosamente')
 def step_then_response_should_indicate_password_reset_successful(context):
     try:
@@ -96,4 +87,36 @@ def step_then_response_should_indicate_password_reset_successful(context):
     logging.info(f'Response data: {response_data}')
     
     # Adjuntar la respuesta al reporte de Allure
-    allure.attach(json.dumps(response_data, indent=2), name="Password Reset Confirmation Response", attachment_type=allure.attachment_type.JSON)
\ No newline at end of file
+    allure.attach(json.dumps(response_data, indent=2), name="Password Reset Confirmation Response", attachment_type=allure.attachment_type.JSON)
+
+
+@given('un usuario ha iniciado sesión antes de restablecer la contraseña')
+def step_given_user_logged_in_before_reset(context):
+    user_data, context.jwt_token = login_new_user()
+    context.email = user_data['email']
+
+
+@when('el usuario vuelve a usar el mismo enlace de restablecimiento')
+def step_when_user_reuses_reset_link(context):
+    context.response = http.post(f"{API_URL}/auth/reset_password/{context.reset_token}", json={'new_password': fake.password()})
+
+
+@then('el token de la sesión anterior debe ser rechazado')
+def step_then_previous_session_token_rejected(context):
+    assert context.response.status_code == 200, f'El restablecimiento falló: {context.response.status_code}'
+    response = http.get(f"{API_URL}/usuarios/", headers={'Authorization': f'Bearer {context.jwt_token}'})
+    assert response.status_code == 401, f'El token anterior sigue siendo válido: {response.status_code}'
+
+
+@when('el usuario inicia sesión con la nueva contraseña')
+def step_when_user_logs_in_with_new_password(context):
+    # Justo después del restablecimiento (normalmente en el mismo segundo)
+    response = http.post(f"{API_URL}/auth/login", json={'email': context.email, 'clave': context.new_password})
+    assert response.status_code == 200, f'No se pudo iniciar sesión: {response.status_code} {response.text}'
+    context.jwt_token = response.json()['token']
+
+
+@then('el nuevo token debe ser aceptado')
+def step_then_new_token_accepted(context):
+    response = http.get(f"{API_URL}/usuarios/", headers={'Authorization': f'Bearer {context.jwt_token}'})
+    assert response.status_code == 200, f'El token nuevo fue rechazado: {response.status_code}'
@@ -0,0 +1,31 @@
+import json
+from behave import given, when, then
+from api_client import API_URL, http
+import allure
+import logging
+
+@when('el usuario busca el inicio de su correo en modo prefix')
+def step_when_user_searches_email_prefix(context):
+    headers = {'Authorization': f'Bearer {context.jwt_token}'}
+    # La parte local completa del correo (nombre y número de Faker) casi nunca la comparten otros usuarios
+    params = {'q': context.user_data['email'].split('@', 1)[0], 'mode': 'prefix'}
+    context.response = http.get(f"{API_URL}/usuarios/buscar", params=params, headers=headers)
+
+@when('se busca el inicio de su correo sin token')
+def step_when_search_without_token(context):
+    params = {'q': context.user_data['email'].split('@', 1)[0], 'mode': 'prefix'}
+    context.response = http.get(f"{API_URL}/usuarios/buscar", params=params)
+
+@when('el usuario busca con los parámetros "{parametros}"')
+def step_when_user_searches_with_params(context, parametros):
+    headers = {'Authorization': f'Bearer {context.jwt_token}'}
+    context.response = http.get(f"{API_URL}/usuarios/buscar?{parametros}", headers=headers)
+
+@then('los resultados de la búsqueda deben incluir al usuario')
+def step_then_search_results_include_user(context):
+    response_data = context.response.json()
+    logging.info(f'Response data: {response_data}')
+    allure.attach(json.dumps(response_data, indent=2), name="Search Response", attachment_type=allure.attachment_type.JSON)
+
+    emails = [user['email'] for user in response_data['users']]
+    assert context.user_data['email'] in emails, f"{context.user_data['email']} no aparece en {emails}"
@@ -0,0 +1,58 @@
+import json
+from behave import given, when, then
+from api_client import API_URL, generate_unique_user, http
+from prometheus_client.parser import text_string_to_metric_families
+import allure
+import logging
+
+
+def shard_binds():
+    # Binds de los shards (users_0, users_1...) según las métricas del pool de GET /metrics
+    response = http.get(f"{API_URL}/metrics")
+    assert response.status_code == 200, f'GET /metrics devolvió {response.status_code}'
+    return {
+        sample.labels['bind']
+        for family in text_string_to_metric_families(response.text)
+        for sample in family.samples
+        if sample.name == 'db_pool_checked_out' and sample.labels.get('bind', '').startswith('users_')
+    }
+
+
+@given('la API reparte los usuarios en shards')
+def step_given_api_uses_shards(context):
+    if not shard_binds():
+        context.scenario.skip('La API no tiene shards de usuarios (USERS_SHARD_URIS)')
+
+@then('cada usuario creado se puede leer por su id')
+def step_then_each_created_user_readable_by_id(context):
+    headers = {'Authorization': f'Bearer {context.jwt_token}'}
+    results = context.response.json()['results']
+    allure.attach(json.dumps(results, indent=2), name="Bulk Create Results", attachment_type=allure.attachment_type.JSON)
+    for result in results:
+        response = http.get(f"{API_URL}/usuarios/{result['id']}", headers=headers)
+        assert response.status_code == 200, f"GET /usuarios/{result['id']} devolvió {response.status_code}"
+        assert response.json()['email'] == result['email'], f"El usuario {result['id']} no es {result['email']}"
+    logging.info(f"Shards de los ids: {sorted({result['id'] >> 40 for result in results})}")
+
+@when('se crea otro usuario con el mismo nombre y otro correo')
+def step_when_user_created_with_same_name(context):
+    # El correo distinto suele llevarlo a otro shard, donde la restricción única no lo detecta
+    user = generate_unique_user()
+    user['nombre'] = context.batch[0]['nombre']
+    context.response = http.post(f"{API_URL}/usuarios/", json=user)
+
+@when('el usuario solicita la página {page:d} con {limit:d} usuarios por página')
+def step_when_user_requests_page(context, page, limit):
+    headers = {'Authorization': f'Bearer {context.jwt_token}'}
+    context.response = http.get(f"{API_URL}/usuarios/", params={'page': page, 'limit': limit}, headers=headers)
+
+@then('el error debe indicar que se use el cursor after')
+def step_then_error_mentions_cursor(context):
+    response_data = context.response.json()
+    logging.info(f'Response data: {response_data}')
+    assert 'after' in response_data.get('error', ''), f'El error no menciona el cursor: {response_data}'
+
+@when('el usuario solicita la primera página por cursor')
+def step_when_user_requests_first_cursor_page(context):
+    headers = {'Authorization': f'Bearer {context.jwt_token}'}
+    context.response = http.get(f"{API_URL}/usuarios/", params={'after': '', 'limit': 100}, headers=headers)
@@ -1,14 +1,10 @@
 import json
 from behave import given, when, then
-import requests
+from api_client import API_URL, generate_random_user, http
 from jsonschema import validate, ValidationError
-from faker import Faker
-
-API_URL = "http://192.168.200.131:5000"
 
 # Variable global para almacenar los datos del usuario
 user_data = {}
-fake = Faker()
 
 user_response_schema = {
     "type": "object",
@@ -30,11 +26,7 @@ def validate_response(response, schema):
 def generate_random_users(count):
     users = []
     for _ in range(count):
-        users.append({
-            'nombre': fake.name(),
-            'email': fake.email(),
-            'clave': fake.password()
-        })
+        users.append(generate_random_user())
     return users
 
 # Generar un grupo de usuarios
@@ -50,7 +42,7 @@ def step_given_user_data(context, nombre, email, clave):
 @when('I check if the user exists and delete if necessary')
 def step_when_check_and_delete_user(context):
     delete_url = f'{API_URL}/usuarios/verificar_y_eliminar'
-    response = requests.delete(delete_url, json={'email': context.user_data['email']})
+    response = http.delete(delete_url, json={'email': context.user_data['email']})
 
     if response.status_code == 404:
         print('User does not exist, nothing to delete.')
@@ -60,7 +52,7 @@ def step_when_check_and_delete_user(context):
 @when('I send a POST request to "{endpoint}" with the user data')
 def step_when_send_post_request(context, endpoint):
     url = f'{API_URL}{endpoint}'
-    response = requests.post(url, json=context.user_data)
+    response = http.post(url, json=context.user_data)
     context.response = response
 
 @then('the response status code should be {status_code:d}')
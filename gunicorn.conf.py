@@ -0,0 +1,41 @@
+# gunicorn.conf.py
+import os
+
+# Varios procesos (uno o más por núcleo) y varios hilos por proceso
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', (os.cpu_count() or 1) * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+# Debe cubrir la petición más lenta: un lote de USERS_BULK_CREATE_MAX_ITEMS usuarios (config.py)
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Cada worker tiene su propio pool de procesos para los hashes de contraseñas (hashing.py): por
+# defecto los núcleos se reparten entre los workers en lugar de dar a cada uno todos los núcleos.
+# Se fija antes de cargar la aplicación, que lee PASSWORD_HASH_WORKERS al importar config.py.
+os.environ.setdefault('PASSWORD_HASH_WORKERS', str(max(1, (os.cpu_count() or 1) // workers)))
+
+# La aplicación se carga una vez en el proceso maestro antes de hacer fork
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # Las conexiones abiertas antes del fork no deben compartirse entre procesos
+    from wsgi import app
+    from models import db
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+    # Entregar los correos que quedaron en cola antes de reiniciar
+    from mail_queue import mail_queue
+    mail_queue.start()
+
+
+def child_exit(server, worker):
+    # Con PROMETHEUS_MULTIPROC_DIR, descartar los medidores del proceso que terminó
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,169 @@
+# hashing.py
+import asyncio
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HashingBusyError(RuntimeError):
+    # La cola del pool está llena: el llamador debe responder 503 en lugar de esperar sin límite
+    pass
+
+
+# Pool de procesos compartido para calcular y verificar hashes de contraseñas fuera del
+# hilo de la petición (los KDF son lentos a propósito y bajo el GIL frenarían al resto).
+# Se crea de forma perezosa para no lanzar procesos antes de un fork ni si nunca se usa.
+_settings = {
+    'method': 'scrypt',
+    'cost': None,
+    'workers': os.cpu_count() or 1,
+    'queue_size': 64,
+    'queue_timeout': 5.0,
+}
+_executor = None
+_slots = None
+_executor_lock = threading.Lock()
+
+# Los procesos del pool no se crean con fork: el pool se crea dentro de un worker de gunicorn con
+# varios hilos, y un fork copiaría locks tomados por otros hilos. forkserver arranca cada proceso
+# desde un servidor limpio (spawn donde no existe, p. ej. en Windows).
+_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+def configure(method='scrypt', cost=None, workers=None, queue_size=64, queue_timeout=5.0):
+    _settings.update(
+        method=method,
+        cost=cost,
+        workers=workers or os.cpu_count() or 1,
+        queue_size=queue_size,
+        queue_timeout=queue_timeout,
+    )
+
+
+def build_method(method, cost=None):
+    # Construye el método en el formato de werkzeug a partir del algoritmo y su coste
+    if not cost:
+        return method
+    parts = method.split(':')
+    if parts[0] == 'pbkdf2':
+        digest = parts[1] if len(parts) > 1 else 'sha256'
+        return f'pbkdf2:{digest}:{cost}'
+    if parts[0] == 'scrypt':
+        return f'scrypt:{cost}:8:1'
+    return method
+
+
+def current_method():
+    return build_method(_settings['method'], _settings['cost'])
+
+
+@lru_cache(maxsize=8)
+def _method_prefix(method):
+    # Prefijo normalizado (p. ej. 'scrypt:32768:8:1') que werkzeug guarda delante del hash
+    return generate_password_hash('', method=method).split('$', 1)[0]
+
+
+def get_executor():
+    global _executor, _slots
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=_settings['workers'], mp_context=multiprocessing.get_context(_START_METHOD)
+            )
+            _slots = threading.BoundedSemaphore(_settings['queue_size'])
+        return _executor
+
+
+def _submit(fn, *args):
+    # Encola un trabajo en el pool respetando el tamaño máximo de la cola
+    executor = get_executor()
+    if not _slots.acquire(timeout=_settings['queue_timeout']):
+        raise HashingBusyError('Cola de hashing llena')
+    try:
+        future = executor.submit(fn, *args)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+def _run(fn, *args):
+    return _submit(fn, *args).result()
+
+
+async def _run_async(fn, *args):
+    # Igual que _run pero sin bloquear el bucle de eventos mientras se espera el resultado
+    executor = get_executor()
+    loop = asyncio.get_running_loop()
+    if not _slots.acquire(blocking=False):
+        # Cola llena: esperar un hueco en un hilo auxiliar, no en el bucle
+        if not await loop.run_in_executor(None, _slots.acquire, True, _settings['queue_timeout']):
+            raise HashingBusyError('Cola de hashing llena')
+    try:
+        future = executor.submit(fn, *args)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return await asyncio.wrap_future(future)
+
+
+async def hash_password_async(password):
+    return await _run_async(partial(generate_password_hash, method=current_method()), password)
+
+
+async def verify_password_async(password_hash, password):
+    return await _run_async(check_password_hash, password_hash, password)
+
+
+def hash_password(password):
+    return _run(partial(generate_password_hash, method=current_method()), password)
+
+
+def verify_password(password_hash, password):
+    return _run(check_password_hash, password_hash, password)
+
+
+def needs_rehash(password_hash):
+    # El hash se generó con otro algoritmo o coste distinto del configurado
+    return password_hash.split('$', 1)[0] != _method_prefix(current_method())
+
+
+def hash_passwords(passwords):
+    # Calcula los hashes de un lote. Cada hash ocupa un hueco de la cola como los de login y
+    # registro (HashingBusyError si está llena), y el lote nunca tiene en vuelo más trabajos que
+    # la mitad de los procesos: las peticiones interactivas no esperan detrás de todo el lote.
+    fn = partial(generate_password_hash, method=current_method())
+    in_flight = max(1, _settings['workers'] // 2)
+    pending, hashes = deque(), []
+    try:
+        for password in passwords:
+            if len(pending) >= in_flight:
+                hashes.append(pending.popleft().result())
+            pending.append(_submit(fn, password))
+        while pending:
+            hashes.append(pending.popleft().result())
+    except BaseException:
+        # Los trabajos que aún no han empezado se descartan (y liberan su hueco)
+        for future in pending:
+            future.cancel()
+        raise
+    return hashes
+
+
+async def hash_passwords_async(passwords):
+    # hash_passwords sin bloquear el bucle de eventos: el lote espera sus resultados en un hilo auxiliar
+    return await asyncio.get_running_loop().run_in_executor(None, hash_passwords, passwords)
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
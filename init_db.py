@@ -0,0 +1,30 @@
+# init_db.py
+# Crea las tablas de la base de datos y el índice de búsqueda de usuarios. Se ejecuta una vez,
+# fuera del arranque de la aplicación (y de nuevo tras actualizar): python init_db.py
+from app import create_app
+from models import db, User
+from replicas import replica_router
+from search import create_search_index
+from sharding import prepare_shard, user_shards
+
+if __name__ == '__main__':
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as connection:
+            create_search_index(connection)
+        # Con USERS_SHARD_URIS: la tabla de usuarios en cada shard, con su rango de id y su índice
+        for index, engine in enumerate(user_shards.engines):
+            User.__table__.create(engine, checkfirst=True)
+            with engine.begin() as connection:
+                prepare_shard(connection, index)
+                create_search_index(connection)
+        # Con REPLICA_URIS: el esquema también en cada réplica (checkfirst: con replicación real ya
+        # llega del primario y no se hace nada). Una copia independiente sin replicación nunca
+        # recibe los latidos de replica_heartbeat y no se llega a usar; en local, la réplica debe
+        # ser el mismo fichero SQLite que el primario (ver REPLICA_URIS en config.py)
+        for replica in replica_router.replicas:
+            db.metadata.create_all(replica.engine)
+            with replica.engine.begin() as connection:
+                create_search_index(connection)
+    print('Tablas creadas.')
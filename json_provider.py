@@ -0,0 +1,118 @@
+# json_provider.py
+# Proveedores JSON de la aplicación (JSON_PROVIDER en config.py). Con orjson instalado las
+# respuestas se codifican en C; si no está, se usa el json de la biblioteca estándar. En ambos
+# casos la salida es idéntica byte a byte a la del proveedor por defecto de Flask: claves
+# ordenadas, escapes ASCII, fechas en formato HTTP (RFC 822) y respuestas compactas.
+import re
+from datetime import date, datetime, timezone
+from itertools import chain
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_DAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def http_date(value):
+    # Mismo resultado que werkzeug.http.http_date para date y datetime (las fechas sin zona
+    # horaria se consideran UTC), sin pasar por email.utils
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    elif value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return (f'{_DAYS[value.weekday()]}, {value.day:02d} {_MONTHS[value.month - 1]} {value.year:04d} '
+            f'{value.hour:02d}:{value.minute:02d}:{value.second:02d} GMT')
+
+
+def default(value):
+    if isinstance(value, date):
+        return http_date(value)
+    return DefaultJSONProvider.default(value)
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    # json de la biblioteca estándar con el formateo de fechas rápido
+    default = staticmethod(default)
+
+
+# Tipos que orjson codifica igual que json. Cualquier otro (float, Decimal, subclases...) se
+# codifica con json: orjson escribe 1e-05 como 0.00001 y NaN como null.
+_NATIVE_TYPES = frozenset((str, int, bool, type(None), datetime, date))
+_CONTAINER_TYPES = frozenset((dict, list, tuple))
+_ALLOWED_TYPES = _NATIVE_TYPES | _CONTAINER_TYPES
+_NON_ASCII = re.compile('[\x7f-\U0010ffff]')
+
+
+def _native_only(obj):
+    # Recorre el objeto por niveles; map/chain mantienen el recorrido en C
+    if type(obj) not in _CONTAINER_TYPES:
+        return type(obj) in _NATIVE_TYPES
+    level = [obj]
+    while True:
+        dicts = [item for item in level if type(item) is dict]
+        sequences = [item for item in level if type(item) is not dict] if len(dicts) < len(level) else []
+        types = set(map(type, chain(chain.from_iterable(map(dict.values, dicts)), chain.from_iterable(sequences))))
+        if not types <= _ALLOWED_TYPES:
+            return False
+        if not types & _CONTAINER_TYPES:
+            return True
+        level = [value for value in chain(chain.from_iterable(map(dict.values, dicts)), chain.from_iterable(sequences))
+                 if type(value) in _CONTAINER_TYPES]
+
+
+def _escape(match):
+    # Escape \uXXXX como json con ensure_ascii (pares sustitutos fuera del plano básico)
+    code = ord(match.group())
+    if code > 0xFFFF:
+        code -= 0x10000
+        return '\\u%04x\\u%04x' % (0xD800 | (code >> 10), 0xDC00 | (code & 0x3FF))
+    return '\\u%04x' % code
+
+
+class OrjsonProvider(StdlibJSONProvider):
+    # orjson para las respuestas compactas; lo que orjson no codifica igual pasa a json
+    def _encode(self, obj):
+        if not _native_only(obj):
+            return None
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_SUBCLASS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            data = orjson.dumps(obj, default=self.default, option=option)
+        except orjson.JSONEncodeError:
+            return None  # Claves que no son texto, enteros de más de 64 bits...
+        if self.ensure_ascii and (not data.isascii() or b'\x7f' in data):
+            data = _NON_ASCII.sub(_escape, data.decode()).encode()
+        return data
+
+    def dumps(self, obj, **kwargs):
+        if kwargs == {'separators': (',', ':')}:
+            data = self._encode(obj)
+            if data is not None:
+                return data.decode()
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)  # Salida indentada: la genera json
+        obj = self._prepare_response_obj(args, kwargs)
+        data = self._encode(obj)
+        if data is None:
+            data = super().dumps(obj, separators=(',', ':')).encode()
+        return self._app.response_class(data + b'\n', mimetype=self.mimetype)
+
+
+def json_provider_class(name):
+    # 'auto' usa orjson si está instalado; 'orjson' lo exige; 'stdlib' usa json
+    if name == 'stdlib' or (name == 'auto' and orjson is None):
+        return StdlibJSONProvider
+    if name in ('auto', 'orjson'):
+        if orjson is None:
+            raise RuntimeError("JSON_PROVIDER='orjson' requiere el paquete orjson")
+        return OrjsonProvider
+    raise ValueError(f'JSON_PROVIDER desconocido: {name}')
@@ -0,0 +1,243 @@
+# mail_queue.py
+# Envío de correos en segundo plano. Cada mensaje se guarda primero en una cola local en SQLite
+# (sobrevive a reinicios del proceso) y un grupo de hilos lo entrega por lotes, reutilizando la
+# conexión SMTP de cada hilo. Los fallos temporales se reintentan con espera exponencial; los
+# permanentes (códigos 5xx) o los que agotan los intentos quedan con estado 'failed'.
+# La entrega es "al menos una vez": si un proceso muere con un lote reservado, el lote se
+# vuelve a enviar cuando vence la reserva.
+import logging
+import os
+import random
+import smtplib
+import sqlite3
+import threading
+import time
+from email.message import EmailMessage
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recipient TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    locked_until REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+'''
+
+
+class MailQueue:
+    def __init__(self):
+        self._settings = {
+            'path': 'mail_queue.db',
+            'host': 'localhost',
+            'port': 25,
+            'username': '',
+            'password': '',
+            'starttls': False,
+            'timeout': 10.0,
+            'sender': 'no-reply@example.com',
+            'workers': 2,
+            'batch_size': 50,
+            'max_attempts': 8,
+            'retry_base': 5.0,
+            'retry_max': 900.0,
+            'poll_interval': 1.0,
+            'idle_timeout': 30.0,
+        }
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._threads_pid = None
+        self._lock = threading.Lock()
+
+    def configure(self, **settings):
+        unknown = set(settings) - set(self._settings)
+        if unknown:
+            raise ValueError(f'Opciones desconocidas: {", ".join(sorted(unknown))}')
+        self._settings.update(settings)
+
+    # --- Cola en SQLite ---
+
+    def _db(self):
+        # Una conexión por hilo y por proceso (no se comparten tras un fork)
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self._settings['path'], timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode = WAL')
+            connection.execute('PRAGMA synchronous = NORMAL')
+            connection.executescript(SCHEMA)
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return connection
+
+    def enqueue(self, recipient, subject, body):
+        now = time.time()
+        cursor = self._db().execute(
+            'INSERT INTO outbox (recipient, subject, body, next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?)',
+            (recipient, subject, body, now, now),
+        )
+        self.start()
+        self._wakeup.set()
+        return cursor.lastrowid
+
+    def claim(self, limit):
+        # Reserva un lote de mensajes vencidos para este hilo; otros procesos no lo tomarán
+        # hasta que venza la reserva
+        now = time.time()
+        lease = self._settings['timeout'] * (limit + 2)
+        db = self._db()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            rows = db.execute(
+                "SELECT id, recipient, subject, body, attempts FROM outbox "
+                "WHERE status = 'pending' AND next_attempt_at <= ? AND locked_until <= ? ORDER BY id LIMIT ?",
+                (now, now, limit),
+            ).fetchall()
+            db.executemany('UPDATE outbox SET locked_until = ? WHERE id = ?', [(now + lease, row[0]) for row in rows])
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        return rows
+
+    def _mark_sent(self, ids):
+        if ids:
+            self._db().execute(f"DELETE FROM outbox WHERE id IN ({', '.join('?' * len(ids))})", ids)
+
+    def _mark_failed(self, message_id, attempts, error, permanent):
+        attempts += 1
+        if permanent or attempts >= self._settings['max_attempts']:
+            logger.error('Correo %s descartado tras %s intentos: %s', message_id, attempts, error)
+            self._db().execute(
+                "UPDATE outbox SET status = 'failed', attempts = ?, last_error = ?, locked_until = 0 WHERE id = ?",
+                (attempts, error, message_id),
+            )
+            return
+        # Espera exponencial con variación aleatoria para no reintentar todos a la vez
+        delay = min(self._settings['retry_max'], self._settings['retry_base'] * 2 ** (attempts - 1))
+        delay *= random.uniform(0.5, 1.0)
+        self._db().execute(
+            'UPDATE outbox SET attempts = ?, last_error = ?, next_attempt_at = ?, locked_until = 0 WHERE id = ?',
+            (attempts, error, time.time() + delay, message_id),
+        )
+
+    def stats(self):
+        rows = self._db().execute('SELECT status, COUNT(*) FROM outbox GROUP BY status').fetchall()
+        return {'pending': 0, 'failed': 0, **dict(rows)}
+
+    # --- Entrega por SMTP ---
+
+    def _connect(self):
+        settings = self._settings
+        smtp = smtplib.SMTP(settings['host'], settings['port'], timeout=settings['timeout'])
+        if settings['starttls']:
+            smtp.starttls()
+        if settings['username']:
+            smtp.login(settings['username'], settings['password'])
+        return smtp
+
+    def _message(self, recipient, subject, body):
+        message = EmailMessage()
+        message['From'] = self._settings['sender']
+        message['To'] = recipient
+        message['Subject'] = subject
+        message.set_content(body)
+        return message
+
+    def deliver(self, batch, smtp=None):
+        # Envía un lote por una misma conexión. Devuelve la conexión (o None si se cerró)
+        # para reutilizarla en el siguiente lote.
+        sent = []
+        for message_id, recipient, subject, body, attempts in batch:
+            try:
+                if smtp is None:
+                    smtp = self._connect()
+                smtp.send_message(self._message(recipient, subject, body))
+                sent.append(message_id)
+            except smtplib.SMTPRecipientsRefused as e:
+                codes = [code for code, _ in e.recipients.values()]
+                self._mark_failed(message_id, attempts, str(e.recipients), permanent=min(codes) >= 500)
+            except smtplib.SMTPResponseException as e:
+                self._mark_failed(message_id, attempts, f'{e.smtp_code} {e.smtp_error!r}', permanent=e.smtp_code >= 500)
+                if e.smtp_code == 421:  # El servidor cierra la conexión
+                    smtp = self._close(smtp)
+            except (smtplib.SMTPException, OSError) as e:
+                # Conexión caída o servidor inaccesible: reintentar más tarde con una conexión nueva
+                self._mark_failed(message_id, attempts, repr(e), permanent=False)
+                smtp = self._close(smtp)
+        self._mark_sent(sent)
+        return smtp
+
+    def _close(self, smtp):
+        if smtp is not None:
+            try:
+                smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                smtp.close()
+        return None
+
+    def deliver_pending(self):
+        # Entrega en el hilo actual todo lo que esté vencido (script mail_worker.py --once)
+        smtp, delivered = None, 0
+        try:
+            while True:
+                batch = self.claim(self._settings['batch_size'])
+                if not batch:
+                    return delivered
+                smtp = self.deliver(batch, smtp)
+                delivered += len(batch)
+        finally:
+            self._close(smtp)
+
+    # --- Hilos de entrega ---
+
+    def _run(self):
+        smtp, last_used = None, 0.0
+        while not self._stopping.is_set():
+            try:
+                batch = self.claim(self._settings['batch_size'])
+            except sqlite3.Error:
+                logger.exception('No se pudo leer la cola de correo')
+                batch = []
+            if batch:
+                smtp, last_used = self.deliver(batch, smtp), time.monotonic()
+                continue
+            # Sin trabajo: cerrar la conexión si lleva tiempo sin usarse y esperar
+            if smtp is not None and time.monotonic() - last_used > self._settings['idle_timeout']:
+                smtp = self._close(smtp)
+            self._wakeup.wait(self._settings['poll_interval'])
+            self._wakeup.clear()
+        self._close(smtp)
+
+    def start(self):
+        # Los hilos se crean al primer uso en cada proceso (después del fork de gunicorn)
+        with self._lock:
+            if self._threads_pid == os.getpid() or self._settings['workers'] <= 0:
+                return
+            self._stopping.clear()
+            self._threads = [
+                threading.Thread(target=self._run, name=f'mail-worker-{index}', daemon=True)
+                for index in range(self._settings['workers'])
+            ]
+            for thread in self._threads:
+                thread.start()
+            self._threads_pid = os.getpid()
+
+    def stop(self, timeout=None):
+        with self._lock:
+            self._stopping.set()
+            self._wakeup.set()
+            for thread in self._threads:
+                thread.join(timeout)
+            self._threads, self._threads_pid = [], None
+
+
+mail_queue = MailQueue()
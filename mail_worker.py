@@ -0,0 +1,32 @@
+# mail_worker.py
+# Proceso dedicado a entregar la cola de correo (útil con MAIL_WORKERS=0 en la aplicación).
+# python mail_worker.py           -> entrega de forma continua con MAIL_WORKERS hilos (al menos uno)
+# python mail_worker.py --once    -> entrega lo pendiente y termina
+import argparse
+import logging
+import signal
+import threading
+
+from app import create_app
+from mail_queue import mail_queue
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Entrega la cola de correo saliente')
+    parser.add_argument('--once', action='store_true', help='entregar lo pendiente y terminar')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    app = create_app()
+    if args.once:
+        delivered = mail_queue.deliver_pending()
+        print(f'{delivered} correos procesados; {mail_queue.stats()}')
+    else:
+        mail_queue.configure(workers=max(1, app.config['MAIL_WORKERS']))
+        stopped = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+        mail_queue.start()
+        try:
+            stopped.wait()
+        except KeyboardInterrupt:
+            pass
+        mail_queue.stop(timeout=30)
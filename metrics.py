@@ -0,0 +1,189 @@
+# metrics.py
+# Métricas en formato de texto de Prometheus expuestas en GET /metrics: latencia por ruta y
+# estado, y número de consultas SQL y tiempo en SQL de cada petición. Con gunicorn, definir
+# PROMETHEUS_MULTIPROC_DIR para agregar los valores de todos los procesos. El modo asíncrono
+# (async_app.py) registra las mismas métricas con init_async_app.
+import os
+import sys
+import time
+from flask import Response, g, has_request_context, request
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Histogram, REGISTRY, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Latencia de las peticiones HTTP',
+    ['method', 'route', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_DB_QUERIES = Histogram(
+    'http_request_db_queries', 'Consultas SQL emitidas por petición',
+    ['method', 'route'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50),
+)
+REQUEST_DB_SECONDS = Histogram(
+    'http_request_db_seconds', 'Tiempo total en SQL por petición',
+    ['method', 'route'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+# Métricas que se leen en el momento de la consulta (pool, caché de tokens); son por proceso
+_runtime_registry = CollectorRegistry()
+_runtime_collector = None
+
+
+class RuntimeCollector:
+    def __init__(self, engines, pool_metrics=None, token_cache=None, token_blocklist=None, replica_router=None):
+        self.engines = engines
+        self.pool_metrics = pool_metrics
+        self.token_cache = token_cache
+        self.token_blocklist = token_blocklist
+        self.replica_router = replica_router
+
+    def collect(self):
+        if self.pool_metrics is not None:
+            checked_out = GaugeMetricFamily('db_pool_checked_out', 'Conexiones en uso', labels=['bind'])
+            overflow = GaugeMetricFamily('db_pool_overflow', 'Conexiones por encima de pool_size', labels=['bind'])
+            for bind, engine in self.engines.items():
+                status = self.pool_metrics.snapshot(engine.pool)
+                checked_out.add_metric([str(bind or 'default')], status.get('checked_out', 0))
+                overflow.add_metric([str(bind or 'default')], status.get('overflow', 0))
+            yield checked_out
+            yield overflow
+            status = self.pool_metrics.snapshot(None)
+            yield CounterMetricFamily('db_pool_checkouts', 'Checkouts de conexiones', value=status['checkouts'])
+            yield CounterMetricFamily('db_pool_timeouts', 'Checkouts que agotaron pool_timeout', value=status['timeouts'])
+            yield CounterMetricFamily('db_pool_wait_seconds', 'Tiempo total esperando una conexión',
+                                      value=status['wait_seconds_total'])
+        if self.token_cache is not None:
+            stats = self.token_cache.stats()
+            yield CounterMetricFamily('jwt_token_cache_hits', 'Tokens servidos desde la caché', value=stats['hits'])
+            yield CounterMetricFamily('jwt_token_cache_misses', 'Tokens verificados de nuevo', value=stats['misses'])
+            yield GaugeMetricFamily('jwt_token_cache_size', 'Tokens en caché', value=stats['size'])
+        if self.token_blocklist is not None:
+            stats = self.token_blocklist.stats()
+            yield GaugeMetricFamily('jwt_revoked_filter_size', 'jti revocados en el filtro de Bloom', value=stats['size'])
+            yield CounterMetricFamily('jwt_revoked_lookups', 'Positivos del filtro confirmados en la base de datos',
+                                      value=stats['lookups'])
+            yield CounterMetricFamily('jwt_revoked_false_positives', 'Positivos del filtro que no estaban revocados',
+                                      value=stats['false_positives'])
+        if self.replica_router is not None and self.replica_router.enabled:
+            healthy = GaugeMetricFamily('db_replica_healthy', 'Réplica disponible (1) o fuera de servicio (0)',
+                                        labels=['replica'])
+            lag = GaugeMetricFamily('db_replica_lag_seconds', 'Retraso de replicación medido', labels=['replica'])
+            reads = CounterMetricFamily('db_replica_reads', 'Peticiones de lectura servidas por la réplica',
+                                        labels=['replica'])
+            for stats in self.replica_router.stats():
+                healthy.add_metric([stats['name']], int(stats['healthy']))
+                reads.add_metric([stats['name']], stats['reads'])
+                if stats['lag'] is not None:
+                    lag.add_metric([stats['name']], stats['lag'])
+            yield healthy
+            yield lag
+            yield reads
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _request_globals():
+    # g de la petición en curso (Flask o Quart) o None fuera de una petición. Quart solo se
+    # consulta si ya está importado: en el modo síncrono no puede haber peticiones de Quart.
+    if has_request_context():
+        return g
+    quart = sys.modules.get('quart')
+    if quart is not None and quart.has_request_context():
+        return quart.g
+    return None
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+    request_globals = _request_globals()
+    if request_globals is not None:
+        request_globals.db_queries = request_globals.get('db_queries', 0) + 1
+        request_globals.db_seconds = request_globals.get('db_seconds', 0.0) + elapsed
+
+
+def _listen(engine):
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def _observe(request_globals, method, url_rule, status_code):
+    start = request_globals.pop('request_start', None)
+    if start is None:
+        return
+    route = url_rule.rule if url_rule else 'unmatched'
+    REQUEST_LATENCY.labels(method, route, str(status_code)).observe(time.perf_counter() - start)
+    REQUEST_DB_QUERIES.labels(method, route).observe(request_globals.get('db_queries', 0))
+    REQUEST_DB_SECONDS.labels(method, route).observe(request_globals.get('db_seconds', 0.0))
+
+
+def _start_timer():
+    g.request_start = time.perf_counter()
+
+
+def _record_request(response):
+    _observe(g, request.method, request.url_rule, response.status_code)
+    return response
+
+
+def metrics_body():
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry) + generate_latest(_runtime_registry)
+
+
+def metrics_view():
+    return Response(metrics_body(), mimetype=CONTENT_TYPE_LATEST)
+
+
+def _register_collector(collector):
+    global _runtime_collector
+    if _runtime_collector is not None:
+        _runtime_registry.unregister(_runtime_collector)
+    _runtime_collector = collector
+    _runtime_registry.register(_runtime_collector)
+
+
+def init_app(app, engines, pool_metrics=None, token_cache=None, token_blocklist=None, replica_router=None):
+    for engine in engines.values():
+        _listen(engine)
+
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view, methods=['GET'])
+
+    _register_collector(RuntimeCollector(engines, pool_metrics, token_cache, token_blocklist, replica_router))
+
+
+def init_async_app(app, engine, token_cache=None, token_blocklist=None):
+    # Las mismas métricas para la aplicación de Quart. Los eventos de SQL se registran en el
+    # motor síncrono subyacente; el g de Quart llega a ellos por contextvars.
+    from quart import Response as AsyncResponse, g as async_g, request as async_request
+
+    _listen(engine.sync_engine)
+
+    async def start_timer():
+        async_g.request_start = time.perf_counter()
+
+    async def record_request(response):
+        _observe(async_g, async_request.method, async_request.url_rule, response.status_code)
+        return response
+
+    async def async_metrics_view():
+        return AsyncResponse(metrics_body(), mimetype=CONTENT_TYPE_LATEST)
+
+    app.before_request(start_timer)
+    app.after_request(record_request)
+    app.add_url_rule('/metrics', 'metrics', async_metrics_view, methods=['GET'])
+
+    # Sin estadísticas del pool: el pool de asyncio no pasa por db_pool.py
+    _register_collector(RuntimeCollector({}, None, token_cache, token_blocklist))
@@ -4,12 +4,36 @@ from flask_sqlalchemy import SQLAlchemy
 db = SQLAlchemy()
 
 class User(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
+    # AUTOINCREMENT en SQLite: el contador (sqlite_sequence) fija el rango de id de cada shard
+    # BIGINT en MySQL: cada shard empieza en índice * 2**40 (sharding.SHARD_ID_SPAN), fuera del
+    # rango de INT. SQLite solo usa AUTOINCREMENT con INTEGER PRIMARY KEY (ya es de 64 bits).
+    __table_args__ = {'sqlite_autoincrement': True}
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(512), nullable=False)  # Aumentar el tamaño aquí
     created_at = db.Column(db.DateTime, default=datetime.utcnow)  # Columna de creación
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Columna de actualización
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Columna de actualización (indexada para MAX(updated_at))
 
     def __repr__(self):
         return f'<User {self.username}>'
+
+
+class RevokedToken(db.Model):
+    # Tokens revocados: un jti concreto (cierre de sesión) o, con issued_before, todos los tokens
+    # del usuario emitidos antes de ese instante (restablecimiento de contraseña)
+    __tablename__ = 'revoked_token'
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True)
+    subject = db.Column(db.String(120), nullable=False)
+    issued_before = db.Column(db.BigInteger)  # Milisegundos desde epoch ('iat' * 1000)
+    expires_at = db.Column(db.DateTime, index=True)  # Después ya no hay tokens afectados vigentes
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+class ReplicaHeartbeat(db.Model):
+    # Una fila que los procesos actualizan en el primario; su valor en cada réplica indica
+    # cuánto retraso lleva la replicación (replicas.py)
+    __tablename__ = 'replica_heartbeat'
+    id = db.Column(db.Integer, primary_key=True)
+    beat_at = db.Column(db.Float, nullable=False)  # Segundos desde epoch
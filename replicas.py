@@ -0,0 +1,171 @@
+# replicas.py
+# Lecturas en réplicas de la base de datos principal (REPLICA_URIS en config.py). Un hilo por
+# proceso comprueba cada réplica periódicamente:
+# - Retraso: el proceso escribe la hora en replica_heartbeat del primario y lee la que ha llegado
+#   a cada réplica. Si la réplica ya tiene el último latido, está al día; si no, le falta todo lo
+#   escrito desde el primer latido que no ha recibido, y el retraso es la hora actual menos la de
+#   ese latido (no depende de check_interval). Los relojes de los procesos deben estar sincronizados.
+# - Latencia: media móvil del tiempo de esa lectura.
+# Solo se eligen réplicas sanas con retraso por debajo del máximo; si no hay ninguna, se lee
+# del primario. Una réplica que falla queda fuera hasta la siguiente comprobación correcta.
+import itertools
+import math
+from collections import deque
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import select, update, insert
+
+from models import ReplicaHeartbeat
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ('round_robin', 'least_latency')
+
+
+class ReplicaState:
+    def __init__(self, engine):
+        self.engine = engine
+        self.name = engine.url.render_as_string(hide_password=True)
+        self.lag = None
+        self.latency = None
+        self.healthy = False  # Hasta la primera comprobación no se usa
+        self.reads = 0  # Peticiones enviadas a esta réplica
+
+
+class ReplicaRouter:
+    def __init__(self):
+        self.primary = None
+        self.replicas = []
+        self._settings = {'strategy': 'round_robin', 'max_lag': 2.0, 'check_interval': 1.0}
+        self._counter = itertools.count()
+        self._beats = deque()  # Últimos latidos escritos en el primario, del más antiguo al más reciente
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._thread_pid = None
+
+    def configure(self, primary, replicas, **settings):
+        unknown = set(settings) - set(self._settings)
+        if unknown:
+            raise ValueError(f'Opciones desconocidas: {", ".join(sorted(unknown))}')
+        if settings.get('strategy', self._settings['strategy']) not in STRATEGIES:
+            raise ValueError(f"REPLICA_STRATEGY debe ser {' o '.join(STRATEGIES)}")
+        merged = {**self._settings, **settings}
+        # Con un intervalo mayor que el retraso máximo, una réplica al día se descartaría entre
+        # dos comprobaciones
+        if not 0 < merged['check_interval'] < merged['max_lag']:
+            raise ValueError('REPLICA_CHECK_INTERVAL debe ser mayor que 0 y menor que REPLICA_MAX_LAG')
+        self.stop()
+        self._settings = merged
+        # Latidos suficientes para cubrir más que max_lag: una réplica más atrasada que el más
+        # antiguo ya supera el máximo
+        self._beats = deque(maxlen=math.ceil(merged['max_lag'] / merged['check_interval']) + 2)
+        self.primary = primary
+        self.replicas = [ReplicaState(engine) for engine in replicas]
+
+    @property
+    def enabled(self):
+        return bool(self.replicas)
+
+    # --- Selección ---
+
+    def choose(self):
+        # Motor de una réplica utilizable o None (leer del primario)
+        self.start()
+        candidates = [
+            replica for replica in self.replicas
+            if replica.healthy and replica.lag is not None and replica.lag <= self._settings['max_lag']
+        ]
+        if not candidates:
+            return None
+        if self._settings['strategy'] == 'least_latency':
+            chosen = min(candidates, key=lambda replica: replica.latency)
+        else:
+            chosen = candidates[next(self._counter) % len(candidates)]
+        chosen.reads += 1
+        return chosen.engine
+
+    def mark_failed(self, engine):
+        for replica in self.replicas:
+            if replica.engine is engine:
+                replica.healthy = False
+                logger.warning('Réplica %s fuera de servicio hasta la siguiente comprobación', replica.name)
+
+    # --- Comprobación ---
+
+    def _heartbeat(self):
+        # Escribe la hora actual en el primario y la añade a los latidos conocidos
+        table = ReplicaHeartbeat.__table__
+        now = time.time()
+        with self.primary.begin() as connection:
+            if connection.execute(update(table).where(table.c.id == 1).values(beat_at=now)).rowcount == 0:
+                connection.execute(insert(table).values(id=1, beat_at=now))
+        self._beats.append(now)
+
+    def _lag(self, replica_beat):
+        # Segundos desde que se escribió el primer latido que la réplica todavía no tiene
+        missing = next((beat for beat in self._beats if beat > replica_beat), None)
+        return 0.0 if missing is None else max(0.0, time.time() - missing)
+
+    def check(self):
+        # Una ronda de comprobación de todas las réplicas
+        table = ReplicaHeartbeat.__table__
+        self._heartbeat()
+        for replica in self.replicas:
+            start = time.perf_counter()
+            try:
+                with replica.engine.connect() as connection:
+                    replica_beat = connection.scalar(select(table.c.beat_at).where(table.c.id == 1))
+            except Exception as e:  # Cualquier fallo (conexión, esquema...) la deja fuera
+                if replica.healthy:
+                    logger.warning('Réplica %s no disponible: %s', replica.name, e)
+                replica.healthy = False
+                continue
+            latency = time.perf_counter() - start
+            replica.latency = latency if replica.latency is None else 0.8 * replica.latency + 0.2 * latency
+            # Sin latido replicado todavía, el retraso se desconoce y la réplica no se usa
+            replica.lag = None if replica_beat is None else self._lag(replica_beat)
+            replica.healthy = True
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                self.check()
+            except Exception:
+                # Sin primario no se puede medir el retraso: ninguna réplica se considera al día
+                logger.exception('No se pudo comprobar el estado de las réplicas')
+                for replica in self.replicas:
+                    replica.lag = None
+            self._stopping.wait(self._settings['check_interval'])
+
+    def start(self):
+        # El hilo se crea al primer uso en cada proceso (después del fork de gunicorn)
+        if self._thread_pid == os.getpid() or not self.enabled:
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='replica-monitor', daemon=True)
+            self._thread.start()
+            self._thread_pid = os.getpid()
+
+    def stop(self, timeout=None):
+        with self._lock:
+            self._stopping.set()
+            if self._thread is not None and self._thread_pid == os.getpid():
+                self._thread.join(timeout)
+            self._thread, self._thread_pid = None, None
+
+    def stats(self):
+        return [
+            {'name': replica.name, 'healthy': replica.healthy, 'lag': replica.lag, 'latency': replica.latency,
+             'reads': replica.reads}
+            for replica in self.replicas
+        ]
+
+
+replica_router = ReplicaRouter()
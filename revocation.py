@@ -0,0 +1,167 @@
+# revocation.py
+# Revocación de JWT: por jti (cierre de sesión) y por usuario (todos los tokens emitidos antes de
+# un restablecimiento de contraseña). La tabla revoked_token es la fuente de verdad; cada proceso
+# la sigue de forma incremental y guarda los jti en un filtro de Bloom, de modo que un token no
+# revocado (el caso habitual) se resuelve en memoria. Solo un positivo del filtro (revocado de
+# verdad o falso positivo) se confirma con una consulta a la tabla.
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+
+# Margen al releer las revocaciones recientes: una fila con created_at anterior a la última
+# sincronizada puede confirmarse más tarde (transacciones concurrentes, relojes de otros hosts)
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class BloomFilter:
+    # Conjunto probabilístico de tamaño fijo: sin falsos negativos y con una tasa de falsos
+    # positivos cercana a error_rate mientras no se superen capacity elementos.
+    # 100 000 jti al 0,1 % ocupan unos 180 KiB (un set de cadenas, más de 10 MiB).
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(1, capacity)
+        self.size = max(64, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    @staticmethod
+    def _hash(key):
+        # Doble hash (Kirsch-Mitzenmacher): las k posiciones salen de un único blake2b
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+    def _positions(self, key):
+        h1, h2 = self._hash(key)
+        return [(h1 + index * h2) % self.size for index in range(self.hashes)]
+
+    def add(self, key):
+        positions = self._positions(key)
+        bits = self._bits
+        if all(bits[position >> 3] & (1 << (position & 7)) for position in positions):
+            return  # Ya presente (o colisión): no cuenta para la capacidad
+        for position in positions:
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        # Se detiene en el primer bit a cero: un jti no revocado se descarta en una o dos posiciones
+        h1, h2 = self._hash(key)
+        bits, size = self._bits, self.size
+        for index in range(self.hashes):
+            position = (h1 + index * h2) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class TokenBlocklist:
+    # Copia en memoria de revoked_token. check() devuelve True (revocado), False (no revocado)
+    # o None (el filtro no puede descartarlo: hay que consultar la tabla). Las revocaciones de
+    # este proceso se aplican al momento; las de otros procesos, en la siguiente sincronización.
+    def __init__(self, capacity=100000, error_rate=0.001):
+        self._lock = threading.Lock()
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._filter = BloomFilter(capacity, error_rate)
+        self._cutoffs = {}  # sub -> instante de revocación en milisegundos (pocos: solo los restablecimientos vigentes)
+        self._local = []  # Revocaciones de este proceso desde la última carga completa
+        self._watermark = None
+        self._loaded_at = None
+        self._synced_at = 0.0
+        self.lookups = 0
+        self.false_positives = 0
+
+    def configure(self, capacity, error_rate):
+        with self._lock:
+            self.capacity, self.error_rate = capacity, error_rate
+            self._filter = BloomFilter(capacity, error_rate)
+            self._cutoffs, self._local = {}, []
+            self._watermark, self._loaded_at, self._synced_at = None, None, 0.0
+
+    # --- Sincronización con la tabla ---
+
+    def sync_due(self, interval, rebuild_interval):
+        # 'full' (cargar todo), 'incremental' (solo lo nuevo) o None. Salvo la primera carga,
+        # la sincronización la reserva un único hilo; los demás siguen con la copia actual.
+        now = time.monotonic()
+        with self._lock:
+            if self._loaded_at is None:
+                return 'full'
+            if now - self._synced_at < interval:
+                return None
+            self._synced_at = now
+            # El filtro se reconstruye al llenarse y periódicamente, para olvidar lo caducado
+            if self._filter.count > self._filter.capacity or now - self._loaded_at >= rebuild_interval:
+                return 'full'
+            return 'incremental'
+
+    def since(self):
+        with self._lock:
+            return None if self._watermark is None else self._watermark - SYNC_OVERLAP
+
+    def load(self, rows):
+        # rows: (jti, sub, issued_before, created_at) de todas las revocaciones sin caducar
+        rows = list(rows)
+        bloom = BloomFilter(max(self.capacity, 2 * len(rows)), self.error_rate)
+        cutoffs = {}
+        with self._lock:
+            local, self._local = self._local, []
+        for row in rows + local:
+            self._apply(bloom, cutoffs, row)
+        with self._lock:
+            self._filter, self._cutoffs = bloom, cutoffs
+            self._watermark = max((row[3] for row in rows), default=None)
+            self._loaded_at = self._synced_at = time.monotonic()
+
+    def merge(self, rows):
+        with self._lock:
+            for row in rows:
+                self._apply(self._filter, self._cutoffs, row)
+                if self._watermark is None or row[3] > self._watermark:
+                    self._watermark = row[3]
+
+    @staticmethod
+    def _apply(bloom, cutoffs, row):
+        jti, subject, issued_before = row[:3]
+        if jti is not None:
+            bloom.add(jti)
+        if issued_before is not None:
+            cutoffs[subject] = max(cutoffs.get(subject, 0), issued_before)
+
+    def add(self, row):
+        # Revocación hecha por este proceso (ya confirmada en la tabla)
+        with self._lock:
+            self._apply(self._filter, self._cutoffs, row)
+            self._local.append(row)
+
+    # --- Comprobación ---
+
+    def check(self, claims):
+        cutoff = self._cutoffs.get(claims.get('sub'))
+        if cutoff is not None and claims.get('iat', 0) * 1000 < cutoff:
+            return True
+        jti = claims.get('jti')
+        if jti is None or jti not in self._filter:
+            return False
+        return None
+
+    def record_lookup(self, revoked):
+        with self._lock:
+            self.lookups += 1
+            if not revoked:
+                self.false_positives += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': self._filter.count,
+                'capacity': self._filter.capacity,
+                'cutoffs': len(self._cutoffs),
+                'lookups': self.lookups,
+                'false_positives': self.false_positives,
+            }
+
+
+token_blocklist = TokenBlocklist()
@@ -13,7 +13,18 @@ update_user_schema = {
     "type": "object",
     "properties": {
         "nombre": {"type": "string"},
-        "email": {"type": "string", "format": "email"}
+        "email": {"type": "string", "format": "email"},
+        "clave": {"type": "string"}  # Se acepta y se ignora: los clientes envían el usuario completo
     },
     "additionalProperties": False  # No permitir campos adicionales
 }
+
+bulk_delete_schema = {
+    "type": "object",
+    "properties": {
+        "emails": {"type": "array", "items": {"type": "string"}, "minItems": 1},
+        "ids": {"type": "array", "items": {"type": "integer"}, "minItems": 1}
+    },
+    "oneOf": [{"required": ["emails"]}, {"required": ["ids"]}],  # Emails o ids, no ambos
+    "additionalProperties": False
+}
@@ -0,0 +1,97 @@
+# search.py
+# Búsqueda de usuarios por prefijo o subcadena del nombre o del email (GET /usuarios/buscar).
+# - SQLite: tabla FTS5 user_search con el tokenizador trigram, sincronizada con triggers.
+# - MySQL: índice FULLTEXT con el parser ngram para las subcadenas; los prefijos usan los
+#   índices únicos de username y email (LIKE 'abc%').
+# - Otros motores, o si no se ha creado el índice (python init_db.py): LIKE sobre la tabla.
+# Los resultados van ordenados por id para paginar por cursor como GET /usuarios/.
+from sqlalchemy import and_, column, literal_column, or_, select, table, text
+
+from models import User
+
+SEARCH_MODES = ('substring', 'prefix')
+# Los índices trabajan con trigramas: una búsqueda más corta no puede usarlos
+MIN_QUERY_LENGTH = 3
+
+_FTS = table('user_search', column('rowid'))
+
+SQLITE_INDEX = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS user_search USING fts5("
+    "username, email, content='user', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS user_search_insert AFTER INSERT ON user BEGIN "
+    "INSERT INTO user_search (rowid, username, email) VALUES (new.id, new.username, new.email); END",
+    "CREATE TRIGGER IF NOT EXISTS user_search_delete AFTER DELETE ON user BEGIN "
+    "INSERT INTO user_search (user_search, rowid, username, email) VALUES ('delete', old.id, old.username, old.email); END",
+    "CREATE TRIGGER IF NOT EXISTS user_search_update AFTER UPDATE OF username, email ON user BEGIN "
+    "INSERT INTO user_search (user_search, rowid, username, email) VALUES ('delete', old.id, old.username, old.email); "
+    "INSERT INTO user_search (rowid, username, email) VALUES (new.id, new.username, new.email); END",
+    "INSERT INTO user_search (user_search) VALUES ('rebuild')",  # Indexa las filas que ya existían
+)
+
+# ngram divide el texto en n-gramas (ngram_token_size, 3 en docker-compose). Conviene desactivar
+# las stopwords (innodb_ft_enable_stopword=OFF): los n-gramas que las contienen no se indexan.
+MYSQL_INDEX = (
+    "ALTER TABLE user ADD FULLTEXT INDEX user_search (username, email) WITH PARSER ngram",
+)
+
+# Consulta que indica si el índice de búsqueda existe
+SEARCH_INDEX_PROBES = {
+    'sqlite': "SELECT 1 FROM sqlite_master WHERE name = 'user_search'",
+    'mysql': "SELECT 1 FROM information_schema.statistics "
+             "WHERE table_schema = DATABASE() AND table_name = 'user' AND index_name = 'user_search'",
+}
+
+
+# Motor detectado por base de datos (una vez por proceso: tras crear el índice hay que reiniciar)
+search_backends = {}
+
+
+def search_index_probe(dialect_name):
+    probe = SEARCH_INDEX_PROBES.get(dialect_name)
+    return text(probe) if probe else None
+
+
+def create_search_index(connection):
+    # Idempotente: se ejecuta desde init_db.py, también sobre bases de datos existentes
+    dialect_name = connection.dialect.name
+    statements = {'sqlite': SQLITE_INDEX, 'mysql': MYSQL_INDEX}.get(dialect_name)
+    if statements is None:
+        return False
+    if dialect_name == 'mysql' and connection.execute(search_index_probe(dialect_name)).first():
+        return True
+    for statement in statements:
+        connection.execute(text(statement))
+    return True
+
+
+def validate_search(q, mode):
+    # Mensaje de error o None si los parámetros son válidos
+    if mode not in SEARCH_MODES:
+        return "mode debe ser 'substring' o 'prefix'"
+    if len(q) < MIN_QUERY_LENGTH:
+        return f'La búsqueda debe tener al menos {MIN_QUERY_LENGTH} caracteres'
+    return None
+
+
+def search_query(backend, q, mode, after, limit):
+    # backend: 'sqlite' o 'mysql' si existe el índice; 'like' en otro caso
+    query = select(User.id, User.username, User.email)
+    if backend == 'sqlite':
+        # Frase entre comillas (las comillas internas se duplican); '^' la ancla al inicio de la columna
+        phrase = '"' + q.replace('"', '""') + '"'
+        return (query.join(_FTS, _FTS.c.rowid == User.id)
+                .where(literal_column('user_search').op('MATCH')('^' + phrase if mode == 'prefix' else phrase),
+                       _FTS.c.rowid > after)
+                .order_by(_FTS.c.rowid).limit(limit))
+
+    if mode == 'prefix':
+        condition = or_(User.username.startswith(q, autoescape=True), User.email.startswith(q, autoescape=True))
+    else:
+        condition = or_(User.username.contains(q, autoescape=True), User.email.contains(q, autoescape=True))
+        if backend == 'mysql':
+            # El índice FULLTEXT reduce los candidatos; LIKE descarta los n-gramas que no son
+            # contiguos en el texto original (p. ej. omitidos por stopwords)
+            from sqlalchemy.dialects.mysql import match  # Solo se importa con MySQL
+            phrase = '"' + q.replace('"', ' ') + '"'
+            condition = and_(match(User.username, User.email, against=phrase).in_boolean_mode(), condition)
+    return query.where(condition, User.id > after).order_by(User.id).limit(limit)
@@ -0,0 +1,154 @@
+# seed_db.py
+# Carga masiva de usuarios de prueba generados con Faker a partir de una semilla: la fila número
+# N es siempre la misma para la misma semilla, sea cual sea el --start con que se cargue. Inserta por bloques con
+# INSERT de varias filas directamente sobre la tabla (sin la unit of work del ORM) y, como
+# las contraseñas solo tienen que ser válidas, reutiliza un único hash calculado al principio.
+#
+# Uso:
+#   python seed_db.py --count 10000000
+#   python seed_db.py --count 100000 --seed 7 --start 100000 --password secreto123
+# Todos los usuarios generados inician sesión con --password. Los nombres y correos llevan el
+# número de fila como sufijo, así que para añadir más filas a una carga anterior (o reanudar una
+# interrumpida) se continúa desde --start = filas ya cargadas; volver a cargar filas ya presentes
+# falla por correo duplicado en lugar de repetirlas. Con USERS_SHARD_URIS cada fila se inserta en el shard de su
+# correo, como haría la API.
+import argparse
+import hashlib
+import sys
+import time
+from contextlib import ExitStack
+from datetime import datetime
+
+from faker import Faker
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import generate_password_hash
+
+import hashing
+from app import create_app
+from models import db, User
+from sharding import shard_for_email, user_shards
+
+# Tamaño de las listas de nombres y dominios que se generan con Faker; cada fila combina
+# elementos al azar de estas listas, mucho más rápido que llamar a Faker por fila
+POOL_SIZE = 500
+SEED_COLUMNS = ('username', 'email', 'password_hash', 'created_at', 'updated_at')
+
+
+def build_pools(seed):
+    fake = Faker()
+    fake.seed_instance(seed)
+    first_names = [fake.first_name() for _ in range(POOL_SIZE)]
+    last_names = [fake.last_name() for _ in range(POOL_SIZE)]
+    domains = [fake.free_email_domain() for _ in range(POOL_SIZE // 10)]
+    return first_names, last_names, domains
+
+
+def generate_rows(seed, start, count):
+    # Genera (nombre, correo) de forma perezosa. Cada fila depende solo de (semilla, número), no
+    # de --start: una carga en varios tramos produce las mismas filas que una sola. Las elecciones
+    # salen de un blake2b de (semilla, número), unas 6 veces más rápido que un random.Random por fila.
+    first_names, last_names, domains = build_pools(seed)
+    for number in range(start, start + count):
+        value = int.from_bytes(hashlib.blake2b(b'%d:%d' % (seed, number), digest_size=16).digest(), 'little')
+        value, first = divmod(value, len(first_names))
+        value, last = divmod(value, len(last_names))
+        first, last, domain = first_names[first], last_names[last], domains[value % len(domains)]
+        yield f'{first} {last} {number}', f'{first}.{last}.{number}@{domain}'.lower()
+
+
+def tune_connection(connection):
+    # Ajustes solo de esta conexión para acelerar la carga; no cambian la configuración global
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        connection.exec_driver_sql('PRAGMA synchronous = OFF')
+    # La comprobación de unicidad se mantiene: un --start que se solapa con una carga anterior
+    # debe fallar por el correo duplicado, no dejar filas repetidas
+
+
+def multi_row_insert(dialect, rows):
+    # Texto de INSERT ... VALUES (...), (...) para el driver. Se construye a mano porque
+    # compilar con SQLAlchemy un INSERT de miles de parámetros cuesta más que ejecutarlo.
+    placeholders = {'qmark': '?', 'format': '%s', 'pyformat': '%s'}
+    if dialect.paramstyle not in placeholders:
+        raise ValueError(f'paramstyle no soportado: {dialect.paramstyle}')
+    preparer = dialect.identifier_preparer
+    table = User.__table__
+    columns = ', '.join(preparer.quote(name) for name in SEED_COLUMNS)
+    row = '(' + ', '.join([placeholders[dialect.paramstyle]] * len(SEED_COLUMNS)) + ')'
+    return f'INSERT INTO {preparer.format_table(table)} ({columns}) VALUES ' + ', '.join([row] * rows)
+
+
+def seed(engines, rows, password_hash, batch_size, report_every):
+    # Con varios motores (USERS_SHARD_URIS) cada fila va al shard de su email, igual que en la
+    # API, y toma el id del rango del shard (python init_db.py lo prepara)
+    inserted = 0
+    started = time.perf_counter()
+    with ExitStack() as stack:
+        connections = [stack.enter_context(engine.connect()) for engine in engines]
+        statements, pending = {}, [[] for _ in connections]
+
+        def flush(index):
+            nonlocal inserted
+            connection, batch = connections[index], pending[index]
+            key = (index, len(batch))
+            if key not in statements:
+                statements[key] = multi_row_insert(connection.dialect, len(batch))
+            now = to_db[index](datetime.utcnow())
+            params = []
+            for username, email in batch:
+                params.extend((username, email, password_hash, now, now))
+            # Un INSERT de varias filas y un commit por bloque
+            connection.exec_driver_sql(statements[key], tuple(params))
+            connection.commit()
+            inserted += len(batch)
+            pending[index] = []
+            if report_every and inserted % report_every < len(batch):
+                elapsed = time.perf_counter() - started
+                print(f'{inserted} filas en {elapsed:.1f}s ({inserted / elapsed:.0f} filas/s)', file=sys.stderr)
+
+        for connection in connections:
+            tune_connection(connection)
+        # Las fechas se convierten una vez por bloque al formato que espera el driver
+        to_db = [
+            User.__table__.c.created_at.type.bind_processor(connection.dialect) or (lambda value: value)
+            for connection in connections
+        ]
+        for row in rows:
+            index = shard_for_email(row[1], len(connections)) if len(connections) > 1 else 0
+            pending[index].append(row)
+            if len(pending[index]) == batch_size:
+                flush(index)
+        for index, batch in enumerate(pending):
+            if batch:
+                flush(index)
+    return inserted, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Carga usuarios de prueba deterministas')
+    parser.add_argument('--count', type=int, required=True, help='usuarios a insertar')
+    parser.add_argument('--seed', type=int, default=0, help='semilla de Faker')
+    parser.add_argument('--start', type=int, default=0, help='número de la primera fila (sufijo de nombre y correo)')
+    parser.add_argument('--batch-size', type=int, default=1000, help='filas por INSERT')
+    parser.add_argument('--password', default='password123', help='contraseña de todos los usuarios')
+    parser.add_argument('--report-every', type=int, default=100000, help='informar del progreso cada N filas (0 = nunca)')
+    args = parser.parse_args()
+
+    app = create_app()
+    # Un único hash con el método configurado para toda la carga
+    password_hash = generate_password_hash(
+        args.password, method=hashing.build_method(app.config['PASSWORD_HASH_METHOD'], app.config['PASSWORD_HASH_COST'])
+    )
+    with app.app_context():
+        rows = generate_rows(args.seed, args.start, args.count)
+        engines = user_shards.engines or [db.engine]
+        try:
+            inserted, elapsed = seed(engines, rows, password_hash, args.batch_size, args.report_every)
+        except IntegrityError:
+            # Los bloques anteriores ya están guardados; el que falló no
+            sys.exit(f'Correo duplicado: --start {args.start} se solapa con filas ya cargadas con la semilla {args.seed}')
+    print(f'{inserted} usuarios insertados en {elapsed:.1f}s ({inserted / max(elapsed, 1e-9):.0f} filas/s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+# sharding.py
+# Reparto de la tabla de usuarios entre varias bases de datos (USERS_SHARD_URIS en config.py).
+# Cada usuario vive en el shard que indica un hash estable de su email, y cada shard asigna los
+# id de su propio rango, de modo que el id también identifica el shard:
+#   shard i -> id en [i * SHARD_ID_SPAN + 1, (i + 1) * SHARD_ID_SPAN]
+# Las rutas de un solo usuario van directas a su shard; los listados y recuentos consultan
+# todos los shards a la vez (scatter-gather) y combinan los resultados ordenados por id.
+# Cambiar el número de shards reubica usuarios: requiere migrar los datos.
+import hashlib
+import heapq
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from operator import itemgetter
+
+from sqlalchemy import text
+
+# 2**40 id por shard: con hasta 8191 shards los id siguen siendo enteros exactos en JavaScript
+SHARD_ID_SPAN = 2 ** 40
+
+
+def shard_for_email(email, count):
+    # Hash estable entre procesos (no hash() de Python); el email se normaliza como en la
+    # restricción única de MySQL, que no distingue mayúsculas
+    digest = hashlib.blake2b(email.strip().lower().encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % count
+
+
+def shard_for_id(user_id, count):
+    index = (user_id - 1) // SHARD_ID_SPAN
+    return index if 0 <= index < count else None
+
+
+def prepare_shard(connection, index, table_name='user'):
+    # Hace que el shard asigne id desde el inicio de su rango. Idempotente (init_db.py).
+    # SQLite guarda el contador en sqlite_sequence (tabla con AUTOINCREMENT); MySQL 5.7 lo
+    # recalcula al reiniciar si la tabla está vacía, por eso init_db.py se ejecuta en cada despliegue.
+    start = index * SHARD_ID_SPAN
+    if connection.dialect.name == 'sqlite':
+        connection.execute(text(
+            'INSERT INTO sqlite_sequence (name, seq) SELECT :name, :start '
+            'WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = :name)'
+        ), {'name': table_name, 'start': start})
+        connection.execute(text('UPDATE sqlite_sequence SET seq = :start WHERE name = :name AND seq < :start'),
+                           {'name': table_name, 'start': start})
+    elif connection.dialect.name == 'mysql':
+        connection.execute(text(f'ALTER TABLE `{table_name}` AUTO_INCREMENT = {start + 1}'))
+    else:
+        raise ValueError(f'Sharding no soportado para {connection.dialect.name}')
+
+
+def merge_by_id(results, offset, limit):
+    # Une listas de filas ya ordenadas por id (primera columna) y devuelve el tramo pedido
+    return list(islice(heapq.merge(*results, key=itemgetter(0)), offset, offset + limit))
+
+
+class UserShards:
+    def __init__(self):
+        self.engines = []
+        self.workers = 8
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    def configure(self, engines, workers):
+        self.engines = list(engines)
+        self.workers = workers
+
+    @property
+    def enabled(self):
+        return bool(self.engines)
+
+    def engine_for_email(self, email):
+        return self.engines[shard_for_email(email, len(self.engines))]
+
+    def engine_for_id(self, user_id):
+        index = shard_for_id(user_id, len(self.engines))
+        return None if index is None else self.engines[index]
+
+    def _pool(self):
+        # Un pool de hilos por proceso, creado al primer uso (después del fork de gunicorn)
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=min(self.workers, len(self.engines)), thread_name_prefix='user-shard'
+                )
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def gather(self, fn):
+        # Ejecuta fn(engine, connection) en todos los shards a la vez; un resultado por shard
+        def run(engine):
+            with engine.connect() as connection:
+                return fn(engine, connection)
+        if len(self.engines) == 1:
+            return [run(self.engines[0])]
+        return list(self._pool().map(run, self.engines))
+
+
+user_shards = UserShards()
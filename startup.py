@@ -0,0 +1,49 @@
+# startup.py
+# Tiempos de arranque del proceso: importación de la aplicación, create_app() y primera petición
+# atendida, medidos desde que se importa este módulo (el primero en wsgi.py y asgi.py). Con
+# STARTUP_REPORT=true se escriben en el log al terminar la primera petición.
+# El detalle por módulo importado lo da benchmarks/bench_startup.py.
+import time
+
+STARTED = time.perf_counter()
+
+
+class StartupTimer:
+    def __init__(self):
+        self.marks = []  # (fase, segundos desde STARTED)
+        self._reported = False
+        self._request_start = None
+
+    def mark(self, phase):
+        self.marks.append((phase, time.perf_counter() - STARTED))
+
+    def report(self):
+        # 'fase: acumulado ms (+ parcial ms)'
+        lines, previous = [], 0.0
+        for phase, elapsed in self.marks:
+            lines.append(f'{phase}: {elapsed * 1000:.0f} ms (+{(elapsed - previous) * 1000:.0f} ms)')
+            previous = elapsed
+        return ', '.join(lines)
+
+    def init_app(self, app):
+        if not app.config['STARTUP_REPORT']:
+            return
+
+        def first_request_start():
+            if not self._reported and self._request_start is None:
+                self._request_start = time.perf_counter()
+
+        def first_request(response):
+            if not self._reported and self._request_start is not None:
+                self._reported = True
+                self.mark('primera petición')
+                app.logger.info('Arranque: %s; la primera petición tardó %.0f ms', self.report(),
+                                (time.perf_counter() - self._request_start) * 1000)
+            return response
+
+        app.logger.setLevel('INFO')
+        app.before_request(first_request_start)
+        app.after_request(first_request)
+
+
+startup_timer = StartupTimer()
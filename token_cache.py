@@ -0,0 +1,86 @@
+# token_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from flask_jwt_extended import JWTManager
+
+
+class VerifiedTokenCache:
+    # LRU acotado de tokens ya verificados, indexado por el SHA-256 del token.
+    # Cada entrada caduca con el 'exp' del propio token y todo se descarta si cambia la clave.
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._secret = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(encoded_token):
+        return hashlib.sha256(encoded_token.encode()).digest()
+
+    def get(self, encoded_token, secret):
+        key = self._key(encoded_token)
+        with self._lock:
+            if secret != self._secret:
+                # La clave de firma rotó: ningún token verificado antes sigue siendo válido
+                self._entries.clear()
+                self._secret = secret
+            entry = self._entries.get(key)
+            if entry is not None:
+                claims, expires_at = entry
+                if expires_at is None or expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(claims)
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, encoded_token, secret, claims):
+        if self.max_size <= 0:
+            return
+        key = self._key(encoded_token)
+        with self._lock:
+            if secret != self._secret:
+                return
+            self._entries[key] = (dict(claims), claims.get('exp'))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+class CachingJWTManager(JWTManager):
+    # JWTManager que evita volver a verificar la firma de tokens ya vistos. Las comprobaciones
+    # posteriores de la librería (lista de revocados, carga del usuario) se siguen ejecutando.
+    def __init__(self, app=None):
+        self.token_cache = VerifiedTokenCache()
+        super().__init__(app)
+
+    def init_app(self, app):
+        self.token_cache.max_size = app.config.get('JWT_TOKEN_CACHE_SIZE', 1024)
+        super().init_app(app)
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        if csrf_value is not None or self.token_cache.max_size <= 0:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+
+        secret = current_app.config.get('JWT_SECRET_KEY')
+        claims = self.token_cache.get(encoded_token, secret)
+        if claims is None:
+            claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+            # Solo se guardan tokens vigentes; los expirados aceptados con allow_expired no
+            if 'exp' not in claims or claims['exp'] > time.time():
+                self.token_cache.put(encoded_token, secret, claims)
+        return claims
@@ -1,18 +1,43 @@
 # validators.py
-from jsonschema import validate, ValidationError
-from schemas import user_schema, update_user_schema
+from jsonschema import validators
+from jsonschema.exceptions import best_match
+from schemas import user_schema, update_user_schema, bulk_delete_schema
+
+
+# Compila un esquema una sola vez: comprueba el esquema y crea el validador reutilizable
+def compile_schema(schema):
+    validator_class = validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
+user_validator = compile_schema(user_schema)
+update_user_validator = compile_schema(update_user_schema)
+bulk_delete_validator = compile_schema(bulk_delete_schema)
+
+
+def first_error(validator, data):
+    # Camino rápido: el caso válido solo recorre el esquema sin construir errores
+    if validator.is_valid(data):
+        return None
+    return best_match(validator.iter_errors(data)).message
+
 
 class UserValidator:
     @staticmethod
     def validate_create_user(data):
-        try:
-            validate(instance=data, schema=user_schema)
-        except ValidationError as e:
-            raise ValueError(f"Error de validación al crear usuario: {e.message}")
+        error = first_error(user_validator, data)
+        if error:
+            raise ValueError(f"Error de validación al crear usuario: {error}")
 
     @staticmethod
     def validate_update_user(data):
-        try:
-            validate(instance=data, schema=update_user_schema)
-        except ValidationError as e:
-            raise ValueError(f"Error de validación al actualizar usuario: {e.message}")
+        error = first_error(update_user_validator, data)
+        if error:
+            raise ValueError(f"Error de validación al actualizar usuario: {error}")
+
+    @staticmethod
+    def validate_bulk_delete(data):
+        error = first_error(bulk_delete_validator, data)
+        if error:
+            raise ValueError(f"Error de validación al eliminar usuarios: {error}")
@@ -0,0 +1,9 @@
+# wsgi.py
+# Punto de entrada de producción: gunicorn -c gunicorn.conf.py wsgi:app
+from startup import startup_timer  # Primero: marca el inicio del arranque
+
+from app import create_app
+
+startup_timer.mark('importación')
+app = create_app()
+startup_timer.mark('create_app')